@@ -0,0 +1,328 @@
+"""
+Per-user learning activity: an append-only event log with incrementally maintained rollups.
+
+Storage (same database as database.py / jobs.py):
+- activity_events: the raw log, clustered on (user, seq) so each user's history
+  is one contiguous range; rows are only ever appended
+- activity_rollup: one row per (user, grain, period, skill) with a column per
+  metric (hours, sessions, certifications, score sum/count, latest score), for
+  day / week / month grains plus an all-time row; skill "*" holds the totals
+
+record() / record_many() append events and fold them into every rollup row
+they touch in the same transaction (an upsert per row, so the cost of an event
+does not depend on how much history the user has). The Development and Profile
+pages read only the rollups and the newest events, never a scan of the log.
+
+Anonymous sessions are never pooled under one shared name: session_user() gives
+each one its own "guest-<id>" log, and guest logs idle for GUEST_RETAIN_DAYS
+are dropped when the store starts.
+
+Event kinds:
+- study: hours spent, optionally on a skill
+- assessment: a 0-5 self-rating of a skill (score)
+- certification: a certificate earned (title, optional skill)
+
+Usage:
+    store = ActivityStore()
+    store.record("alice", "study", skill="Python", hours=2.5, title="Python Advanced Course")
+    store.record_ratings("alice", {"Python": 4, "SQL": 2})
+    store.series("alice", grain="week")       # period, skill, hours, sessions, score, ...
+    store.totals("alice")["hours"]
+"""
+import os
+import sqlite3
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+DB_PATH = os.environ.get("CAREER_GUIDANCE_DB") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'career_guidance.db')
+
+KINDS = ("study", "assessment", "certification")
+GRAINS = ("day", "week", "month")
+ALL = "*"  # skill (totals) and period (all-time) wildcard in activity_rollup
+GUEST_PREFIX = "guest-"
+GUEST_RETAIN_DAYS = 30
+METRICS = ["hours", "sessions", "certifications", "score_sum", "score_n", "score_last", "score_ts"]
+
+Timestamp = Union[datetime, date, str, None]
+
+
+def _timestamp(ts: Timestamp) -> datetime:
+    if ts is None:
+        return datetime.now().replace(microsecond=0)
+    if isinstance(ts, datetime):
+        return ts
+    if isinstance(ts, date):
+        return datetime(ts.year, ts.month, ts.day)
+    return datetime.fromisoformat(ts)
+
+
+def period(ts: datetime, grain: str) -> str:
+    """Rollup bucket of a timestamp: day 'YYYY-MM-DD', week (its Monday) 'YYYY-MM-DD', month 'YYYY-MM'."""
+    if grain == "day":
+        return ts.strftime("%Y-%m-%d")
+    if grain == "week":
+        return (ts - timedelta(days=ts.weekday())).strftime("%Y-%m-%d")
+    if grain == "month":
+        return ts.strftime("%Y-%m")
+    if grain == "all":
+        return ALL
+    raise ValueError(f"unknown grain {grain!r}")
+
+
+def session_user(state) -> str:
+    """Log owner for a Streamlit session: the login name, else an id private to this session."""
+    name = state.get("username")
+    if name:
+        return name
+    if "activity_guest" not in state:
+        state["activity_guest"] = f"{GUEST_PREFIX}{uuid.uuid4().hex}"
+    return state["activity_guest"]
+
+
+class _Rollup:
+    """Rollup deltas for a batch of events, merged into the table with one upsert per row."""
+
+    def __init__(self):
+        self.rows: Dict[tuple, list] = {}
+
+    def add(self, user: str, ts: datetime, kind: str, skill: Optional[str], hours: float, score: Optional[float]):
+        stamp = ts.isoformat()
+        for grain in GRAINS + ("all",):
+            for name in ([skill, ALL] if skill else [ALL]):
+                row = self.rows.setdefault((user, grain, period(ts, grain), name), [0.0, 0, 0, 0.0, 0, None, None])
+                row[0] += hours
+                row[1] += kind == "study"
+                row[2] += kind == "certification"
+                if score is not None:
+                    row[3] += score
+                    row[4] += 1
+                    if row[6] is None or stamp >= row[6]:
+                        row[5], row[6] = score, stamp
+
+    def flush(self, conn: sqlite3.Connection):
+        conn.executemany(f'''
+            INSERT INTO activity_rollup (user, grain, period, skill, {", ".join(METRICS)})
+            VALUES (?, ?, ?, ?, {", ".join("?" * len(METRICS))})
+            ON CONFLICT (user, grain, period, skill) DO UPDATE SET
+                hours = hours + excluded.hours,
+                sessions = sessions + excluded.sessions,
+                certifications = certifications + excluded.certifications,
+                score_sum = score_sum + excluded.score_sum,
+                score_n = score_n + excluded.score_n,
+                score_last = CASE WHEN excluded.score_ts IS NOT NULL
+                                   AND (score_ts IS NULL OR excluded.score_ts >= score_ts)
+                              THEN excluded.score_last ELSE score_last END,
+                score_ts = CASE WHEN excluded.score_ts IS NOT NULL
+                                 AND (score_ts IS NULL OR excluded.score_ts >= score_ts)
+                            THEN excluded.score_ts ELSE score_ts END
+        ''', [key + tuple(row) for key, row in self.rows.items()])
+        self.rows.clear()
+
+
+class ActivityStore:
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or DB_PATH
+        self._init_db()
+        self.prune_guests()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS activity_events (
+                    user TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    ts TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    skill TEXT,
+                    hours REAL NOT NULL DEFAULT 0,
+                    score REAL,
+                    title TEXT,
+                    PRIMARY KEY (user, seq)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_activity_events_kind ON activity_events (user, kind, seq);
+                CREATE TABLE IF NOT EXISTS activity_rollup (
+                    user TEXT NOT NULL,
+                    grain TEXT NOT NULL,
+                    period TEXT NOT NULL,
+                    skill TEXT NOT NULL,
+                    hours REAL NOT NULL DEFAULT 0,
+                    sessions INTEGER NOT NULL DEFAULT 0,
+                    certifications INTEGER NOT NULL DEFAULT 0,
+                    score_sum REAL NOT NULL DEFAULT 0,
+                    score_n INTEGER NOT NULL DEFAULT 0,
+                    score_last REAL,
+                    score_ts TEXT,
+                    PRIMARY KEY (user, grain, period, skill)
+                ) WITHOUT ROWID;
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---- writes --------------------------------------------------------------
+
+    def record(self, user: str, kind: str, ts: Timestamp = None, skill: Optional[str] = None,
+               hours: float = 0.0, score: Optional[float] = None, title: str = "") -> int:
+        """Append one event and update its rollups; returns the event's per-user sequence number."""
+        return self.record_many(user, [{"kind": kind, "ts": ts, "skill": skill, "hours": hours,
+                                        "score": score, "title": title}])[-1]
+
+    def record_many(self, user: str, events: Iterable[dict]) -> List[int]:
+        """Append events (dicts with kind, ts, skill, hours, score, title) in one transaction."""
+        rows, rollup = [], _Rollup()
+        for e in events:
+            kind = e["kind"]
+            if kind not in KINDS:
+                raise ValueError(f"unknown activity kind {kind!r}")
+            ts = _timestamp(e.get("ts"))
+            skill = (e.get("skill") or "").strip() or None
+            hours = float(e.get("hours") or 0.0)
+            score = None if e.get("score") is None else float(e["score"])
+            if kind == "assessment" and (skill is None or score is None):
+                raise ValueError("an assessment needs a skill and a score")
+            rows.append([ts.isoformat(), kind, skill, hours, score, e.get("title") or ""])
+            rollup.add(user, ts, kind, skill, hours, score)
+        if not rows:
+            return []
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            start = conn.execute('SELECT COALESCE(MAX(seq), 0) + 1 FROM activity_events WHERE user = ?',
+                                 (user,)).fetchone()[0]
+            seqs = list(range(start, start + len(rows)))
+            conn.executemany('''
+                INSERT INTO activity_events (user, seq, ts, kind, skill, hours, score, title)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(user, seq, *row) for seq, row in zip(seqs, rows)])
+            rollup.flush(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        return seqs
+
+    def record_ratings(self, user: str, ratings: Dict[str, float], ts: Timestamp = None) -> int:
+        """Log an assessment for every skill whose rating differs from the latest one; returns how many."""
+        latest = self.latest_scores(user)
+        changed = [{"kind": "assessment", "ts": ts, "skill": skill, "score": score}
+                   for skill, score in ratings.items() if latest.get(skill) != float(score)]
+        self.record_many(user, changed)
+        return len(changed)
+
+    def rebuild_rollups(self, user: str, batch: int = 5000):
+        """Recompute a user's rollups from the raw log (repair / backfill)."""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM activity_rollup WHERE user = ?', (user,))
+            cur = conn.execute('SELECT ts, kind, skill, hours, score FROM activity_events WHERE user = ? ORDER BY seq',
+                               (user,))
+            while True:
+                chunk = cur.fetchmany(batch)
+                if not chunk:
+                    break
+                rollup = _Rollup()
+                for ts, kind, skill, hours, score in chunk:
+                    rollup.add(user, datetime.fromisoformat(ts), kind, skill, hours, score)
+                rollup.flush(conn)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def forget(self, user: str):
+        """Delete a user's events and rollups."""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM activity_events WHERE user = ?', (user,))
+            conn.execute('DELETE FROM activity_rollup WHERE user = ?', (user,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def prune_guests(self, days: float = GUEST_RETAIN_DAYS) -> int:
+        """Drop anonymous session logs with no event in the last `days`; returns how many."""
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            stale = [(row[0],) for row in conn.execute('''
+                SELECT user FROM activity_events WHERE user LIKE ? GROUP BY user HAVING MAX(ts) < ?
+            ''', (GUEST_PREFIX + "%", cutoff))]
+            conn.executemany('DELETE FROM activity_events WHERE user = ?', stale)
+            conn.executemany('DELETE FROM activity_rollup WHERE user = ?', stale)
+            conn.commit()
+        finally:
+            conn.close()
+        return len(stale)
+
+    # ---- reads (rollups and the newest events only) ----------------------------
+
+    def series(self, user: str, grain: str = "week", skills: Optional[Iterable[str]] = None,
+               since: Timestamp = None) -> pd.DataFrame:
+        """Rolled-up metrics per period for the totals (default) or the given skills, oldest first."""
+        if grain not in GRAINS:
+            raise ValueError(f"unknown grain {grain!r}")
+        names = list(skills) if skills is not None else [ALL]
+        sql = f'''SELECT period, skill, {", ".join(METRICS[:-1])} FROM activity_rollup
+                  WHERE user = ? AND grain = ? AND skill IN ({", ".join("?" * len(names))})'''
+        params = [user, grain, *names]
+        if since is not None:
+            sql += ' AND period >= ?'
+            params.append(period(_timestamp(since), grain))
+        conn = self._connect()
+        try:
+            frame = pd.read_sql_query(sql + ' ORDER BY period, skill', conn, params=params)
+        finally:
+            conn.close()
+        frame["score"] = (frame["score_sum"] / frame["score_n"]).where(frame["score_n"] > 0)
+        return frame.drop(columns=["score_sum", "score_n"])
+
+    def totals(self, user: str) -> dict:
+        """All-time hours / sessions / certifications and the latest score of every assessed skill."""
+        conn = self._connect()
+        try:
+            rows = conn.execute('''
+                SELECT skill, hours, sessions, certifications, score_last FROM activity_rollup
+                WHERE user = ? AND grain = 'all' AND period = ?
+            ''', (user, ALL)).fetchall()
+        finally:
+            conn.close()
+        out = {"hours": 0.0, "sessions": 0, "certifications": 0, "skills": {}, "skill_hours": {}}
+        for skill, hours, sessions, certifications, score_last in rows:
+            if skill == ALL:
+                out.update(hours=hours, sessions=sessions, certifications=certifications)
+            else:
+                out["skill_hours"][skill] = hours
+                if score_last is not None:
+                    out["skills"][skill] = score_last
+        return out
+
+    def latest_scores(self, user: str) -> Dict[str, float]:
+        return self.totals(user)["skills"]
+
+    def recent(self, user: str, limit: int = 10, kinds: Optional[Iterable[str]] = None) -> List[dict]:
+        """The user's newest events, newest first."""
+        sql = 'SELECT seq, ts, kind, skill, hours, score, title FROM activity_events WHERE user = ?'
+        params: list = [user]
+        if kinds is not None:
+            kinds = list(kinds)
+            sql += f' AND kind IN ({", ".join("?" * len(kinds))})'
+            params.extend(kinds)
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql + ' ORDER BY seq DESC LIMIT ?', params + [limit]).fetchall()
+        finally:
+            conn.close()
+        cols = ["seq", "ts", "kind", "skill", "hours", "score", "title"]
+        return [dict(zip(cols, r)) for r in rows]
+
+
+__all__ = ["ActivityStore", "KINDS", "GRAINS", "period", "session_user"]
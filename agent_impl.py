@@ -1,10 +1,12 @@
 from typing import Dict
 from openai_client import OpenAIClient
 from vector_db import query_vector_db
+from prompt_budget import PromptBudgeter
 
 class AcademicAdvisorAgent:
-    def __init__(self):
+    def __init__(self, budgeter: PromptBudgeter = None):
         self.client = OpenAIClient()
+        self.budgeter = budgeter or PromptBudgeter()
 
     def __call__(self, request: str) -> Dict:
         return self.handle(request)
@@ -12,15 +14,18 @@ class AcademicAdvisorAgent:
     def handle(self, request: str) -> Dict:
         docs = query_vector_db(request, top_k=3)
         resources = docs or ["Intro to Programming", "Statistics Basics", "Study Plan Guidelines"]
+        # fit even when answering offline, so agents later in the turn order aren't kept waiting
+        context = self.budgeter.fit("academic_advisor", resources)
         if self.client and self.client.api_key:
-            prompt = f"You are an academic advisor. The student asks: {request}. Suggest courses and a learning path. Use these resources: {resources}"
+            prompt = f"You are an academic advisor. The student asks: {request}. Suggest courses and a learning path. Use these resources: {context}"
             resp = self.client.chat(prompt)
             return {"role": "academic_advisor", "text": resp, "resources": resources}
         return {"role": "academic_advisor", "text": f"Suggested courses: {', '.join(resources)}. Start with fundamentals and projects.", "resources": resources}
 
 class CareerCounselorAgent:
-    def __init__(self):
+    def __init__(self, budgeter: PromptBudgeter = None):
         self.client = OpenAIClient()
+        self.budgeter = budgeter or PromptBudgeter()
 
     def __call__(self, request: str) -> Dict:
         return self.handle(request)
@@ -28,8 +33,10 @@ class CareerCounselorAgent:
     def handle(self, request: str) -> Dict:
         docs = query_vector_db(request, top_k=4)
         resources = docs or ["Resume Guide", "Interview Prep", "Portfolio Projects"]
+        # fit even when answering offline, so agents later in the turn order aren't kept waiting
+        context = self.budgeter.fit("career_counselor", resources)
         if self.client and self.client.api_key:
-            prompt = f"You are a career counselor. The user asks: {request}. Recommend roles, skills, and next steps using resources: {resources}"
+            prompt = f"You are a career counselor. The user asks: {request}. Recommend roles, skills, and next steps using resources: {context}"
             resp = self.client.chat(prompt)
             return {"role": "career_counselor", "text": resp, "resources": resources}
         return {"role": "career_counselor", "text": f"Recommended roles: Data Scientist, ML Engineer. Skills: Python, ML, SQL. Resources: {', '.join(resources)}", "resources": resources}
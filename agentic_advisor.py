@@ -1,22 +1,57 @@
 from crewai import CrewAI  # our lightweight crewai.py
 from agent_impl import AcademicAdvisorAgent, CareerCounselorAgent, ResourceAgent
+from prompt_budget import PromptBudgeter
+from tracing import span, trace
+from singleflight import SingleFlight, fingerprint, normalize_query
 
 class AgenticAdvisor:
     """High-level orchestrator that uses CrewAI to coordinate multiple agents.
 
     Methods:
       - respond(query): runs agents and aggregates a combined reply
+        (includes a `prompt_budget` report of tokens saved this turn and the
+        `trace_id` of the turn's spans, see tracing.py). Concurrent identical
+        turns (same normalized query and profile) are coalesced into one run
+        and marked `coalesced`; turns without a profile are never coalesced,
+        since nothing tells two anonymous users apart.
     """
+    BUDGET_ORDER = ("academic_advisor", "career_counselor")
+
     def __init__(self):
-        self.crew = CrewAI()
+        # shared prompt budgeter: bounds retrieved context and dedups it across agents per turn
+        self.budgeter = PromptBudgeter()
+        # an agent that fails before fitting its context must not hold up the ones after it
+        self.crew = CrewAI(on_agent_done=self.budgeter.done)
         # register agents (callables)
-        self.crew.register_agent('academic_advisor', AcademicAdvisorAgent())
-        self.crew.register_agent('career_counselor', CareerCounselorAgent())
+        self.crew.register_agent('academic_advisor', AcademicAdvisorAgent(self.budgeter))
+        self.crew.register_agent('career_counselor', CareerCounselorAgent(self.budgeter))
         self.crew.register_agent('resource_agent', ResourceAgent())
+        self._flight = SingleFlight("advisor.respond")
+
+    def respond(self, query: str, profile: dict = None) -> dict:
+        """Answer `query`; only turns with the same `profile` are merged with concurrent duplicates."""
+        with trace("advisor.respond", query=query[:80]) as root:
+            if profile is None:
+                return self._respond(query, root.trace_id)
+            key = (normalize_query(query), fingerprint(profile))
+            result, shared = self._flight.do(key, lambda: self._respond(query, root.trace_id))
+            if shared:
+                root.set_attribute("coalesced", True)
+                result = dict(result, coalesced=True)
+        return result
 
-    def respond(self, query: str) -> dict:
+    def _respond(self, query: str, trace_id: str) -> dict:
         # Dispatch to all agents and combine results
-        results = self.crew.dispatch(query)
+        # shared resources go to agents in this order, however the crew schedules them
+        with self.budgeter.turn(order=self.BUDGET_ORDER) as ledger:
+            results = self.crew.dispatch(query)
+        with span("aggregate", agents=len(results)):
+            aggregated = self._aggregate(results)
+        aggregated['prompt_budget'] = ledger.report()
+        aggregated['trace_id'] = trace_id
+        return aggregated
+
+    def _aggregate(self, results: dict) -> dict:
         # Basic aggregation strategy: concatenate `text` fields and collect resources
         combined_texts = []
         combined_resources = []
@@ -31,6 +66,6 @@ class AgenticAdvisor:
         aggregated = {
             'combined_text': '\n\n'.join(combined_texts),
             'resources': list(dict.fromkeys(combined_resources))[:20],
-            'agent_results': results
+            'agent_results': results,
         }
         return aggregated
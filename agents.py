@@ -1,6 +1,8 @@
 from crewai import Agent, Task, Crew
-from typing import List, Dict, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 from vector_db import query_vector_db, get_embedding
+from prompt_budget import PromptBudgeter, compact_profile
+from pipeline import PipelineEvent, Stage, StreamingPipeline, section_reached
 import openai
 from dotenv import load_dotenv
 import os
@@ -13,7 +15,8 @@ openai.api_key = os.getenv('OPENAI_API_KEY')
 
 class GuidanceAgent:
     """Base class for all guidance agents"""
-    def __init__(self, name: str, role: str, goal: str, backstory: str):
+    def __init__(self, name: str, role: str, goal: str, backstory: str, budgeter: PromptBudgeter = None):
+        self.budgeter = budgeter or PromptBudgeter()
         self.agent = Agent(
             name=name,
             role=role,
@@ -26,22 +29,50 @@ class GuidanceAgent:
     def get_agent(self):
         return self.agent
 
+    def _ask_openai(self, prompt: str, on_token: Callable[[str], None] = None) -> str:
+        """Helper method to interact with OpenAI API (streams tokens to `on_token` if given)"""
+        if on_token is None:
+            response = openai.ChatCompletion.create(
+                model="gpt-4",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.7
+            )
+            return response.choices[0].message.content
+
+        parts = []
+        for chunk in openai.ChatCompletion.create(
+            model="gpt-4",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.7,
+            stream=True
+        ):
+            token = chunk.choices[0].delta.get("content") or ""
+            if token:
+                parts.append(token)
+                on_token(token)
+        return "".join(parts)
+
 class AcademicAdvisor(GuidanceAgent):
-    def __init__(self):
+    def __init__(self, budgeter: PromptBudgeter = None):
         super().__init__(
             name="Academic Advisor",
             role="Academic Planning Specialist",
             goal="Provide personalized academic guidance and course planning",
             backstory="""Expert academic advisor with deep knowledge of university programs, 
             course requirements, and academic planning. Specializes in analyzing student 
-            interests and performance to suggest optimal academic paths."""
+            interests and performance to suggest optimal academic paths.""",
+            budgeter=budgeter
         )
     
-    def analyze_academic_path(self, student_profile: Dict, interests: List[str]) -> str:
+    def analyze_academic_path(self, student_profile: Dict, interests: List[str],
+                              related_courses: List[str] = None, on_token: Callable[[str], None] = None) -> str:
         """Analyze and recommend academic path based on student profile and interests"""
-        related_courses = query_vector_db(" ".join(interests))
+        if related_courses is None:
+            related_courses = query_vector_db(" ".join(interests))
+        related_courses = self.budgeter.fit("academic_advisor", related_courses)
+        profile = self.budgeter.fit_text("student_profile", compact_profile(student_profile))
         prompt = f"""
-        Student Profile: {student_profile}
+        Student Profile: {profile}
         Interests: {interests}
         Related Courses from DB: {related_courses}
         
@@ -51,33 +82,30 @@ class AcademicAdvisor(GuidanceAgent):
         3. Key skills to develop
         4. Potential academic opportunities (research, projects, etc.)
         """
-        return self._ask_openai(prompt)
-    
-    def _ask_openai(self, prompt: str) -> str:
-        """Helper method to interact with OpenAI API"""
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7
-        )
-        return response.choices[0].message.content
+        return self._ask_openai(prompt, on_token)
 
 class CareerCounselor(GuidanceAgent):
-    def __init__(self):
+    def __init__(self, budgeter: PromptBudgeter = None):
         super().__init__(
             name="Career Counselor",
             role="Career Development Expert",
             goal="Guide career planning and professional development",
             backstory="""Experienced career counselor with expertise in job markets, 
             industry trends, and professional development. Helps align academic choices 
-            with career goals and market opportunities."""
+            with career goals and market opportunities.""",
+            budgeter=budgeter
         )
     
-    def analyze_career_path(self, student_profile: Dict, interests: List[str], academic_plan: str) -> str:
+    def analyze_career_path(self, student_profile: Dict, interests: List[str], academic_plan: str,
+                            related_careers: List[str] = None, on_token: Callable[[str], None] = None) -> str:
         """Analyze and recommend career paths based on profile, interests, and academic plan"""
-        related_careers = query_vector_db(" ".join(interests))
+        if related_careers is None:
+            related_careers = query_vector_db(" ".join(interests))
+        related_careers = self.budgeter.fit("career_counselor", related_careers)
+        profile = self.budgeter.fit_text("student_profile", compact_profile(student_profile))
+        academic_plan = self.budgeter.fit_text("prior_plan", academic_plan)
         prompt = f"""
-        Student Profile: {student_profile}
+        Student Profile: {profile}
         Interests: {interests}
         Academic Plan: {academic_plan}
         Related Careers from DB: {related_careers}
@@ -89,29 +117,25 @@ class CareerCounselor(GuidanceAgent):
         4. Professional development recommendations
         5. Networking strategies
         """
-        return self._ask_openai(prompt)
-    
-    def _ask_openai(self, prompt: str) -> str:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7
-        )
-        return response.choices[0].message.content
+        return self._ask_openai(prompt, on_token)
 
 class SkillsAdvisor(GuidanceAgent):
-    def __init__(self):
+    def __init__(self, budgeter: PromptBudgeter = None):
         super().__init__(
             name="Skills Advisor",
             role="Skills Development Expert",
             goal="Guide technical and soft skills development",
             backstory="""Technical skills development expert who helps identify and 
             build crucial competencies for academic and career success. Provides 
-            practical learning paths and resources."""
+            practical learning paths and resources.""",
+            budgeter=budgeter
         )
     
-    def create_skills_plan(self, academic_plan: str, career_path: str) -> str:
+    def create_skills_plan(self, academic_plan: str, career_path: str,
+                           on_token: Callable[[str], None] = None) -> str:
         """Create a skills development plan based on academic and career goals"""
+        academic_plan = self.budgeter.fit_text("prior_plan", academic_plan)
+        career_path = self.budgeter.fit_text("prior_plan", career_path)
         prompt = f"""
         Academic Plan: {academic_plan}
         Career Path: {career_path}
@@ -123,23 +147,16 @@ class SkillsAdvisor(GuidanceAgent):
         4. Certification recommendations
         5. Timeline for skill acquisition
         """
-        return self._ask_openai(prompt)
-    
-    def _ask_openai(self, prompt: str) -> str:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7
-        )
-        return response.choices[0].message.content
+        return self._ask_openai(prompt, on_token)
 
 class GuidanceCrew:
     """Manages the collaboration between different guidance agents"""
     
     def __init__(self):
-        self.academic_advisor = AcademicAdvisor()
-        self.career_counselor = CareerCounselor()
-        self.skills_advisor = SkillsAdvisor()
+        self.budgeter = PromptBudgeter()
+        self.academic_advisor = AcademicAdvisor(self.budgeter)
+        self.career_counselor = CareerCounselor(self.budgeter)
+        self.skills_advisor = SkillsAdvisor(self.budgeter)
         
         self.crew = Crew(
             agents=[
@@ -151,26 +168,64 @@ class GuidanceCrew:
             verbose=True
         )
     
+    def _pipeline(self, student_profile: Dict, interests: List[str]) -> StreamingPipeline:
+        """Academic -> career -> skills, with retrieval prefetched up front.
+
+        The academic and career stages each run their own vector DB query (courses
+        vs careers for the same interests), both prefetched in parallel, so the
+        career stage is grounded in career material rather than in leftovers of
+        the academic stage's documents after cross-agent dedup.
+
+        The career stage only needs the recommended majors and course sequence, so
+        it starts once the academic plan has streamed into section 3; the skills
+        stage likewise starts once the career path reaches section 3. Stages start
+        from the complete upstream text whenever it is already available.
+        """
+        query = " ".join(interests)
+
+        return StreamingPipeline([
+            Stage(
+                "academic_plan",
+                lambda up, docs, emit: self.academic_advisor.analyze_academic_path(
+                    student_profile, interests, related_courses=docs, on_token=emit),
+                prefetch=lambda: query_vector_db(f"{query} courses"),
+            ),
+            Stage(
+                "career_path",
+                lambda up, docs, emit: self.career_counselor.analyze_career_path(
+                    student_profile, interests, up["academic_plan"], related_careers=docs, on_token=emit),
+                deps=["academic_plan"],
+                prefetch=lambda: query_vector_db(f"{query} career"),
+                prefix_ready=section_reached(3),
+            ),
+            Stage(
+                "skills_plan",
+                lambda up, _, emit: self.skills_advisor.create_skills_plan(
+                    up["academic_plan"], up["career_path"], on_token=emit),
+                deps=["academic_plan", "career_path"],
+                prefix_ready=section_reached(3),
+            ),
+        ])
+
+    def stream_comprehensive_guidance(self, student_profile: Dict, interests: List[str]) -> Iterator[PipelineEvent]:
+        """Yield PipelineEvents ('chunk', 'done', 'error') for each plan as it is produced"""
+        with self.budgeter.turn():
+            yield from self._pipeline(student_profile, interests).stream()
+
     def get_comprehensive_guidance(self, student_profile: Dict, interests: List[str]) -> Dict:
         """Generate comprehensive guidance using all agents"""
         
-        # Get academic recommendations
-        academic_plan = self.academic_advisor.analyze_academic_path(
-            student_profile, interests
-        )
-        
-        # Get career guidance
-        career_path = self.career_counselor.analyze_career_path(
-            student_profile, interests, academic_plan
-        )
-        
-        # Get skills development plan
-        skills_plan = self.skills_advisor.create_skills_plan(
-            academic_plan, career_path
-        )
+        plans = {}
+        with self.budgeter.turn() as ledger:
+            for event in self._pipeline(student_profile, interests).stream():
+                if event.kind == "error":
+                    raise RuntimeError(f"{event.stage} failed: {event.text}")
+                if event.kind == "done":
+                    plans[event.stage] = event.text
         
         return {
-            "academic_plan": academic_plan,
-            "career_path": career_path,
-            "skills_plan": skills_plan
+            "academic_plan": plans["academic_plan"],
+            "career_path": plans["career_path"],
+            "skills_plan": plans["skills_plan"],
+            "prompt_budget": ledger.report()
         }
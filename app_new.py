@@ -5,10 +5,16 @@ import json
 import os
 from load_env import load_env  # Load .env first
 load_env()  # Initialize environment variables from .env
-from career_chatbot import CareerChatbot
 from career_guidance_system import CareerGuidanceSystem
 from vector_db import query_vector_db, populate_sample_data
-from agentic_advisor import AgenticAdvisor
+from shared_resources import get_resource, reset_resource, resource_status
+from chat_history import (user_message, assistant_message, recent_window, page_count, history_page,
+                          agent_metadata)
+from warmup import start_warmup, wait_until_ready, readiness
+from vector_db import index_info
+from metrics import snapshot, render_prometheus
+from tracing import trace, recent_traces, get_trace, waterfall
+import profiler
 
 # Initialize authentication state
 if "authenticated" not in st.session_state:
@@ -25,25 +31,38 @@ if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
 if "saved_resources" not in st.session_state:
     st.session_state.saved_resources = []
-if "agentic_advisor" not in st.session_state:
-    # initialize the agentic advisor (orchestrator of multiple agents)
-    try:
-        st.session_state.agentic_advisor = AgenticAdvisor()
-    except Exception:
-        # fallback simple chatbot if something goes wrong
-        st.session_state.agentic_advisor = None
-if "career_bot" not in st.session_state:
-    # keep legacy chatbot as a lightweight fallback
-    st.session_state.career_bot = CareerChatbot()
 if "user_info" not in st.session_state:
     st.session_state.user_info = {"name": "", "interests": [], "education": ""}
 
-# Populate demo vector DB (safe to call multiple times)
-try:
-    populate_sample_data()
-except Exception:
-    # If vector DB libs aren't available or population fails, ignore for now
-    pass
+# Load the encoder, build the index, prime the query cache and build the shared
+# agents on a background thread, once per process (no-op on later script runs).
+start_warmup()
+
+def shared_advisor():
+    """Process-wide AgenticAdvisor (orchestrator of multiple agents), or None if it failed to build."""
+    try:
+        return get_resource("agentic_advisor")
+    except Exception:
+        return None
+
+def shared_career_bot():
+    """Process-wide legacy chatbot, kept as a lightweight fallback."""
+    return get_resource("career_bot")
+
+def shared_jobs():
+    """Process-wide background job queue (see jobs.py)."""
+    return get_resource("job_queue")
+
+def advisor_reply_text(agent_resp: dict) -> str:
+    """Chat text for an AgenticAdvisor result: combined_text, else the per-agent outputs."""
+    resp_text = agent_resp.get("combined_text")
+    if not resp_text:
+        parts = []
+        for k, v in (agent_resp.get("agent_results") or {}).items():
+            if isinstance(v, dict):
+                parts.append(f"[{k}] {v.get('text') or v.get('response')}")
+        resp_text = "\n\n".join(parts)
+    return resp_text
 
 # Helper functions for debug logging and file persistence
 def save_debug_output_to_file(data: dict, output_type: str) -> str:
@@ -61,9 +80,32 @@ def get_debug_file_list() -> list:
     """Return list of saved debug log files."""
     logs_dir = "debug_logs"
     if os.path.exists(logs_dir):
-        return sorted([f for f in os.listdir(logs_dir) if f.endswith(".json")], reverse=True)
+        return sorted([f for f in os.listdir(logs_dir)
+                       if f.endswith(".json") and not f.startswith("profile_")], reverse=True)
     return []
 
+def render_trace_waterfall(trace_id: str):
+    """Draw one trace's spans as a waterfall (offset + duration per span)."""
+    t = get_trace(trace_id) if trace_id else None
+    rows = waterfall(t) if t else []
+    if not rows:
+        st.info("Trace not found (it may have rotated out of the buffer).")
+        return
+    import plotly.graph_objects as go  # deferred: only the admin debug tab needs plotly
+
+    labels = [f"{'  ' * r['depth']}{r['name']}" for r in rows]
+    colors = ["#e53935" if r["status"] == "error" else "#4CAF50" if r["depth"] else "#2196F3" for r in rows]
+    fig = go.Figure(go.Bar(
+        y=labels, x=[max(r["duration_ms"], 0.01) for r in rows], base=[r["start_ms"] for r in rows],
+        orientation="h", marker_color=colors,
+        hovertext=[f"{r['duration_ms']:.1f}ms on {r['thread']}<br>{r['attributes']}" for r in rows],
+        hoverinfo="text",
+    ))
+    fig.update_layout(height=max(200, 28 * len(rows) + 80), xaxis_title="ms since start",
+                      yaxis=dict(autorange="reversed"), margin=dict(l=10, r=10, t=10, b=40))
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"Trace {trace_id} · {rows[0]['duration_ms']:.0f}ms total · {len(rows)} spans")
+
 # Page configuration with custom theme
 st.set_page_config(
     page_title="AI Career Guidance System",
@@ -324,23 +366,70 @@ def career_explorer_page():
     
     with tabs[2]:
         st.subheader("Market Insights")
-        st.markdown("""
-        ### Industry Trends
-        - 💹 AI & ML: 34% growth expected
-        - 🔒 Cybersecurity: Critical demand
-        - 🌐 Web Development: Stable growth
-        - 📊 Data Science: High demand
-        """)
-        
-        # Mock salary ranges
-        st.markdown("### Salary Ranges by Experience")
-        chart_data = {
-            "Junior": {"AI": 85, "Cyber": 75, "Web": 65, "Data": 80},
-            "Mid": {"AI": 120, "Cyber": 110, "Web": 95, "Data": 115},
-            "Senior": {"AI": 180, "Cyber": 160, "Web": 140, "Data": 170}
-        }
+        market = get_resource("market_insights")
+        growth = market.growth(window=6, top=4)
+        st.markdown("### Industry Trends")
+        st.markdown("\n".join(
+            f"- 📈 {row.role}: {row.change_pct:+.0f}% postings over the last 6 months"
+            for row in growth.itertuples()
+        ))
         
-        st.bar_chart(chart_data)
+        st.markdown("### Salary Ranges by Role (25th / 50th / 75th percentile)")
+        chart_data = market.demand_by_role(top=6).set_index("role")[["p25", "p50", "p75"]]
+        st.bar_chart(chart_data / 1000, y_label="Salary ($k)", stack=False)
+        source = market.info()
+        st.caption(f"Source: {source.get('source', 'n/a')} ({source.get('rows', '0')} postings)")
+
+def render_chat_message(index: int, message: dict):
+    if message["role"] == "user":
+        st.markdown(f"**You:** {message['content']}")
+        return
+    st.markdown(f"**AI Advisor:** {message['content']}")
+    if not (message.get("job_id") or message.get("agent_response")):
+        return
+    # agent metadata is fetched from the job store only while the breakdown is open
+    if not st.toggle("Agent breakdown", key=f"chat_breakdown_{index}"):
+        return
+    agent_meta = agent_metadata(message, shared_jobs())
+    if not agent_meta:
+        st.caption("Agent details are no longer available for this message.")
+        return
+    # show aggregated combined_text if present
+    combined = agent_meta.get("combined_text")
+    if combined:
+        st.markdown("**Aggregated Response**")
+        st.info(combined)
+    # per-agent outputs
+    ar = agent_meta.get("agent_results") or {}
+    for agent_name, result in ar.items():
+        with st.expander(f"{agent_name}", expanded=False):
+            if isinstance(result, dict):
+                text = result.get("text") or result.get("response") or result.get("raw")
+                if text:
+                    st.write(text)
+                resources = result.get("resources")
+                if resources:
+                    st.markdown("**Resources:**")
+                    for r in resources:
+                        st.write(f"- {r}")
+
+@st.fragment
+def chat_history_view():
+    """Recent messages plus paged older history; browsing it reruns only this fragment."""
+    history = st.session_state.chat_history
+    pages = page_count(history)
+    if pages:
+        older, _ = recent_window(history)
+        if st.toggle(f"Show earlier messages ({older} more)", key="chat_show_earlier"):
+            page = st.number_input("Page (1 = most recent)", min_value=1, max_value=pages, value=1,
+                                   key="chat_history_page") if pages > 1 else 1
+            start, messages = history_page(history, page)
+            for offset, message in enumerate(messages):
+                render_chat_message(start + offset, message)
+            st.divider()
+    start, messages = recent_window(history)
+    for offset, message in enumerate(messages):
+        render_chat_message(start + offset, message)
 
 def ai_advisor_page():
     st.header("AI Career Advisor 🤖")
@@ -355,35 +444,37 @@ def ai_advisor_page():
     - 🌟 Skills development
     """)
     
-    # Chat history display
-    for message in st.session_state.chat_history:
-        if message["role"] == "user":
-            st.markdown(f"**You:** {message['content']}")
-        else:
-            st.markdown(f"**AI Advisor:** {message['content']}")
-            # If this assistant message contains agent_response metadata, show breakdown
-            agent_meta = message.get("agent_response")
-            if agent_meta and isinstance(agent_meta, dict):
-                with st.expander("Agent breakdown", expanded=False):
-                    # show aggregated combined_text if present
-                    combined = agent_meta.get("combined_text")
-                    if combined:
-                        st.markdown("**Aggregated Response**")
-                        st.info(combined)
-                    # per-agent outputs
-                    ar = agent_meta.get("agent_results") or {}
-                    for agent_name, result in ar.items():
-                        with st.expander(f"{agent_name}", expanded=False):
-                            if isinstance(result, dict):
-                                text = result.get("text") or result.get("response") or result.get("raw")
-                                if text:
-                                    st.write(text)
-                                resources = result.get("resources")
-                                if resources:
-                                    st.markdown("**Resources:**")
-                                    for r in resources:
-                                        st.write(f"- {r}")
+    # Only the newest messages are drawn; older pages and agent breakdowns load on demand
+    chat_history_view()
     
+    # A submitted turn runs as a background job; poll it until it finishes.
+    # The job keeps running (and its result is kept) if the user navigates away.
+    pending = st.session_state.get("pending_advisor_job")
+    if pending:
+        job = shared_jobs().get(pending["id"])
+        if job and job["status"] in ("queued", "running"):
+            message = job["progress"].get("message") or ("Queued..." if job["status"] == "queued" else "Thinking...")
+            st.info(f"⏳ {message}")
+            if st.button("Cancel", key="cancel_advisor_job"):
+                shared_jobs().cancel(pending["id"])
+                del st.session_state.pending_advisor_job
+                st.session_state.chat_history.append(assistant_message("(request cancelled)"))
+                st.rerun()
+            time.sleep(1)
+            st.rerun()
+        else:
+            del st.session_state.pending_advisor_job
+            agent_resp = job["result"] if job and job["status"] == "done" else None
+            if agent_resp:
+                resp_text = advisor_reply_text(agent_resp)
+            else:
+                # job failed or was lost: fall back to the legacy career_bot
+                resp_text = shared_career_bot().get_response(pending["query"])
+            # Add AI response to history; the agent breakdown stays in the job store
+            st.session_state.chat_history.append(
+                assistant_message(resp_text, job_id=pending["id"] if agent_resp else None))
+            st.rerun()
+
     # Chat input
     with st.form("chat_form"):
         user_input = st.text_input("Ask me anything about your career journey:", 
@@ -392,39 +483,20 @@ def ai_advisor_page():
         
         if submitted and user_input:
             # Add user message to history
-            st.session_state.chat_history.append({"role": "user", "content": user_input})
-            
-            # Get AI response
-            with st.spinner("Thinking..."):
-                # Prefer the agentic advisor if available
-                agent_resp = None
-                if st.session_state.get("agentic_advisor") is not None:
-                    try:
-                        agent_resp = st.session_state.agentic_advisor.respond(user_input)
-                    except Exception as e:
-                        agent_resp = {"error": str(e)}
-
-                if agent_resp:
-                    # pick the combined_text if returned, otherwise aggregate agent outputs
-                    resp_text = agent_resp.get("combined_text") if isinstance(agent_resp, dict) else str(agent_resp)
-                    if not resp_text and isinstance(agent_resp, dict):
-                        # try to build a simple text from agent_results
-                        parts = []
-                        for k,v in (agent_resp.get("agent_results") or {}).items():
-                            if isinstance(v, dict):
-                                parts.append(f"[{k}] {v.get('text') or v.get('response')}")
-                        resp_text = "\n\n".join(parts)
-                else:
-                    # fallback to legacy career_bot
-                    resp_text = st.session_state.career_bot.get_response(user_input)
-
-                # Add AI response to history (include agent metadata for detailed view)
-                st.session_state.chat_history.append({
-                    "role": "assistant",
-                    "content": resp_text,
-                    "agent_response": agent_resp if agent_resp else None
-                })
-                st.rerun()
+            st.session_state.chat_history.append(user_message(user_input))
+            # agents retrieve from the vector DB: let warm-up finish first
+            wait_until_ready(timeout=30)
+            try:
+                # a blank profile is not an identity: anonymous turns are neither deduped nor coalesced
+                profile = st.session_state.user_info if st.session_state.user_info["name"] else None
+                job_id = shared_jobs().submit("advisor", {"query": user_input, "profile": profile},
+                                              dedup=profile is not None)
+                st.session_state.pending_advisor_job = {"id": job_id, "query": user_input}
+            except Exception:
+                # queue full or unavailable: answer inline with the legacy career_bot
+                st.session_state.chat_history.append(
+                    assistant_message(shared_career_bot().get_response(user_input)))
+            st.rerun()
 
 def learning_hub_page():
     st.header("Learning Hub 📚")
@@ -440,6 +512,9 @@ def learning_hub_page():
             if not query:
                 st.warning("Please enter a search query.")
             else:
+                if not wait_until_ready(timeout=0):
+                    with st.spinner("Warming up the search index..."):
+                        wait_until_ready(timeout=30)
                 with st.spinner("Searching resources..."):
                     try:
                         results = query_vector_db(query)
@@ -672,15 +747,43 @@ def admin_page():
         
         with col1:
             st.markdown("### Services")
-            st.markdown("✅ AI Advisor: Active")
-            st.markdown("✅ Vector DB: Connected")
+            status = readiness()
+            icons = {"done": "✅", "running": "⏳", "pending": "⏳", "failed": "❌"}
+            st.markdown(f"{'✅' if status['ready'] else '⏳'} Warm-up: {'Ready' if status['ready'] else 'Warming up'}")
+            for stage, info in status["stages"].items():
+                took = f" ({info['seconds']}s)" if info["seconds"] is not None else ""
+                st.markdown(f"{icons.get(info['status'], '❔')} {stage}: {info['status']}{took}")
+                if info["error"]:
+                    st.caption(info["error"])
+            idx = index_info()
+            st.markdown(f"📚 Vector DB: {idx['backend']}, {idx['documents']} docs, {idx['cached_queries']} cached queries")
+            built = resource_status()
+            st.markdown(f"{'✅' if built.get('agentic_advisor') else '⏳'} AI Advisor: {'Active' if built.get('agentic_advisor') else 'Not built yet'}")
             st.markdown("✅ Career Engine: Running")
         
         with col2:
             st.markdown("### Performance")
-            st.metric("Response Time", "120ms")
-            st.metric("API Calls", "1.2k/min")
-            st.metric("Error Rate", "0.1%")
+            rows = snapshot()
+            if not rows:
+                st.info("No calls recorded yet.")
+            else:
+                by_op = {r["op"]: r for r in rows}
+                op = st.selectbox("Operation", list(by_op), key="perf_op")
+                row = by_op[op]
+                st.caption(f"Last 5 minutes: {row['window_calls']} calls")
+                p1, p2, p3 = st.columns(3)
+                p1.metric("p50", f"{row['p50_ms']:.0f}ms")
+                p2.metric("p95", f"{row['p95_ms']:.0f}ms")
+                p3.metric("p99", f"{row['p99_ms']:.0f}ms")
+                r1, r2 = st.columns(2)
+                r1.metric("Calls", f"{row['calls_per_min']:.1f}/min")
+                r2.metric("Error Rate", f"{row['error_rate']:.1%}")
+                with st.expander("All operations"):
+                    st.dataframe(rows, use_container_width=True)
+                with st.expander("Prometheus metrics"):
+                    text = render_prometheus()
+                    st.code(text, language="text")
+                    st.download_button("Download metrics", text, file_name="metrics.prom", mime="text/plain")
     
     with tabs[1]:
         st.subheader("Data Management")
@@ -715,12 +818,13 @@ def admin_page():
 
     with tabs[3]:
         st.subheader("Agent Debug & Diagnostics")
-        advisor = st.session_state.get("agentic_advisor")
+        advisor = shared_advisor()
         if not advisor:
             st.warning("AgenticAdvisor not initialized.")
             if st.button("Initialize AgenticAdvisor"):
                 try:
-                    st.session_state.agentic_advisor = AgenticAdvisor()
+                    reset_resource("agentic_advisor")
+                    get_resource("agentic_advisor")
                     st.success("AgenticAdvisor initialized.")
                     st.rerun()
                 except Exception as e:
@@ -740,8 +844,10 @@ def admin_page():
                     names = sel if sel else None
                     with st.spinner("Dispatching to agents..."):
                         try:
-                            results = advisor.crew.dispatch(test_query, agent_names=names)
+                            with trace("debug.dispatch", query=test_query[:80]) as root:
+                                results = advisor.crew.dispatch(test_query, agent_names=names)
                             st.session_state.last_agent_debug = results
+                            st.session_state.last_trace_id = root.trace_id
                             st.success("Agents responded. See 'Last Raw Responses' below.")
                         except Exception as e:
                             st.error(f"Dispatch failed: {e}")
@@ -751,6 +857,7 @@ def admin_page():
                         try:
                             agg = advisor.respond(test_query)
                             st.session_state.last_agent_agg = agg
+                            st.session_state.last_trace_id = agg.get("trace_id")
                             st.success("Aggregated response ready. See 'Last Aggregated Response' below.")
                         except Exception as e:
                             st.error(f"Aggregate failed: {e}")
@@ -760,7 +867,11 @@ def admin_page():
             if last:
                 for name, res in last.items():
                     with st.expander(name, expanded=False):
-                        st.json(res)
+                        if "error" in res:
+                            st.error(res["error"])
+                        st.write(res.get("text") or res.get("response") or "(no text)")
+                        if res.get("resources"):
+                            st.caption(f"{len(res['resources'])} resources")
                 # Save raw responses
                 col_raw_a, col_raw_b = st.columns(2)
                 with col_raw_a:
@@ -792,7 +903,8 @@ def admin_page():
                 for r in agg.get("resources", []):
                     st.write(f"- {r}")
                 st.markdown("**Per-agent results**")
-                st.json(agg.get("agent_results"))
+                for name, res in (agg.get("agent_results") or {}).items():
+                    st.markdown(f"- `{name}`: {'❌ ' + res['error'] if 'error' in res else '✅'}")
                 # Allow saving/downloading of the aggregated response
                 col_save_a, col_save_b = st.columns(2)
                 with col_save_a:
@@ -815,6 +927,51 @@ def admin_page():
             else:
                 st.info("No aggregated response yet. Run 'Run Aggregated Response'.")
 
+            st.markdown("### Traces")
+            traces = recent_traces()
+            if traces:
+                ids = [t.trace_id for t in traces]
+                last_id = st.session_state.get("last_trace_id")
+                picked = st.selectbox(
+                    "Trace:", ids, index=ids.index(last_id) if last_id in ids else 0,
+                    format_func=lambda i: next(f"{t.root.name} · {t.root.duration_ms:.0f}ms · {i[:8]}"
+                                               for t in traces if t.trace_id == i),
+                )
+                render_trace_waterfall(picked)
+                picked_trace = get_trace(picked)
+                if picked_trace:
+                    with st.expander("Spans (OpenTelemetry JSON)"):
+                        st.json(picked_trace.to_dict())
+            else:
+                st.info("No traces yet. Run a test query.")
+
+            st.markdown("### CPU Profiler")
+            prof = profiler.status()
+            if prof["running"]:
+                st.info(f"Profiling all threads... {prof['samples']} samples so far.")
+                pc_a, pc_b = st.columns(2)
+                if pc_a.button("Refresh", key="prof_refresh"):
+                    st.rerun()
+                if pc_b.button("Stop now", key="prof_stop"):
+                    profiler.stop()
+                    st.rerun()
+            else:
+                pc_a, pc_b = st.columns(2)
+                seconds = pc_a.number_input("Capture seconds", min_value=1, max_value=600, value=30, key="prof_secs")
+                hz = pc_b.selectbox("Sample rate (Hz)", [10, 50, 100], index=2, key="prof_hz")
+                if st.button("Start profiling", key="prof_start"):
+                    profiler.start(duration_s=float(seconds), interval_s=1.0 / hz)
+                    st.rerun()
+                if prof["top"]:
+                    st.markdown(f"**Last capture:** {prof['samples']} samples — top functions by self time")
+                    st.dataframe([dict(r, share=f"{r['share']:.1%}") for r in prof["top"]], use_container_width=True)
+            profiles = profiler.list_profiles()
+            if profiles:
+                picked_profile = st.selectbox("Saved profiles:", profiles, key="prof_file")
+                with open(os.path.join(profiler.PROFILE_DIR, picked_profile), "rb") as fh:
+                    st.download_button(f"Download {picked_profile}", fh, file_name=picked_profile, key="prof_dl")
+                st.caption("Open .speedscope.json in speedscope.app; feed .collapsed to flamegraph.pl.")
+
             st.markdown("### Debug Logs History")
             log_files = get_debug_file_list()
             if log_files:
@@ -841,9 +998,10 @@ def admin_page():
                 if key_input:
                     try:
                         os.environ["OPENAI_API_KEY"] = key_input
-                        # Re-initialize career bot to pick up new key
+                        # Re-initialize the shared career bot to pick up new key
                         try:
-                            st.session_state.career_bot = CareerChatbot()
+                            reset_resource("career_bot")
+                            get_resource("career_bot")
                         except Exception:
                             pass
                         st.success("OPENAI_API_KEY set for this process. Restart the app for full effect.")
@@ -854,7 +1012,8 @@ def admin_page():
 
             if st.button("Re-register default agents"):
                 try:
-                    st.session_state.agentic_advisor = AgenticAdvisor()
+                    reset_resource("agentic_advisor")
+                    get_resource("agentic_advisor")
                     st.success("Re-registered agents.")
                     st.rerun()
                 except Exception as e:
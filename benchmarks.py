@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+"""
+Reproducible performance benchmarks for retrieval, agent dispatch and storage.
+
+Suites:
+  vector_db  - add_documents (bulk + incremental) and query_vector_db (cold/cached)
+               over synthetic corpora (default 1k and 100k docs; pass --sizes 1k,100k,1m)
+  crew       - CrewAI.dispatch with stub LLM agents of configurable latency
+  saved      - saved_resources_store save/list with growing histories
+  database   - database.py reads/writes from concurrent threads on a scratch DB
+  careers    - CareerIndex.top_k over a synthetic 50k-career catalog, and skill
+               extraction from profile-sized text
+
+Everything is seeded and runs offline. Results go to JSON; with --baseline the run
+is compared against a stored result and exits 1 on any p50 regression beyond
+--tolerance.
+
+Usage:
+    python benchmarks.py                                   # all suites, prints a table
+    python benchmarks.py --save-baseline                   # record benchmarks_baseline.json
+    python benchmarks.py --baseline benchmarks_baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+DEFAULT_SIZES = ["1k", "100k"]
+DEFAULT_OUT = "benchmark_results.json"
+DEFAULT_BASELINE = "benchmarks_baseline.json"
+SUITES = ["vector_db", "crew", "saved", "database", "careers"]
+
+_TOPICS = ["python", "statistics", "machine learning", "deep learning", "cloud", "devops", "security",
+           "data engineering", "sql", "web development", "react", "kubernetes", "career", "resume",
+           "interview", "portfolio", "research", "nlp", "computer vision", "product management"]
+_KINDS = ["Intro to", "Advanced", "Hands-on", "Foundations of", "Project-based", "Certificate in"]
+_WORDS = ["learn", "build", "deploy", "analyze", "design", "practice", "projects", "fundamentals",
+          "systems", "pipelines", "models", "skills", "tools", "labs", "exercises", "case studies"]
+
+
+def parse_size(size: str) -> int:
+    size = size.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(size[-1:], 1)
+    return int(float(size.rstrip("km")) * mult)
+
+
+def synthetic_corpus(n: int, seed: int = 42) -> List[str]:
+    """n deterministic resource descriptions shaped like the demo documents."""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        topic = rng.choice(_TOPICS)
+        words = " ".join(rng.choice(_WORDS) for _ in range(8))
+        docs.append(f"{rng.choice(_KINDS)} {topic.title()} #{i}: {words} in {topic}.")
+    return docs
+
+
+def measure(fn: Callable[[], object], repeat: int = 5, warmup: int = 1) -> dict:
+    """Run fn `warmup` + `repeat` times; latency stats in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(0.95 * len(samples)))],
+        "min_ms": samples[0],
+    }
+
+
+class StubLLM:
+    """Offline stand-in for OpenAIClient.chat with configurable latency (ms, gaussian jitter)."""
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 5.0, seed: int = 7):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def chat(self, prompt: str, system: str = None, temperature: float = 0.2) -> str:
+        with self._lock:
+            delay = max(0.0, self._rng.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        time.sleep(delay)
+        return f"stub answer ({len(prompt)} chars)"
+
+
+# ---- suites ---------------------------------------------------------------
+
+def bench_vector_db(sizes: List[str], repeat: int) -> Dict[str, dict]:
+    import vector_db
+
+    results = {}
+    queries = ["machine learning projects", "cloud devops pipelines", "resume interview skills",
+               "statistics fundamentals", "kubernetes systems"]
+    try:
+        for size in sizes:
+            n = parse_size(size)
+            corpus = synthetic_corpus(n)
+
+            def bulk():
+                vector_db.reset_index()
+                vector_db.add_documents(corpus)
+
+            results[f"vector_db.add_documents.bulk[{size}]"] = measure(bulk, repeat=max(1, repeat // 2), warmup=0)
+            extra = iter(synthetic_corpus(100 * (repeat + 1), seed=n))
+            results[f"vector_db.add_documents.incremental100[{size}]"] = measure(
+                lambda: vector_db.add_documents([next(extra) for _ in range(100)]), repeat=repeat, warmup=0)
+
+            cold = iter([f"{q} {i}" for i in range(repeat + 1) for q in queries])
+            results[f"vector_db.query.cold[{size}]"] = measure(
+                lambda: vector_db.query_vector_db(next(cold), top_k=5), repeat=repeat, warmup=0)
+            results[f"vector_db.query.cached[{size}]"] = measure(
+                lambda: vector_db.query_vector_db(queries[0], top_k=5), repeat=repeat * 10)
+            results[f"vector_db.query.cold[{size}]"]["backend"] = vector_db.index_info()["backend"]
+    finally:
+        vector_db.reset_index()
+    return results
+
+
+def bench_crew(latency_ms: float, repeat: int, n_agents: int = 3) -> Dict[str, dict]:
+    from crewai import CrewAI
+
+    llm = StubLLM(latency_ms=latency_ms)
+    crew = CrewAI()
+    for i in range(n_agents):
+        crew.register_agent(f"agent_{i}", lambda request, i=i: {"text": llm.chat(f"agent {i}: {request}")})
+    stats = measure(lambda: crew.dispatch("How do I become a Data Scientist?"), repeat=repeat)
+    # with agents in parallel, dispatch should cost ~one LLM latency, not n_agents of them
+    stats["overhead_ms"] = stats["p50_ms"] - latency_ms
+    return {f"crew.dispatch[{n_agents}x{latency_ms:g}ms]": stats}
+
+
+def bench_saved_resources(histories: List[int], repeat: int) -> Dict[str, dict]:
+    import saved_resources_store as store
+
+    results = {}
+    orig_dir, orig_file = store.STORE_DIR, store.STORE_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            store.STORE_DIR = Path(tmp)
+            store.STORE_FILE = store.STORE_DIR / "saved_resources.json"
+            for n in histories:
+                history = [{"id": i, "title": doc, "source": "benchmark", "saved_at": "Mon Jan  1 00:00:00 2024"}
+                           for i, doc in enumerate(synthetic_corpus(n, seed=n))]
+                store.STORE_FILE.write_text(json.dumps(history), encoding="utf-8")
+                results[f"saved.list_resources[{n}]"] = measure(store.list_resources, repeat=repeat)
+                results[f"saved.save_resource[{n}]"] = measure(
+                    lambda: store.save_resource({"title": "Benchmark", "source": "benchmark"}), repeat=repeat)
+        finally:
+            store.STORE_DIR, store.STORE_FILE = orig_dir, orig_file
+    return results
+
+
+def bench_database(threads: int, ops_per_thread: int) -> Dict[str, dict]:
+    try:
+        import database
+    except ImportError as e:
+        return {"database.concurrent": {"skipped": f"database.py unavailable: {e}"}}
+
+    results = {}
+    orig_path = database.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            database.DB_PATH = str(Path(tmp) / "bench.db")
+            database.init_db()
+            for t in range(threads):
+                database.create_user(f"bench{t}", "pw", f"bench{t}@example.com")
+
+            def worker(t):
+                samples = []
+                for i in range(ops_per_thread):
+                    start = time.perf_counter()
+                    if i % 4 == 0:
+                        database.update_user_profile(t + 1, {
+                            "full_name": f"Bench {t}", "education_level": "BSc", "skills": "python, sql",
+                            "interests": "data", "career_goals": "data scientist"})
+                    else:
+                        database.get_user_profile(t + 1)
+                    samples.append((time.perf_counter() - start) * 1000)
+                return samples
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                samples = sorted(s for chunk in pool.map(worker, range(threads)) for s in chunk)
+            wall = time.perf_counter() - start
+            results[f"database.mixed[{threads}threads]"] = {
+                "n": len(samples),
+                "mean_ms": statistics.fmean(samples),
+                "p50_ms": statistics.median(samples),
+                "p95_ms": samples[int(0.95 * (len(samples) - 1))],
+                "min_ms": samples[0],
+                "ops_per_s": len(samples) / wall,
+            }
+        finally:
+            database.DB_PATH = orig_path
+    return results
+
+
+def bench_careers(n: int, repeat: int) -> Dict[str, dict]:
+    from career_match import CareerIndex
+
+    rng = random.Random(n)
+    skills = [f"skill {i}" for i in range(2_000)]
+    industries = ["Technology", "Healthcare", "Finance", "Education", "Manufacturing"]
+    careers = [{"title": f"Occupation {i}", "industry": rng.choice(industries), "salary_min": 50_000,
+                "salary_max": 120_000, "growth_rate": rng.random() * 25, "description": "synthetic",
+                "skills": {rng.choice(skills): rng.randint(1, 3) for _ in range(8)}} for i in range(n)]
+    index = CareerIndex(careers, industries)
+    user = {s: rng.randint(1, 5) for s in rng.sample(skills, 40)}
+    label = f"{n // 1000}k" if n >= 1000 else str(n)
+    profile_text = ("Data analyst with Python, SQL and Tableau experience; learning scikit-learn, "
+                    "k8s and React. Strong communication and problem-solving. ") * 15
+    return {
+        f"careers.top_k[{label}]": measure(lambda: index.top_k(user, k=10), repeat=repeat),
+        f"careers.top_k.filtered[{label}]": measure(
+            lambda: index.top_k(user, k=10, industry="Finance", experience="Entry Level"), repeat=repeat),
+        "skills.extract[2kb]": measure(lambda: index.taxonomy.extract(profile_text), repeat=repeat),
+    }
+
+
+# ---- runner / comparison ----------------------------------------------------
+
+def run_benchmarks(suites: List[str] = None, sizes: List[str] = None, repeat: int = 5,
+                   llm_latency_ms: float = 50.0, histories: List[int] = None,
+                   db_threads: int = 8, db_ops: int = 50, careers: int = 50_000) -> dict:
+    suites = suites or SUITES
+    results: Dict[str, dict] = {}
+    if "vector_db" in suites:
+        results.update(bench_vector_db(sizes or DEFAULT_SIZES, repeat))
+    if "crew" in suites:
+        results.update(bench_crew(llm_latency_ms, repeat))
+    if "saved" in suites:
+        results.update(bench_saved_resources(histories or [100, 1_000, 10_000], repeat))
+    if "database" in suites:
+        results.update(bench_database(db_threads, db_ops))
+    if "careers" in suites:
+        results.update(bench_careers(careers, repeat))
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "suites": suites,
+            "sizes": sizes or DEFAULT_SIZES,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.25) -> List[dict]:
+    """Benchmarks whose p50 got slower than baseline by more than `tolerance` (fraction)."""
+    regressions = []
+    base = baseline.get("results", {})
+    for name, stats in current.get("results", {}).items():
+        old = base.get(name, {})
+        if "p50_ms" not in stats or not old.get("p50_ms"):
+            continue
+        ratio = stats["p50_ms"] / old["p50_ms"]
+        if ratio > 1 + tolerance:
+            regressions.append({"name": name, "baseline_ms": old["p50_ms"], "current_ms": stats["p50_ms"],
+                                "ratio": ratio})
+    return regressions
+
+
+def _print_table(report: dict):
+    print(f"{'benchmark':55} {'p50 ms':>10} {'p95 ms':>10} {'n':>6}")
+    for name, s in report["results"].items():
+        if "skipped" in s:
+            print(f"{name:55} {'skipped: ' + s['skipped']}")
+            continue
+        print(f"{name:55} {s['p50_ms']:10.3f} {s['p95_ms']:10.3f} {s['n']:6d}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--suites", default=",".join(SUITES), help="comma-separated subset of " + ",".join(SUITES))
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES), help="vector_db corpus sizes, e.g. 1k,100k,1m")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--db-threads", type=int, default=8)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write results to {DEFAULT_BASELINE}")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(suites=args.suites.split(","), sizes=args.sizes.split(","), repeat=args.repeat,
+                            llm_latency_ms=args.llm_latency_ms, db_threads=args.db_threads)
+    _print_table(report)
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nResults written to {args.out}")
+    if args.save_baseline:
+        Path(DEFAULT_BASELINE).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Baseline written to {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['name']}: {r['baseline_ms']:.3f}ms -> {r['current_ms']:.3f}ms ({r['ratio']:.2f}x)")
+        if regressions:
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
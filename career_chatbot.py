@@ -1,14 +1,22 @@
 from openai_client import OpenAIClient
 from hf_client import HuggingFaceClient
+from provider_router import ProviderRouter
+
+
+def _is_usable_response(text: str) -> bool:
+    """Reject empty/very short answers and the error strings the clients return."""
+    text = (text or "").strip()
+    return len(text) > 10 and not text.startswith("OpenAI request failed")
 
 
 class CareerChatbot:
     """CareerChatbot used by the frontend.
 
-    Behavior (priority order):
+    Behavior (priority order, routed by `ProviderRouter`):
     1. Try OpenAI if API key present → live GPT response
-    2. Fall back to Hugging Face if token present → live HF response
-    3. Fall back to deterministic canned responses (works offline)
+    2. Hedge to Hugging Face if token present and OpenAI is slow or failing
+    3. Fall back to deterministic canned responses (works offline, and
+       immediately when both provider circuits are open)
     """
     def __init__(self):
         self.name = "CareerBot"
@@ -25,31 +33,32 @@ class CareerChatbot:
         except Exception:
             pass
 
+        # Providers in priority order; the router hedges to the next one and
+        # trips a per-provider circuit breaker when one is slow or failing.
+        providers = []
+        if self.openai_client and getattr(self.openai_client, 'api_key', None):
+            providers.append(("openai", self._ask_openai))
+        if self.hf_client and getattr(self.hf_client, 'api_key', None):
+            providers.append(("huggingface", self._ask_huggingface))
+        self.router = ProviderRouter(providers, fallback=self._fallback_response, accept=_is_usable_response)
+
+    def _ask_openai(self, user_message: str, timeout: float) -> str:
+        prompt = f"You are a helpful career advisor. Answer concisely with practical advice: {user_message}"
+        return self.openai_client.chat(prompt, timeout=timeout)
+
+    def _ask_huggingface(self, user_message: str, timeout: float) -> str:
+        return self.hf_client.generate(user_message, max_length=150, timeout=timeout)
+
     def get_response(self, user_message: str) -> str:
         user_message = (user_message or "").strip()
         if not user_message:
             return "Can you provide more details about your question?"
 
-        # **Priority 1**: OpenAI (fastest, best quality)
-        try:
-            if self.openai_client and getattr(self.openai_client, 'api_key', None):
-                prompt = f"You are a helpful career advisor. Answer concisely with practical advice: {user_message}"
-                resp = self.openai_client.chat(prompt)
-                if resp and isinstance(resp, str) and len(resp.strip()) > 10:
-                    return resp.strip()
-        except Exception:
-            pass
-
-        # **Priority 2**: Hugging Face (backup LLM)
-        try:
-            if self.hf_client and getattr(self.hf_client, 'api_key', None):
-                resp = self.hf_client.generate(user_message, max_length=150)
-                if resp and isinstance(resp, str) and len(resp.strip()) > 10:
-                    return resp.strip()
-        except Exception:
-            pass
+        _, text = self.router.route(user_message)
+        return text
 
-        # **Priority 3**: Deterministic fallback (always works, offline-ready)
+    def _fallback_response(self, user_message: str) -> str:
+        # Deterministic fallback (always works, offline-ready)
         q = user_message.lower()
         if "resume" in q or "cv" in q:
             return "To improve your resume, highlight impact-driven bullets, quantify results, and tailor it to the role you're applying for. Use a professional format and proofread carefully."
@@ -1,105 +1,102 @@
+"""
+Career path recommendations and skill roadmaps from a data catalog.
+
+The role knowledge lives in config/career_paths.json as tracks: routing
+keywords, the career paths to suggest, learning resources, advice and a
+roadmap. CareerPathCatalog compiles it once per process into
+
+- one keyword matcher (Aho-Corasick, shared with the skill taxonomy) mapping
+  every keyword to its track
+- a role -> roadmap table keyed by normalized role title
+
+so recommend_path() is one automaton pass plus a dict fetch, and
+get_skill_roadmap() is a dict fetch (falling back to the keyword pass for
+titles the catalog doesn't list), however many roles the catalog holds.
+"""
+import copy
+import json
+import os
+from typing import Dict, List, Optional
+
+from skill_taxonomy import KeywordMatcher, normalize
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "career_paths.json")
+
+
+class CareerPathCatalog:
+    def __init__(self, data: dict):
+        self.tracks: List[dict] = data["tracks"]
+        self.empty_interest: dict = data["empty_interest"]
+        self.fallback: dict = data["fallback"]
+
+        keywords: Dict[str, int] = {}
+        self.roadmaps: Dict[str, dict] = {}
+        self.responses: List[dict] = []
+        for tid, track in enumerate(self.tracks):
+            for keyword in track["keywords"]:
+                key = normalize(keyword)
+                if keywords.setdefault(key, tid) != tid:
+                    raise ValueError(f"keyword '{keyword}' routes to both "
+                                     f"{self.tracks[keywords[key]]['name']} and {track['name']}")
+            for path in track["career_paths"]:
+                self.roadmaps.setdefault(normalize(path["role"]), path.get("roadmap", track["roadmap"]))
+            self.responses.append({
+                "career_paths": [{k: v for k, v in path.items() if k != "roadmap"} for path in track["career_paths"]],
+                "learning_resources": track["learning_resources"],
+                "additional_advice": track["additional_advice"],
+            })
+        self.matcher = KeywordMatcher(keywords)
+
+    @classmethod
+    def load(cls, path: str = CATALOG_PATH) -> "CareerPathCatalog":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def route(self, text: str) -> Optional[int]:
+        """Track id with the most keyword hits in `text` (catalog order breaks ties), or None."""
+        hits = [0] * len(self.tracks)
+        for _, _, tid in self.matcher.find(text):
+            hits[tid] += 1
+        best = max(range(len(hits)), key=lambda t: (hits[t], -t), default=None)
+        return best if best is not None and hits[best] else None
+
+    def roadmap(self, role: str) -> dict:
+        found = self.roadmaps.get(normalize(role))
+        if found is None:
+            tid = self.route(role)
+            found = self.tracks[tid]["roadmap"] if tid is not None else self.fallback["roadmap"]
+        return found
+
+
 class CareerGuidanceSystem:
-    """Minimal CareerGuidanceSystem stub for UI demo.
-    Provides deterministic recommendations and simple roadmaps so the frontend works
-    without external services. Replace with your real logic later.
+    """Deterministic recommendations and roadmaps for the Career Guidance tabs.
+
+    Works without external services; all role knowledge comes from the shared
+    CareerPathCatalog. Returned dicts are copies, so callers may modify them.
     """
-    def __init__(self, user_name: str = "User"):
+    def __init__(self, user_name: str = "User", catalog: CareerPathCatalog = None):
         self.user_name = user_name
+        if catalog is None:
+            from shared_resources import get_resource
+            catalog = get_resource("career_paths")
+        self.catalog = catalog
 
     def recommend_path(self, interest: str):
         interest = (interest or "").strip().lower()
         if not interest:
-            return {
-                "message": "No interest provided. Please enter an area of interest.",
-                "foundations": ["Basic computer skills", "Problem solving", "Communication"],
-                "next_steps": ["Clarify your interests", "Try beginner projects"]
-            }
-
-        # Simple demo recommendations based on keywords
-        if "data" in interest or "machine" in interest or "ml" in interest:
-            career_paths = [
-                {
-                    "role": "Data Scientist",
-                    "skills": ["Python", "Statistics", "Machine Learning", "SQL", "Data Visualization"],
-                    "education": ["Bachelor's in CS/Statistics", "Masters (optional)"],
-                    "timeline": "1-3 years to junior, 3-5 years to mid",
-                    "market_outlook": "High demand across industries"
-                },
-                {
-                    "role": "Machine Learning Engineer",
-                    "skills": ["Python", "Deep Learning", "Model Deployment", "APIs"],
-                    "education": ["Bachelor's in CS/EE", "Specialized ML courses"],
-                    "timeline": "2-4 years",
-                    "market_outlook": "Growing demand, especially in product teams"
-                }
-            ]
-            return {
-                "career_paths": career_paths,
-                "learning_resources": [
-                    "Intro to Machine Learning (Coursera)",
-                    "Hands-on ML Projects (Kaggle)",
-                    "Deep Learning Specialization"
-                ],
-                "additional_advice": [
-                    "Build end-to-end projects to demonstrate impact.",
-                    "Contribute to open-source and publish notebooks."
-                ]
-            }
-
-        if "web" in interest or "frontend" in interest or "full stack" in interest:
-            career_paths = [
-                {
-                    "role": "Full Stack Developer",
-                    "skills": ["JavaScript", "React", "Node.js", "Databases", "Testing"],
-                    "education": ["Bachelor's in CS or equivalent experience"],
-                    "timeline": "1-2 years",
-                    "market_outlook": "Steady demand across startups and enterprises"
-                }
-            ]
-            return {
-                "career_paths": career_paths,
-                "learning_resources": [
-                    "Full Stack Web Development (freeCodeCamp)",
-                    "React Courses (Codecademy/Coursera)"
-                ],
-                "additional_advice": ["Build portfolio projects", "Learn deployment and CI/CD"]
-            }
-
-        # Default fallback
-        return {
-            "career_paths": [
-                {
-                    "role": f"{interest.title()} Specialist",
-                    "skills": ["Foundational skills relevant to the domain"],
-                    "education": ["Domain-specific coursework"],
-                    "timeline": "Varies",
-                    "market_outlook": "Check industry reports"
-                }
-            ],
-            "learning_resources": ["General online courses", "Introductory tutorials"],
-            "additional_advice": ["Talk to industry professionals", "Try small projects"]
-        }
+            return copy.deepcopy(self.catalog.empty_interest)
+
+        tid = self.catalog.route(interest)
+        if tid is not None:
+            return copy.deepcopy(self.catalog.responses[tid])
+
+        fallback = copy.deepcopy({k: v for k, v in self.catalog.fallback.items() if k != "roadmap"})
+        for path in fallback["career_paths"]:
+            path["role"] = path["role"].format(interest=interest.title())
+        return fallback
 
     def get_skill_roadmap(self, role: str):
-        role = (role or "").strip().lower()
-        if "data" in role or "machine" in role or "ml" in role:
-            return {
-                "skills": ["Python", "Machine Learning", "Statistics", "SQL", "Data Visualization"],
-                "education": ["Bachelor's in relevant field", "Online ML courses"],
-                "timeline": "1-4 years depending on background",
-                "market_outlook": "Strong demand and growth"
-            }
-        if "full stack" in role or "web" in role:
-            return {
-                "skills": ["HTML/CSS", "JavaScript", "React", "Node.js", "Databases"],
-                "education": ["Practical projects", "Bootcamps (optional)"],
-                "timeline": "6 months - 2 years",
-                "market_outlook": "Stable demand"
-            }
-        # Generic fallback
-        return {
-            "skills": ["Core skills relevant to the role"],
-            "education": ["Foundational courses and projects"],
-            "timeline": "Varies by role",
-            "market_outlook": "Check local job market"
-        }
\ No newline at end of file
+        return copy.deepcopy(self.catalog.roadmap(role or ""))
+
+
+__all__ = ["CareerGuidanceSystem", "CareerPathCatalog", "CATALOG_PATH"]
@@ -0,0 +1,160 @@
+"""
+Vectorized career match scoring for the Careers page.
+
+The career catalog (config/careers.json) is loaded once into columnar arrays:
+- a career x skill sparse matrix in CSR form (indptr / indices / weights)
+- int8 industry codes, a uint8 experience-level bitmask, float32 salary bands and growth
+- one lowercase search string per career
+
+Skill names go through the skill taxonomy (skill_taxonomy.py), so synonyms
+("ML", "k8s") land on the same column and a rated skill also gives partial
+credit to its ancestors (TensorFlow counts towards Deep Learning).
+
+Scoring a user's skill vector against every career is a single sparse
+matrix-vector product (np.bincount over the nonzeros), filters are boolean
+masks, and the top k come from np.argpartition, so a 50k-career catalog still
+scores in a few milliseconds on every Streamlit rerun.
+
+Usage:
+    index = CareerIndex.load()
+    index.top_k({"Python": 4, "SQL": 3}, k=5, industry="Technology", experience="Entry Level")
+"""
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from skill_taxonomy import SkillTaxonomy
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "careers.json")
+MAX_RATING = 5.0
+# share of a skill's proficiency credited to each of its ancestors in the taxonomy
+ANCESTOR_CREDIT = 0.5
+# where in the salary band each experience level sits (0 = min, 1 = max)
+LEVEL_BAND_POSITION = {"Entry Level": 0.0, "Mid Level": 0.5, "Senior Level": 1.0, "Executive": 1.0}
+
+SkillInput = Union[Dict[str, float], Iterable[str]]
+
+
+class CareerIndex:
+    def __init__(self, careers: List[dict], industries: List[str] = None, experience_levels: List[str] = None,
+                 taxonomy: SkillTaxonomy = None):
+        self.careers = careers
+        self.taxonomy = taxonomy if taxonomy is not None else SkillTaxonomy.load()
+        self.industries = industries or sorted({c["industry"] for c in careers})
+        self.experience_levels = experience_levels or list(LEVEL_BAND_POSITION)
+        industry_code = {name: i for i, name in enumerate(self.industries)}
+        level_bit = {name: 1 << i for i, name in enumerate(self.experience_levels)}
+
+        indptr, indices, weights = [0], [], []
+        for c in careers:
+            for skill, weight in c["skills"].items():
+                indices.append(self.taxonomy.intern(skill))
+                weights.append(weight)
+            indptr.append(len(indices))
+
+        n = len(careers)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        # row id of every nonzero, so the mat-vec is one bincount
+        self.rows = np.repeat(np.arange(n, dtype=np.int32), np.diff(self.indptr))
+        self.weight_sums = np.maximum(np.bincount(self.rows, weights=self.weights, minlength=n), 1e-9).astype(np.float32)
+        self.industry = np.asarray([industry_code[c["industry"]] for c in careers], dtype=np.int8)
+        self.level_mask = np.asarray([sum(level_bit[lv] for lv in c.get("experience_levels", self.experience_levels))
+                                      for c in careers], dtype=np.uint8)
+        self.salary_min = np.asarray([c["salary_min"] for c in careers], dtype=np.float32)
+        self.salary_max = np.asarray([c["salary_max"] for c in careers], dtype=np.float32)
+        self.growth = np.asarray([c["growth_rate"] for c in careers], dtype=np.float32)
+        self.by_title = {c["title"].lower(): i for i, c in enumerate(careers)}
+        self.search_text = np.asarray([f"{c['title']} {c['description']} {' '.join(c['skills'])}".lower()
+                                       for c in careers])
+
+    @classmethod
+    def load(cls, path: str = CATALOG_PATH, taxonomy: SkillTaxonomy = None) -> "CareerIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["careers"], data.get("industries"), data.get("experience_levels"), taxonomy)
+
+    @property
+    def skill_names(self) -> List[str]:
+        return self.taxonomy.names
+
+    def __len__(self) -> int:
+        return len(self.careers)
+
+    def career(self, title: str) -> Optional[dict]:
+        i = self.by_title.get((title or "").strip().lower())
+        return None if i is None else self.careers[i]
+
+    def skill_vector(self, skills: SkillInput) -> np.ndarray:
+        """Dense 0..1 proficiency per taxonomy skill; accepts {skill: 0-5 rating} or a list of skills."""
+        vec = np.zeros(len(self.taxonomy), dtype=np.float32)
+        items = skills.items() if isinstance(skills, dict) else ((s, MAX_RATING) for s in skills)
+        for skill, rating in items:
+            sid = self.taxonomy.resolve(skill)
+            if sid is None:
+                continue
+            level = min(float(rating), MAX_RATING) / MAX_RATING
+            vec[sid] = max(vec[sid], level)
+            for depth, anc in enumerate(self.taxonomy.ancestors(sid), 1):
+                credit = level * ANCESTOR_CREDIT ** depth
+                vec[anc] = max(vec[anc], credit)
+        return vec
+
+    def scores(self, user_vec: np.ndarray) -> np.ndarray:
+        """Weighted skill coverage (0..1) of every career: one sparse mat-vec."""
+        contrib = self.weights * user_vec[self.indices]
+        return (np.bincount(self.rows, weights=contrib, minlength=len(self)) / self.weight_sums).astype(np.float32)
+
+    def mask(self, industry: Optional[str] = None, experience: Optional[str] = None,
+             search: Optional[str] = None) -> np.ndarray:
+        keep = np.ones(len(self), dtype=bool)
+        if industry and industry != "All":
+            code = self.industries.index(industry) if industry in self.industries else -1
+            keep &= self.industry == code
+        if experience in self.experience_levels:
+            keep &= (self.level_mask & np.uint8(1 << self.experience_levels.index(experience))) != 0
+        term = (search or "").strip().lower()
+        if term:
+            keep &= np.char.find(self.search_text, term) >= 0
+        return keep
+
+    def top_k(self, skills: SkillInput, k: int = 10, industry: str = None, experience: str = None,
+              search: str = None) -> List[dict]:
+        """Best-matching careers after filters, highest score first (growth breaks ties)."""
+        user_vec = self.skill_vector(skills)
+        scores = self.scores(user_vec)
+        keep = self.mask(industry, experience, search)
+        candidates = np.flatnonzero(keep)
+        if candidates.size == 0:
+            return []
+        rank = scores[candidates] + self.growth[candidates] * 1e-4
+        k = min(k, candidates.size)
+        top = candidates[np.argpartition(-rank, k - 1)[:k]]
+        top = top[np.argsort(-(scores[top] + self.growth[top] * 1e-4), kind="stable")]
+        return [self._result(i, scores[i], user_vec, experience) for i in top]
+
+    def _result(self, i: int, score: float, user_vec: np.ndarray, experience: Optional[str]) -> dict:
+        c = self.careers[i]
+        ids = self.indices[self.indptr[i]:self.indptr[i + 1]]
+        pos = LEVEL_BAND_POSITION.get(experience)
+        if pos is None:
+            salary = f"${self.salary_min[i]:,.0f} - ${self.salary_max[i]:,.0f}"
+        else:
+            typical = self.salary_min[i] + pos * (self.salary_max[i] - self.salary_min[i])
+            salary = f"${self.salary_min[i]:,.0f} - ${self.salary_max[i]:,.0f} (typical ${typical:,.0f})"
+        return {
+            "title": c["title"],
+            "industry": c["industry"],
+            "salary_range": salary,
+            "growth_rate": f"{c['growth_rate']:g}%",
+            "match_score": int(round(float(score) * 100)),
+            "skills_required": list(c["skills"]),
+            "skills_matched": [self.skill_names[s] for s in ids if user_vec[s] > 0],
+            "description": c["description"],
+        }
+
+
+__all__ = ["CareerIndex", "CATALOG_PATH"]
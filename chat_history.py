@@ -0,0 +1,71 @@
+"""
+Windowed view over the AI Advisor chat history.
+
+The chat page used to render every message of the conversation, each with its
+full per-agent breakdown, on every rerun, so each turn got slower than the
+last. Now only the newest RECENT_MESSAGES are drawn. Older messages are
+reached through PAGE_SIZE pages that are drawn only while the user is
+browsing them. Agent metadata never sits in the session history: an
+assistant message keeps just the id of the advisor job that produced it.
+The breakdown is read back from the job store (jobs.py persists results)
+only when the user opens it. A rerun therefore costs the same no matter how
+long the conversation is.
+
+- user_message(text) / assistant_message(text, job_id=None): lightweight history entries
+- recent_window(history, recent): (index of first recent message, recent messages)
+- page_count(history, recent, page_size) / history_page(history, page, recent, page_size):
+  pages of older messages, page 1 being the newest of them
+- agent_metadata(message, jobs): the advisor result behind a message, loaded on demand
+
+Usage:
+    start, recent = recent_window(st.session_state.chat_history)
+    for offset, message in enumerate(recent):
+        render(start + offset, message)
+"""
+from typing import List, Optional, Tuple
+
+RECENT_MESSAGES = 10
+PAGE_SIZE = 20
+
+
+def user_message(text: str) -> dict:
+    return {"role": "user", "content": text}
+
+
+def assistant_message(text: str, job_id: Optional[str] = None) -> dict:
+    """Assistant entry; `job_id` points at the advisor job holding the agent breakdown."""
+    return {"role": "assistant", "content": text, "job_id": job_id}
+
+
+def recent_window(history: List[dict], recent: int = RECENT_MESSAGES) -> Tuple[int, List[dict]]:
+    """(index of the first message in the window, the newest `recent` messages)."""
+    start = max(len(history) - recent, 0)
+    return start, history[start:]
+
+
+def page_count(history: List[dict], recent: int = RECENT_MESSAGES, page_size: int = PAGE_SIZE) -> int:
+    older = max(len(history) - recent, 0)
+    return -(-older // page_size)
+
+
+def history_page(history: List[dict], page: int, recent: int = RECENT_MESSAGES,
+                 page_size: int = PAGE_SIZE) -> Tuple[int, List[dict]]:
+    """(index of its first message, messages) of one page of older history; page 1 is the newest."""
+    end = max(len(history) - recent - (page - 1) * page_size, 0)
+    start = max(end - page_size, 0)
+    return start, history[start:end]
+
+
+def agent_metadata(message: dict, jobs) -> Optional[dict]:
+    """Advisor result (combined_text, agent_results) for an assistant message, or None."""
+    if message.get("agent_response"):  # entries recorded before metadata moved out of the history
+        return message["agent_response"]
+    job_id = message.get("job_id")
+    if not job_id:
+        return None
+    job = jobs.get(job_id)
+    return job["result"] if job and job["status"] == "done" else None
+
+
+__all__ = ["RECENT_MESSAGES", "PAGE_SIZE", "user_message", "assistant_message", "recent_window",
+           "page_count", "history_page", "agent_metadata"]
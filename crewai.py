@@ -4,31 +4,254 @@ This is a local, simple implementation that mimics multi-agent orchestration:
 - register agents (callable objects)
 - dispatch a request to a set of agents
 - aggregate and return their responses
+- run a declarative task graph (agents plus input dependencies) on a worker pool
 
 This is intentionally simple and deterministic so the frontend can run without a network.
 """
-from typing import List, Dict, Callable
+import contextvars
+import copy
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Union
+from metrics import instrument
+from singleflight import fingerprint
+from tracing import span
+
+
+class TaskGraph:
+    """Declarative multi-agent workflow: named nodes, each running an agent on the
+    request plus the outputs of the nodes it depends on.
+
+    Usage:
+        graph = (TaskGraph()
+                 .add('academic', 'academic_advisor')
+                 .add('resources', 'resource_agent')
+                 .add('career', 'career_counselor', deps=['academic', 'resources']))
+        result = crew.run_graph(graph, "How do I become a Data Scientist?")
+
+    A node's agent is a registered agent name or a callable. Nodes without deps are
+    called as agent(request); nodes with deps as agent(request, inputs) where
+    `inputs` maps dep name -> that node's result dict.
+    """
+    def __init__(self):
+        self.nodes: Dict[str, dict] = {}
+
+    def add(self, name: str, agent: Union[str, Callable] = None, deps: List[str] = None) -> "TaskGraph":
+        if name in self.nodes:
+            raise ValueError(f"duplicate node '{name}'")
+        self.nodes[name] = {"agent": agent if agent is not None else name, "deps": list(deps or [])}
+        return self
+
+    def topological_order(self) -> List[str]:
+        """Return node names in dependency order; raises ValueError on unknown deps or cycles."""
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"cycle in task graph: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dep in self.nodes[name]["deps"]:
+                if dep not in self.nodes:
+                    raise ValueError(f"node '{name}' depends on unknown node '{dep}'")
+                visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name, [])
+        return order
+
+
+class GraphResult:
+    """Outputs and timing of one task-graph run.
+
+    - results: node -> result dict
+    - timings: node -> {start, end, duration, cached} in seconds since run start
+    - critical_path: the chain of nodes that determined the wall time
+    """
+    def __init__(self, results: Dict[str, dict], timings: Dict[str, dict], deps: Dict[str, List[str]]):
+        self.results = results
+        self.timings = timings
+        self.wall_s = max((t["end"] for t in timings.values()), default=0.0)
+        self.critical_path = self._critical_path(deps)
+        self.critical_path_s = sum(timings[n]["duration"] for n in self.critical_path)
+
+    def _critical_path(self, deps: Dict[str, List[str]]) -> List[str]:
+        if not self.timings:
+            return []
+        node = max(self.timings, key=lambda n: self.timings[n]["end"])
+        path = [node]
+        while deps.get(node):
+            node = max(deps[node], key=lambda d: self.timings[d]["end"])
+            path.append(node)
+        return list(reversed(path))
+
+    def as_dict(self) -> dict:
+        return {
+            "results": self.results,
+            "timings": self.timings,
+            "critical_path": self.critical_path,
+            "critical_path_s": self.critical_path_s,
+            "wall_s": self.wall_s,
+        }
+
 
 class CrewAI:
-    def __init__(self, agents: Dict[str, Callable] = None):
+    def __init__(self, agents: Dict[str, Callable] = None, max_workers: int = 4, memo_size: int = 256,
+                 on_agent_done: Callable[[str], None] = None):
         # agents is a dict name->callable(request)->dict
         self.agents = agents or {}
+        # called with the agent name once a registered agent returns or raises (in the worker's context)
+        self.on_agent_done = on_agent_done
+        self.max_workers = max_workers
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        # bumped on every (re-)registration so memoized results of a replaced handler go stale
+        self._versions: Dict[str, int] = {}
 
     def register_agent(self, name: str, handler: Callable):
         self.agents[name] = handler
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    def _agent_key(self, agent) -> Optional[tuple]:
+        """Stable memo identity of a node's agent; None if it has none (lambdas, closures)."""
+        if isinstance(agent, str):
+            return ("registered", agent, self._versions.get(agent, 0))
+        qualname = getattr(agent, "__qualname__", None)
+        if not qualname or "<" in qualname:
+            return None
+        return ("callable", getattr(agent, "__module__", ""), qualname)
 
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crew")
+            return self._executor
+
+    def _memo_get(self, key):
+        with self._memo_lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                hit = self._memo[key]
+            else:
+                return None
+        # callers own what they get back: mutating a result must not corrupt later hits
+        return copy.deepcopy(hit)
+
+    def _memo_put(self, key, value: dict):
+        value = copy.deepcopy(value)
+        with self._memo_lock:
+            self._memo[key] = value
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def _run_node(self, agent, request: str, inputs: Optional[Dict[str, dict]]) -> dict:
+        handler = self.agents.get(agent) if isinstance(agent, str) else agent
+        if handler is None:
+            return {"error": "agent_not_found"}
+        try:
+            res = handler(request) if inputs is None else handler(request, inputs)
+            return res if isinstance(res, dict) else {"response": res}
+        except Exception as e:
+            return {"error": str(e)}
+        finally:
+            if self.on_agent_done is not None and isinstance(agent, str):
+                self.on_agent_done(agent)
+
+    @instrument("crew.run_graph")
+    def run_graph(self, graph: TaskGraph, request: str, memoize: bool = True, context=None) -> GraphResult:
+        """Run `graph` for `request`, executing independent nodes in parallel.
+
+        With `memoize`, successful node results are cached per (request, context, node,
+        agent, upstream chain) so repeated runs of the same request skip finished work.
+        `context` is whatever per-user state the agents read (e.g. the profile); it only
+        feeds the memo key, so different users never share results. Nodes whose agent
+        is an anonymous callable (lambda, closure) are never memoized.
+        """
+        with span("crew.run_graph", nodes=len(graph.nodes), memoize=memoize) as s:
+            result = self._run_graph(graph, request, memoize, fingerprint(context))
+            s.set_attribute("critical_path", " -> ".join(result.critical_path))
+            return result
+
+    def _run_graph(self, graph: TaskGraph, request: str, memoize: bool, context_key: str) -> GraphResult:
+        order = graph.topological_order()
+        deps = {n: graph.nodes[n]["deps"] for n in order}
+        results: Dict[str, dict] = {}
+        timings: Dict[str, dict] = {}
+        memo_keys: Dict[str, Optional[tuple]] = {}
+        t0 = time.monotonic()
+        pool = self._pool()
+        running = {}
+
+        def memo_key(name):
+            agent_key = self._agent_key(graph.nodes[name]["agent"])
+            upstream = tuple(memo_keys[d] for d in deps[name])
+            if agent_key is None or None in upstream:
+                return None
+            return (request, context_key, name, agent_key, upstream)
+
+        def timed(name, agent, inputs):
+            start = time.monotonic() - t0
+            with span(f"agent:{name}", deps=len(deps[name])) as s:
+                res = self._run_node(agent, request, inputs)
+                if "error" in res:
+                    s.set_status("error", str(res["error"])[:200])
+            return name, res, start, time.monotonic() - t0
+
+        def launch_ready():
+            for name in order:
+                if name in results or name in running.values():
+                    continue
+                if any(d not in results for d in deps[name]):
+                    continue
+                memo_keys[name] = memo_key(name)
+                cached = self._memo_get(memo_keys[name]) if memoize and memo_keys[name] else None
+                if cached is not None:
+                    now = time.monotonic() - t0
+                    results[name] = cached
+                    timings[name] = {"start": now, "end": now, "duration": 0.0, "cached": True}
+                    with span(f"agent:{name}", cached=True):
+                        pass
+                    return True
+                inputs = {d: results[d] for d in deps[name]} if deps[name] else None
+                # carry the caller's context (prompt-budget turn, tracing) into the worker
+                fut = pool.submit(contextvars.copy_context().run, timed, name, graph.nodes[name]["agent"], inputs)
+                running[fut] = name
+            return False
+
+        while len(results) < len(order):
+            while launch_ready():
+                pass  # cache hits may unlock more nodes immediately
+            if not running:
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                del running[fut]
+                name, res, start, end = fut.result()
+                results[name] = res
+                timings[name] = {"start": start, "end": end, "duration": end - start, "cached": False}
+                if memoize and memo_keys[name] and "error" not in res:
+                    self._memo_put(memo_keys[name], res)
+
+        return GraphResult({n: results[n] for n in order}, timings, deps)
+
+    @instrument("crew.dispatch")
     def dispatch(self, request: str, agent_names: List[str] = None) -> Dict[str, dict]:
-        """Dispatch request to all agents or a subset. Returns mapping agent_name->response dict."""
-        results = {}
+        """Dispatch request to all agents or a subset. Returns mapping agent_name->response dict.
+
+        Agents are independent, so they run in parallel on the crew's worker pool.
+        """
         names = agent_names or list(self.agents.keys())
-        for name in names:
-            handler = self.agents.get(name)
-            if handler is None:
-                results[name] = {"error": "agent_not_found"}
-                continue
-            try:
-                res = handler(request)
-                results[name] = res if isinstance(res, dict) else {"response": res}
-            except Exception as e:
-                results[name] = {"error": str(e)}
-        return results
+        graph = TaskGraph()
+        for name in dict.fromkeys(names):
+            graph.add(name, name)
+        with span("crew.dispatch", agents=len(graph.nodes)):
+            return self.run_graph(graph, request, memoize=False).results
@@ -1,11 +1,20 @@
 import sqlite3
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
+from metrics import instrument
 
+# Overridable (env var or assignment) so benchmarks and tests can use a scratch database.
+DB_PATH = os.environ.get("CAREER_GUIDANCE_DB") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'career_guidance.db')
+
+def _connect():
+    # wait on a locked database instead of failing immediately under concurrent writers
+    return sqlite3.connect(DB_PATH, timeout=10)
+
+@instrument("db.init_db")
 def init_db():
     """Initialize the SQLite database"""
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'career_guidance.db')
-    conn = sqlite3.connect(db_path)
+    conn = _connect()
     c = conn.cursor()
     
     # Create users table
@@ -50,10 +59,10 @@ def init_db():
     conn.commit()
     conn.close()
 
+@instrument("db.create_user")
 def create_user(username, password, email, is_admin=False):
     """Create a new user"""
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'career_guidance.db')
-    conn = sqlite3.connect(db_path)
+    conn = _connect()
     c = conn.cursor()
     
     try:
@@ -67,10 +76,10 @@ def create_user(username, password, email, is_admin=False):
     finally:
         conn.close()
 
+@instrument("db.verify_user")
 def verify_user(username, password):
     """Verify user credentials"""
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'career_guidance.db')
-    conn = sqlite3.connect(db_path)
+    conn = _connect()
     c = conn.cursor()
     
     c.execute('SELECT id, password_hash, is_admin FROM users WHERE username = ?', (username,))
@@ -81,10 +90,10 @@ def verify_user(username, password):
         return {'id': user[0], 'is_admin': user[2]}
     return None
 
+@instrument("db.update_user_profile")
 def update_user_profile(user_id, profile_data):
     """Update user profile"""
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'career_guidance.db')
-    conn = sqlite3.connect(db_path)
+    conn = _connect()
     c = conn.cursor()
     
     try:
@@ -101,10 +110,15 @@ def update_user_profile(user_id, profile_data):
     finally:
         conn.close()
 
+def _skill_ids(skills_text):
+    """Taxonomy ids of the skills named in the free-text skills column."""
+    from shared_resources import get_resource
+    return get_resource("skill_taxonomy").extract(skills_text or "").tolist()
+
+@instrument("db.get_user_profile")
 def get_user_profile(user_id):
     """Get user profile"""
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'career_guidance.db')
-    conn = sqlite3.connect(db_path)
+    conn = _connect()
     c = conn.cursor()
     
     c.execute('SELECT * FROM user_profiles WHERE user_id = ?', (user_id,))
@@ -116,15 +130,16 @@ def get_user_profile(user_id):
             'full_name': profile[1],
             'education_level': profile[2],
             'skills': profile[3],
+            'skill_ids': _skill_ids(profile[3]),
             'interests': profile[4],
             'career_goals': profile[5]
         }
     return None
 
+@instrument("db.add_learning_resource")
 def add_learning_resource(title, description, url, category, added_by):
     """Add a new learning resource"""
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'career_guidance.db')
-    conn = sqlite3.connect(db_path)
+    conn = _connect()
     c = conn.cursor()
     
     try:
@@ -139,10 +154,10 @@ def add_learning_resource(title, description, url, category, added_by):
     finally:
         conn.close()
 
+@instrument("db.get_learning_resources")
 def get_learning_resources(category=None):
     """Get learning resources"""
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'career_guidance.db')
-    conn = sqlite3.connect(db_path)
+    conn = _connect()
     c = conn.cursor()
     
     if category:
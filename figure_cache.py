@@ -0,0 +1,144 @@
+"""
+Process-wide cache of built plotly figures, keyed by the data they are drawn from.
+
+Streamlit reruns a page top to bottom on every widget change, so every chart
+was rebuilt (plotly express + figure validation) even when only one slider
+moved. cached_figure() builds a chart once per (name, fingerprint of its
+inputs), keeps the serialized figure JSON in an LRU shared by every session,
+and hands back a plain figure dict that st.plotly_chart renders directly.
+Each chart is keyed on its own inputs only, so a rerun rebuilds just the
+charts whose data changed; new data means a new fingerprint, which is the
+invalidation. Concurrent misses for the same key share one build.
+
+- data_fingerprint(*parts): stable hash of DataFrames, arrays and JSON-able values
+- cached_figure(name, inputs, build): figure dict for build(), memoized on inputs
+- invalidate(name=None) / stats(): drop entries, hit/miss/build counters
+
+Usage:
+    fig = cached_figure("skills.radar", user_skills,
+                        lambda: px.line_polar(pd.DataFrame(...), r="Rating", theta="Skill"))
+    st.plotly_chart(fig)
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from singleflight import SingleFlight
+
+MAX_ENTRIES = 256
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def _feed(h, obj):
+    """Feed a type-tagged encoding of obj into hash h (DataFrames/arrays hashed by content)."""
+    if isinstance(obj, pd.DataFrame):
+        h.update(b"df")
+        h.update(json.dumps([list(map(str, obj.columns)), list(map(str, obj.dtypes))]).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(b"s" + str(obj.name).encode("utf-8") + str(obj.dtype).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(b"nd" + str(obj.dtype).encode("utf-8") + str(obj.shape).encode("utf-8"))
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for key in sorted(obj, key=str):
+            _feed(h, str(key))
+            _feed(h, obj[key])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for item in obj:
+            _feed(h, item)
+        h.update(b"]")
+    else:
+        h.update(json.dumps(obj, default=str).encode("utf-8"))
+        h.update(b",")
+
+
+def data_fingerprint(*parts) -> str:
+    """Stable short hash of the inputs a chart is drawn from."""
+    h = hashlib.sha1()
+    for part in parts:
+        _feed(h, part)
+    return h.hexdigest()[:16]
+
+
+class FigureCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._flight = SingleFlight("figure_cache")
+        self.counts = {"hits": 0, "misses": 0, "builds": 0}
+
+    def get_json(self, name: str, inputs, build: Callable[[], object]) -> str:
+        """Serialized figure for `name` drawn from `inputs`; build() runs only on a miss."""
+        key = (name, data_fingerprint(inputs))
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self.counts["hits"] += 1
+                return text
+            self.counts["misses"] += 1
+        text, _ = self._flight.do(key, lambda: self._build(key, build))
+        return text
+
+    def _build(self, key: Tuple[str, str], build: Callable[[], object]) -> str:
+        fig = build()
+        text = fig.to_json() if hasattr(fig, "to_json") else json.dumps(fig)
+        with self._lock:
+            self.counts["builds"] += 1
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = text
+            self._bytes += len(text)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, dropped = self._entries.popitem(last=False)
+                self._bytes -= len(dropped)
+        return text
+
+    def figure(self, name: str, inputs, build: Callable[[], object]) -> dict:
+        """Figure dict (a fresh copy per call, safe to pass to st.plotly_chart)."""
+        return json.loads(self.get_json(name, inputs, build))
+
+    def invalidate(self, name: Optional[str] = None) -> int:
+        """Drop every entry (or those of one chart); returns how many were dropped."""
+        with self._lock:
+            keys = [k for k in self._entries if name is None or k[0] == name]
+            for k in keys:
+                self._bytes -= len(self._entries.pop(k))
+            return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts, entries=len(self._entries), bytes=self._bytes)
+
+
+_CACHE = FigureCache()
+
+
+def cached_figure(name: str, inputs, build: Callable[[], object]) -> dict:
+    """Process-wide cached_figure; see FigureCache.figure."""
+    return _CACHE.figure(name, inputs, build)
+
+
+def invalidate(name: Optional[str] = None) -> int:
+    return _CACHE.invalidate(name)
+
+
+def stats() -> dict:
+    return _CACHE.stats()
+
+
+__all__ = ["FigureCache", "cached_figure", "data_fingerprint", "invalidate", "stats"]
@@ -1,45 +1,167 @@
 import os
+import random
+import threading
+import time
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import List, Optional
+from metrics import timed
+from tracing import span
+
+# Status codes worth retrying: 503 is "model loading", the rest are transient.
+RETRY_STATUS = {429, 502, 503, 504}
+
+DEFAULT_BASE_URL = "https://api-inference.huggingface.co"
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _shared_session(pool_size: int) -> requests.Session:
+    """Process-wide keep-alive session so calls reuse TCP+TLS connections."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSION = session
+        return _SESSION
+
+
+def _extract_text(item) -> str:
+    """Pull generated_text out of the shapes the inference API returns."""
+    if isinstance(item, list):
+        item = item[0] if item else None
+    if isinstance(item, dict):
+        return (item.get("generated_text") or "").strip()
+    return ""
 
 
 class HuggingFaceClient:
     """Simple wrapper for Hugging Face Inference API (backup to OpenAI).
 
+    Requests go through a pooled, keep-alive session. 503 "model loading" and
+    other transient errors are retried with jittered exponential backoff; a
+    loading model is retried no earlier than the `estimated_time` the API
+    reports. Requests never ask the server to wait for the model (that would
+    hold a worker thread and a pooled connection for as long as it loads):
+    once the model needs longer than `max_wait_s` allows, the call gives up
+    and returns nothing, and callers fall back.
+
+    `base_url` (or HUGGINGFACE_BASE_URL) points the client at another
+    inference-API-compatible server, e.g. mock_llm_server.py.
+
     Usage:
         client = HuggingFaceClient()
         resp = client.generate("Tell me about data science")
+        resps = client.generate_many(["Data science?", "Web development?"])
     """
-    def __init__(self, api_key: Optional[str] = None, model: str = "mistralai/Mistral-7B-Instruct-v0.1"):
+    def __init__(self, api_key: Optional[str] = None, model: str = "mistralai/Mistral-7B-Instruct-v0.1",
+                 session: Optional[requests.Session] = None, pool_size: int = 8, max_retries: int = 3,
+                 backoff_base_s: float = 0.5, max_wait_s: float = 10.0, timeout: float = 30,
+                 base_url: Optional[str] = None):
         self.api_key = api_key or os.environ.get("HUGGINGFACE_API_KEY")
         self.model = model
-        self.endpoint = f"https://api-inference.huggingface.co/models/{self.model}"
+        base_url = base_url or os.environ.get("HUGGINGFACE_BASE_URL") or DEFAULT_BASE_URL
+        self.endpoint = f"{base_url.rstrip('/')}/models/{self.model}"
+        self.session = session or _shared_session(pool_size)
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.max_wait_s = max_wait_s
+        self.timeout = timeout
 
-    def generate(self, prompt: str, max_length: int = 150) -> str:
-        """Generate text using Hugging Face inference API."""
-        prompt = (prompt or "").strip()
-        if not prompt or not self.api_key:
-            return ""
+    def _backoff(self, attempt: int, estimated_time: Optional[float]) -> float:
+        jitter = self.backoff_base_s * (2 ** attempt)
+        if estimated_time:
+            # never retry before the model is expected to be up: jitter goes on top of the estimate
+            return float(estimated_time) + random.uniform(0, jitter)
+        return jitter * random.uniform(0.5, 1.0)
 
+    def _send(self, payload: dict, headers: dict, read_timeout: float):
+        """One POST: (decoded JSON, None) on success, (None, estimated_time or 0) if retryable, raises otherwise."""
+        try:
+            resp = self.session.post(self.endpoint, headers=headers, json=payload, timeout=(5, read_timeout))
+        except (requests.ConnectionError, requests.Timeout):
+            return None, 0
+        if resp.status_code not in RETRY_STATUS:
+            resp.raise_for_status()
+            return resp.json(), None
+        try:
+            return None, resp.json().get("estimated_time") or 0
+        except Exception:
+            return None, 0
+
+    def _post(self, payload: dict, timeout: Optional[float] = None):
+        """POST with retry/backoff; returns decoded JSON or None on failure.
+
+        `timeout` bounds the whole call, requests and backoff included.
+        """
         headers = {"Authorization": f"Bearer {self.api_key}"}
-        payload = {
-            "inputs": prompt,
+        start = time.monotonic()
+        call_deadline = start + timeout if timeout is not None else None
+        deadline = min(start + self.max_wait_s, call_deadline or float("inf"))
+        for attempt in range(self.max_retries + 1):
+            read_timeout = self.timeout
+            if call_deadline is not None:
+                read_timeout = min(read_timeout, call_deadline - time.monotonic())
+                if read_timeout <= 0:
+                    return None
+            try:
+                data, estimated_time = self._send(payload, headers, read_timeout)
+            except Exception:
+                return None
+            if estimated_time is None:
+                return data
+
+            delay = self._backoff(attempt, estimated_time)
+            if attempt == self.max_retries or time.monotonic() + delay > deadline:
+                return None
+            time.sleep(delay)
+        return None
+
+    def _payload(self, inputs, max_length: int) -> dict:
+        return {
+            "inputs": inputs,
             "parameters": {"max_new_tokens": max_length},
-            "options": {"use_cache": False, "wait_for_model": True}
+            # Don't let the server park this thread while the model loads; we
+            # retry on 503 with our own bounded backoff (see _post).
+            "options": {"use_cache": False, "wait_for_model": False}
         }
 
-        try:
-            resp = requests.post(self.endpoint, headers=headers, json=payload, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            # Handle various response formats
-            if isinstance(data, list) and len(data) > 0:
-                if isinstance(data[0], dict):
-                    return data[0].get("generated_text", "").strip()
-            if isinstance(data, dict):
-                if "generated_text" in data:
-                    return data.get("generated_text", "").strip()
-            return ""
-        except Exception:
+    def generate(self, prompt: str, max_length: int = 150, timeout: Optional[float] = None) -> str:
+        """Generate text using Hugging Face inference API; `timeout` bounds the call (retries included)."""
+        prompt = (prompt or "").strip()
+        if not prompt or not self.api_key:
             return ""
+
+        with timed("huggingface.generate") as call, span("llm.huggingface", model=self.model) as s:
+            data = self._post(self._payload(prompt, max_length), timeout)
+            if data is None:
+                call.fail()
+                s.set_status("error", "no response")
+        if isinstance(data, list) and len(data) > 0:
+            return _extract_text(data[0])
+        if isinstance(data, dict):
+            return _extract_text(data)
+        return ""
+
+    def generate_many(self, prompts: List[str], max_length: int = 150) -> List[str]:
+        """Generate text for several prompts in one request; results keep input order."""
+        prompts = [(p or "").strip() for p in prompts]
+        results = [""] * len(prompts)
+        live = [i for i, p in enumerate(prompts) if p]
+        if not live or not self.api_key:
+            return results
+
+        with timed("huggingface.generate_many") as call, \
+                span("llm.huggingface", model=self.model, batch=len(live)) as s:
+            data = self._post(self._payload([prompts[i] for i in live], max_length))
+            if data is None:
+                call.fail()
+                s.set_status("error", "no response")
+        if isinstance(data, list):
+            for i, item in zip(live, data):
+                results[i] = _extract_text(item)
+        return results
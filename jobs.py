@@ -0,0 +1,367 @@
+"""
+Background job queue for long-running advisor and guidance work.
+
+Pages submit a job and get an id back immediately; a bounded worker pool runs
+it off the Streamlit script thread, so a slow turn neither pins a server thread
+nor dies when the user navigates away. Job state and results are persisted in
+SQLite, so a page can pick the result up on any later rerun.
+
+- submit(kind, payload): returns a job id; identical in-flight requests share one job
+- get(job_id): status, progress, result/error and timestamps
+- wait(job_id, timeout): block until the job finishes
+- cancel(job_id): drop a queued job, or ask a running one to stop at its next checkpoint
+- prune(): drop finished jobs older than retain_s, keeping at most retain_max
+
+Several processes (Streamlit workers, scripts) may share the database. Each
+queue stamps its jobs with an owner (pid plus a per-instance token) and
+refreshes their heartbeat while it is alive; a queue only marks a job
+'interrupted' once its heartbeat has expired, never jobs another live queue
+is still running.
+
+Handlers are registered per kind as fn(payload, job) and may call
+job.progress(...) and job.check_cancelled() while they work.
+
+Usage:
+    queue = JobQueue()
+    queue.register("advisor", lambda payload, job: advisor.respond(payload["query"]))
+    job_id = queue.submit("advisor", {"query": "How do I become a Data Scientist?"})
+    queue.get(job_id)["status"]   # "queued" -> "running" -> "done"
+"""
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+# Same database as database.py (and the same env override), separate table.
+DB_PATH = os.environ.get("CAREER_GUIDANCE_DB") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'career_guidance.db')
+
+ACTIVE = ("queued", "running")
+FINISHED = ("done", "failed", "cancelled", "interrupted")
+PROGRESS_FLUSH_S = 0.5
+HEARTBEAT_S = 10.0
+STALE_BEATS = 3  # missed heartbeats before another queue reclaims a job
+RETAIN_S = 7 * 24 * 3600.0
+RETAIN_MAX = 1000
+
+
+class JobCancelled(Exception):
+    """Raised by JobContext.check_cancelled() once cancel() was requested."""
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by submit() when max_pending jobs are already queued or running."""
+
+
+class JobContext:
+    """Handed to handlers: progress reporting and cooperative cancellation."""
+    def __init__(self, queue: "JobQueue", job_id: str):
+        self._queue = queue
+        self.job_id = job_id
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.job_id)
+
+    def progress(self, message: str = None, **fields):
+        self._queue._set_progress(self.job_id, dict(fields, message=message) if message else fields)
+
+
+class JobQueue:
+    def __init__(self, db_path: str = None, max_workers: int = 2, max_pending: int = 64,
+                 heartbeat_s: float = HEARTBEAT_S, retain_s: float = RETAIN_S, retain_max: int = RETAIN_MAX):
+        self.db_path = db_path or DB_PATH
+        self.max_pending = max_pending
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        self.heartbeat_s = heartbeat_s
+        self.stale_after_s = STALE_BEATS * heartbeat_s
+        self.retain_s = retain_s
+        self.retain_max = retain_max
+        self._handlers: Dict[str, Callable] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, str] = {}  # dedup key -> job id
+        self._contexts: Dict[str, JobContext] = {}
+        self._futures: Dict[str, Future] = {}
+        self._progress: Dict[str, dict] = {}
+        self._flushed: Dict[str, float] = {}
+        self._closed = threading.Event()
+        self._init_db()
+        self.reap()
+        self.prune()
+        threading.Thread(target=self._maintain, name="job-heartbeat", daemon=True).start()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    dedup_key TEXT NOT NULL,
+                    payload TEXT,
+                    status TEXT NOT NULL,
+                    progress TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL,
+                    started_at REAL,
+                    finished_at REAL,
+                    owner TEXT,
+                    heartbeat_at REAL
+                )
+            ''')
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}
+            for column, decl in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+                if column not in columns:  # databases created before owners were tracked
+                    conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} {decl}')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _maintain(self):
+        while not self._closed.wait(self.heartbeat_s):
+            try:
+                self.heartbeat()
+                self.reap()
+                self.prune()
+            except sqlite3.Error:
+                pass  # database busy or gone; retry on the next beat
+
+    def close(self):
+        """Stop the heartbeat; running jobs are reclaimed by others once it expires."""
+        self._closed.set()
+        self._pool.shutdown(wait=False)
+
+    def heartbeat(self):
+        """Mark this queue's active jobs as still owned by a live process."""
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status IN ('queued', 'running')",
+                         (time.time(), self.owner))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def reap(self) -> int:
+        """Mark active jobs whose owner stopped heartbeating as 'interrupted'; returns how many."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            # in flight when their process died: they will never finish
+            cur = conn.execute('''
+                UPDATE jobs SET status = 'interrupted', finished_at = ?
+                WHERE status IN ('queued', 'running') AND owner IS NOT ?
+                  AND COALESCE(heartbeat_at, created_at, 0) < ?
+            ''', (now, self.owner, now - self.stale_after_s))
+            conn.commit()
+            return cur.rowcount
+        finally:
+            conn.close()
+
+    def prune(self) -> int:
+        """Delete finished jobs older than retain_s and all but the newest retain_max; returns how many."""
+        conn = self._connect()
+        try:
+            cur = conn.execute('''
+                DELETE FROM jobs WHERE status NOT IN ('queued', 'running') AND (
+                    finished_at < ? OR id IN (
+                        SELECT id FROM jobs WHERE status NOT IN ('queued', 'running')
+                        ORDER BY finished_at DESC LIMIT -1 OFFSET ?))
+            ''', (time.time() - self.retain_s, self.retain_max))
+            conn.commit()
+            return cur.rowcount
+        finally:
+            conn.close()
+
+    def _update(self, job_id: str, **fields):
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        conn = self._connect()
+        try:
+            conn.execute(f'UPDATE jobs SET {cols} WHERE id = ?', (*fields.values(), job_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def register(self, kind: str, handler: Callable[[dict, JobContext], object]):
+        self._handlers[kind] = handler
+
+    @staticmethod
+    def dedup_key(kind: str, payload: dict) -> str:
+        raw = json.dumps([kind, payload], sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def submit(self, kind: str, payload: dict, dedup: bool = True) -> str:
+        """Queue a job and return its id (the existing id for an identical in-flight job)."""
+        if kind not in self._handlers:
+            raise KeyError(f"no handler for job kind '{kind}'")
+        key = self.dedup_key(kind, payload)
+        with self._lock:
+            if dedup and key in self._inflight:
+                return self._inflight[key]
+            if len(self._contexts) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._contexts)} jobs already pending")
+            job_id = uuid.uuid4().hex
+            conn = self._connect()
+            try:
+                now = time.time()
+                conn.execute('''
+                    INSERT INTO jobs (id, kind, dedup_key, payload, status, progress, created_at, owner, heartbeat_at)
+                    VALUES (?, ?, ?, ?, 'queued', '{}', ?, ?, ?)
+                ''', (job_id, kind, key, json.dumps(payload, default=str), now, self.owner, now))
+                conn.commit()
+            finally:
+                conn.close()
+            if dedup:
+                self._inflight[key] = job_id
+            ctx = JobContext(self, job_id)
+            self._contexts[job_id] = ctx
+            self._futures[job_id] = self._pool.submit(self._run, job_id, kind, key, payload, ctx)
+        return job_id
+
+    def _run(self, job_id: str, kind: str, key: str, payload: dict, ctx: JobContext):
+        status, result, error = "failed", None, None
+        try:
+            ctx.check_cancelled()
+            self._update(job_id, status="running", started_at=time.time())
+            value = self._handlers[kind](payload, ctx)
+            ctx.check_cancelled()
+            status, result = "done", json.dumps(value, default=str)
+        except JobCancelled:
+            status = "cancelled"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            with self._lock:
+                progress = self._progress.get(job_id)
+            fields = dict(status=status, result=result, error=error, finished_at=time.time())
+            if progress is not None:
+                fields["progress"] = json.dumps(progress, default=str)
+            # persist before forgetting the job, so get()/wait() never see a stale status
+            self._update(job_id, **fields)
+            with self._lock:
+                self._progress.pop(job_id, None)
+                self._flushed.pop(job_id, None)
+                self._contexts.pop(job_id, None)
+                self._futures.pop(job_id, None)
+                if self._inflight.get(key) == job_id:
+                    del self._inflight[key]
+
+    def _set_progress(self, job_id: str, progress: dict):
+        # a snapshot: handlers keep mutating what they pass in, while get() and the
+        # flushes below read the stored dict from other threads
+        progress = copy.deepcopy(progress)
+        now = time.monotonic()
+        with self._lock:
+            self._progress[job_id] = progress
+            due = now - self._flushed.get(job_id, 0.0) >= PROGRESS_FLUSH_S
+            if due:
+                self._flushed[job_id] = now
+        if due:  # throttled so chatty handlers don't turn into a write per token
+            self._update(job_id, progress=json.dumps(progress, default=str))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        conn = self._connect()
+        try:
+            row = conn.execute('''
+                SELECT id, kind, status, progress, result, error, created_at, started_at, finished_at
+                FROM jobs WHERE id = ?
+            ''', (job_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        job = {
+            'id': row[0], 'kind': row[1], 'status': row[2],
+            'progress': json.loads(row[3] or '{}'),
+            'result': json.loads(row[4]) if row[4] else None,
+            'error': row[5], 'created_at': row[6], 'started_at': row[7], 'finished_at': row[8],
+        }
+        with self._lock:
+            live = self._progress.get(job_id)
+        if live is not None and job['status'] in ACTIVE:
+            job['progress'] = copy.deepcopy(live)  # the caller's own copy, like the persisted one
+        return job
+
+    def wait(self, job_id: str, timeout: float = None) -> Optional[dict]:
+        """Block until the job has finished (or `timeout` passes); returns get(job_id)."""
+        with self._lock:
+            fut = self._futures.get(job_id)
+        if fut is not None:
+            try:
+                fut.result(timeout)
+            except Exception:
+                pass
+        return self.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job or signal a running one; False if it already finished."""
+        with self._lock:
+            ctx = self._contexts.get(job_id)
+            fut = self._futures.get(job_id)
+        if ctx is None:
+            return False
+        ctx._cancel.set()
+        if fut is not None and fut.cancel():
+            # never started: _run won't execute, so finish the bookkeeping here
+            with self._lock:
+                self._contexts.pop(job_id, None)
+                self._futures.pop(job_id, None)
+                for key, jid in list(self._inflight.items()):
+                    if jid == job_id:
+                        del self._inflight[key]
+            self._update(job_id, status="cancelled", finished_at=time.time())
+        return True
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._contexts)
+
+
+def advisor_job(payload: dict, job: JobContext) -> dict:
+    """Run one AgenticAdvisor turn for payload['query'] (and optional payload['profile'])."""
+    from shared_resources import get_resource
+    job.progress("Consulting agents")
+    return get_resource("agentic_advisor").respond(payload["query"], payload.get("profile"))
+
+
+def guidance_job(payload: dict, job: JobContext) -> dict:
+    """Run GuidanceCrew for payload['profile'] / payload['interests'], streaming partial plans as progress."""
+    from agents import GuidanceCrew
+    plans, partial = {}, {}
+    for event in GuidanceCrew().stream_comprehensive_guidance(payload["profile"], payload["interests"]):
+        job.check_cancelled()
+        if event.kind == "error":
+            raise RuntimeError(f"{event.stage} failed: {event.text}")
+        if event.kind == "chunk":
+            partial[event.stage] = partial.get(event.stage, "") + event.text
+        elif event.kind == "done":
+            plans[event.stage] = partial[event.stage] = event.text
+        job.progress(f"Writing {event.stage.replace('_', ' ')}", partial=dict(partial), finished=sorted(plans))
+    return plans
+
+
+def build_job_queue() -> JobQueue:
+    queue = JobQueue()
+    queue.register("advisor", advisor_job)
+    queue.register("guidance", guidance_job)
+    return queue
+
+
+__all__ = ["JobQueue", "JobContext", "JobCancelled", "JobQueueFull", "build_job_queue"]
@@ -0,0 +1,67 @@
+"""
+Lazy-import helpers for keeping cold start and Streamlit reruns cheap.
+
+- module_available(name): capability probe via importlib.util.find_spec; nothing is imported
+- lazy_import(name): module proxy that performs the real import on first attribute access
+
+Usage:
+    HAS_SKLEARN = module_available("sklearn")
+    np = lazy_import("numpy")        # numpy is only imported when np.<attr> is first used
+"""
+import importlib
+import importlib.util
+import threading
+from typing import Dict
+
+
+_PROBES: Dict[str, bool] = {}
+
+
+def module_available(name: str) -> bool:
+    """True if `name` can be imported, without importing it (result cached)."""
+    if name not in _PROBES:
+        try:
+            _PROBES[name] = importlib.util.find_spec(name) is not None
+        except (ImportError, ValueError):
+            # a missing parent package raises instead of returning None
+            _PROBES[name] = False
+    return _PROBES[name]
+
+
+class LazyModule:
+    """Stand-in for a module that is imported the first time an attribute is read."""
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with self.__dict__["_lock"]:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+__all__ = ["module_available", "lazy_import", "LazyModule"]
@@ -0,0 +1,233 @@
+"""
+Prerequisite-aware learning paths from a user's current skills to a target role.
+
+config/learning_paths.json describes a DAG over taxonomy skills: each skill has
+prerequisites (a nested list is an any-of group, e.g. [["Python", "Java"]]) and
+one or more resources with estimated hours. Learning a skill costs its cheapest
+resource, so the edge weight into a skill is those hours.
+
+For a starting skill set, one dynamic-programming pass in topological order
+gives every skill's minimum time-to-learn on its own (own hours + cheapest
+option of each prerequisite group, zero for skills already known). That table
+depends only on the starting set, so it is cached and shared by every user
+with the same skills.
+
+Per-skill costs count a shared ancestor once per dependent, so the cheapest
+option on its own is not always cheapest for the whole plan: if A (1h) and a
+target both need X (100h), A is free once X is in the plan anyway. plan()
+therefore searches the any-of choices exactly, minimizing the hours of the
+union of everything the targets need. The search is branch and bound: the
+greedy plan built from the table is the starting bound, and options are tried
+cheapest first, so only the few open any-of groups of a role are enumerated.
+
+Usage:
+    planner = LearningPlanner.load(taxonomy)
+    plan = planner.plan_for_career({"Python": 4, "SQL": 3}, career_index.career("ML Engineer"))
+    plan["total_hours"], [s["skill"] for s in plan["steps"]]
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+import numpy as np
+
+from skill_taxonomy import SkillTaxonomy
+
+GRAPH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "learning_paths.json")
+# a self-rating at or above this counts as already knowing the skill
+KNOWN_RATING = 3
+_TABLE_CACHE_SIZE = 256
+
+
+class LearningPlanner:
+    def __init__(self, data: dict, taxonomy: SkillTaxonomy):
+        self.taxonomy = taxonomy
+        self.default_hours = float(data.get("default_hours", 30))
+        skills = data["skills"]
+        ids = {name: taxonomy.intern(name) for name in skills}
+        self.n = len(taxonomy)
+        self.hours = np.full(self.n, self.default_hours, dtype=np.float32)
+        self.resource: Dict[int, dict] = {}
+        self.prereqs: List[List[Tuple[int, ...]]] = [[] for _ in range(self.n)]
+        for name, spec in skills.items():
+            sid = ids[name]
+            if spec.get("resources"):
+                best = min(spec["resources"], key=lambda r: r["hours"])
+                self.hours[sid] = best["hours"]
+                self.resource[sid] = best
+            for group in spec.get("prerequisites", []):
+                options = [group] if isinstance(group, str) else group
+                self.prereqs[sid].append(tuple(taxonomy.intern(o) for o in options))
+        self.order = self._topological_order()
+        self.position = np.empty(self.n, dtype=np.int32)
+        self.position[self.order] = np.arange(self.n, dtype=np.int32)
+        self._tables: "OrderedDict[FrozenSet[int], tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_stats = {"hits": 0, "misses": 0}
+
+    @classmethod
+    def load(cls, taxonomy: SkillTaxonomy, path: str = GRAPH_PATH) -> "LearningPlanner":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), taxonomy)
+
+    def _topological_order(self) -> List[int]:
+        """Kahn's algorithm over prerequisite -> skill edges; raises on a cycle."""
+        indegree = [0] * self.n
+        dependents: List[List[int]] = [[] for _ in range(self.n)]
+        for sid, groups in enumerate(self.prereqs):
+            for p in {p for group in groups for p in group}:
+                indegree[sid] += 1
+                dependents[p].append(sid)
+        order = [sid for sid in range(self.n) if indegree[sid] == 0]
+        for sid in order:
+            for d in dependents[sid]:
+                indegree[d] -= 1
+                if indegree[d] == 0:
+                    order.append(d)
+        if len(order) != self.n:
+            stuck = [self.taxonomy.names[s] for s in range(self.n) if indegree[s]]
+            raise ValueError(f"prerequisite cycle among: {', '.join(stuck)}")
+        return order
+
+    def _table(self, known: FrozenSet[int]) -> Tuple[np.ndarray, List[List[int]]]:
+        """(minimum hours to learn each skill, chosen prerequisite per group) for a starting set."""
+        with self._lock:
+            table = self._tables.get(known)
+            if table is not None:
+                self._tables.move_to_end(known)
+                self.cache_stats["hits"] += 1
+                return table
+            self.cache_stats["misses"] += 1
+        cost = np.zeros(self.n, dtype=np.float64)
+        choice: List[List[int]] = [[] for _ in range(self.n)]
+        for sid in self.order:
+            if sid in known:
+                continue
+            total = float(self.hours[sid])
+            for group in self.prereqs[sid]:
+                best = min(group, key=lambda p: cost[p])
+                choice[sid].append(best)
+                total += cost[best]
+            cost[sid] = total
+        with self._lock:
+            self._tables[known] = (cost, choice)
+            while len(self._tables) > _TABLE_CACHE_SIZE:
+                self._tables.popitem(last=False)
+        return cost, choice
+
+    def known_skills(self, ratings: Dict[str, float]) -> FrozenSet[int]:
+        """Ids the user already has (rating >= KNOWN_RATING), counting ancestors of each as known too."""
+        ids = [self.taxonomy.resolve(s) for s, r in ratings.items() if r >= KNOWN_RATING]
+        return frozenset(int(i) for i in self.taxonomy.expand(i for i in ids if i is not None) if i < self.n)
+
+    def _skill_hours(self, sid: int) -> float:
+        return float(self.hours[sid]) if sid < self.n else self.default_hours
+
+    def _closure(self, known: FrozenSet[int], targets: List[int], choose) -> Tuple[set, dict]:
+        """(skills needed for `targets`, {(skill, group index): chosen prerequisite}) picking with choose(sid, gi)."""
+        needed, picks, stack = set(), {}, [t for t in targets if t not in known]
+        while stack:
+            sid = stack.pop()
+            if sid in needed or sid in known:
+                continue
+            needed.add(sid)
+            for gi in range(len(self.prereqs[sid]) if sid < self.n else 0):
+                picks[sid, gi] = p = choose(sid, gi)
+                stack.append(p)
+        return needed, picks
+
+    def _search(self, known: FrozenSet[int], targets: List[int], cost: np.ndarray,
+                bound: Tuple[float, set, dict]) -> Tuple[set, dict]:
+        """Choices minimizing the total hours of the union of needed skills (branch and bound from `bound`)."""
+        best = list(bound)
+
+        def visit(needed: frozenset, picks: dict, frontier: list, hours: float):
+            needed, picks, open_groups = set(needed), dict(picks), []
+            while frontier:
+                sid, gi = frontier.pop()
+                group = self.prereqs[sid][gi]
+                have = next((p for p in group if p in known or p in needed), None)
+                if have is not None:  # already learned or already in the plan: free
+                    picks[sid, gi] = have
+                elif len(group) == 1:
+                    picks[sid, gi] = p = group[0]
+                    needed.add(p)
+                    hours += self._skill_hours(p)
+                    frontier.extend((p, g) for g in range(len(self.prereqs[p]) if p < self.n else 0))
+                else:
+                    open_groups.append((sid, gi))
+            if hours >= best[0]:
+                return
+            still_open = []
+            for sid, gi in open_groups:  # a later single-option group may have pulled an option in
+                have = next((p for p in self.prereqs[sid][gi] if p in known or p in needed), None)
+                if have is None:
+                    still_open.append((sid, gi))
+                else:
+                    picks[sid, gi] = have
+            open_groups = still_open
+            if not open_groups:
+                best[:] = [hours, needed, picks]
+                return
+            (sid, gi), rest = open_groups[0], open_groups[1:]
+            for p in sorted(self.prereqs[sid][gi], key=lambda p: cost[p] if p < self.n else self.default_hours):
+                visit(needed | {p}, {**picks, (sid, gi): p},
+                      rest + [(p, g) for g in range(len(self.prereqs[p]) if p < self.n else 0)],
+                      hours + self._skill_hours(p))
+
+        start = {t for t in targets if t not in known}
+        visit(frozenset(start), {}, [(t, g) for t in start for g in range(len(self.prereqs[t]) if t < self.n else 0)],
+              sum(self._skill_hours(t) for t in start))
+        return best[1], best[2]
+
+    def plan(self, known: Iterable[int], targets: Iterable[int], extra: Iterable[str] = ()) -> dict:
+        """Minimum-time ordered steps that take `known` to cover every skill in `targets`.
+
+        Minimum time counts each skill once however many targets need it.
+        `extra` names target skills outside the taxonomy; each becomes a final step of
+        default_hours without being added to the (shared) taxonomy.
+        """
+        known, targets = frozenset(known), list(targets)
+        cost, choice = self._table(known)
+        # the per-skill choices give a valid plan: the bound the exact search has to beat
+        greedy = self._closure(known, targets, lambda sid, gi: choice[sid][gi])
+        needed, picks = self._search(known, targets, cost,
+                                     (sum(self._skill_hours(s) for s in greedy[0]), *greedy))
+        steps = sorted(needed, key=lambda s: (self.position[s] if s < self.n else self.n + s))
+        out, elapsed = [], 0.0
+        for sid in steps:
+            hours = self._skill_hours(sid)
+            elapsed += hours
+            resource = self.resource.get(sid)
+            after = [picks[sid, gi] for gi in range(len(self.prereqs[sid]) if sid < self.n else 0)]
+            out.append({
+                "skill": self.taxonomy.names[sid],
+                "hours": hours,
+                "resource": resource["title"] if resource else None,
+                "after": [self.taxonomy.names[p] for p in after if p in needed],
+                "cumulative_hours": elapsed,
+            })
+        for name in dict.fromkeys(extra):
+            elapsed += self.default_hours
+            out.append({"skill": name, "hours": self.default_hours, "resource": None, "after": [],
+                        "cumulative_hours": elapsed})
+        return {"steps": out, "total_hours": elapsed}
+
+    def plan_for_career(self, ratings: Dict[str, float], career: dict, min_importance: int = 1) -> dict:
+        """plan() from self-ratings towards the skills a catalog career requires."""
+        targets, extra = [], []
+        for skill, weight in career["skills"].items():
+            if weight >= min_importance:
+                sid = self.taxonomy.resolve(skill)
+                if sid is not None:
+                    targets.append(sid)
+                else:
+                    extra.append(skill.strip())
+        plan = self.plan(self.known_skills(ratings), targets, extra)
+        plan["role"] = career["title"]
+        return plan
+
+
+__all__ = ["LearningPlanner", "GRAPH_PATH", "KNOWN_RATING"]
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+"""
+Open-loop load generator for the advisor path (AgenticAdvisor.respond).
+
+Requests are launched on a fixed schedule (--qps) regardless of how long earlier
+ones take, and latency is measured from each request's scheduled start, so
+queueing delay shows up in the tail instead of being hidden.
+
+Every request gets a distinct prompt (the query plus its request number), so
+the single-flight coalescing in the clients can't fold a run into a handful of
+upstream calls; --repeat-prompts measures the coalesced path instead. The
+report lists single-flight calls vs executions (and the stub's request counts)
+next to requests sent. A fixed corpus (demo resources plus the career catalog)
+is loaded into the vector DB first, so retrieval is part of what is measured.
+
+Offline, against the bundled stub server (see mock_llm_server.py):
+    python loadtest.py --mock --qps 10 --duration 30 --latency lognormal:400,0.4 --error-rate 0.01
+
+Against an already running stub or another compatible endpoint:
+    python loadtest.py --base-url http://127.0.0.1:8089 --qps 5
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import singleflight
+from metrics import LatencyHistogram
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "careers.json")
+
+DEFAULT_QUERIES = [
+    "How do I become a Data Scientist?",
+    "machine learning courses",
+    "What skills do I need for cloud engineering?",
+    "How do I prepare for software engineering interviews?",
+    "Cybersecurity career path",
+]
+
+
+def _is_error(result) -> bool:
+    if not isinstance(result, dict):
+        return True
+    for res in (result.get("agent_results") or {}).values():
+        if "error" in res or str(res.get("text", "")).startswith("OpenAI request failed"):
+            return True
+    return False
+
+
+def load_corpus() -> int:
+    """Reset the vector DB to a fixed corpus (demo resources + career catalog); returns its size."""
+    import vector_db
+    with open(CATALOG_PATH, "r", encoding="utf-8") as f:
+        careers = json.load(f)["careers"]
+    vector_db.reset_index()
+    vector_db.populate_sample_data()
+    vector_db.add_documents([f"{c['title']}: {c['description']}" for c in careers])
+    return vector_db.index_info()["documents"]
+
+
+def _flight_delta(before: dict, after: dict) -> dict:
+    """Single-flight calls / executions / shared per group during a run (groups that saw calls)."""
+    out = {}
+    for name, now in after.items():
+        was = before.get(name, {})
+        delta = {k: now[k] - was.get(k, 0) for k in ("calls", "executions", "shared")}
+        if delta["calls"]:
+            out[name] = delta
+    return out
+
+
+def run_load(call: Callable[[str], object], qps: float, duration_s: float, queries: List[str] = None,
+             max_workers: int = 32, is_error: Callable[[object], bool] = _is_error,
+             unique: bool = True) -> dict:
+    """Drive `call(query)` at `qps` for `duration_s`; returns throughput and latency stats.
+
+    With `unique`, request i sends "<query> (request i)", so no two requests coalesce.
+    """
+    queries = queries or DEFAULT_QUERIES
+    hist = LatencyHistogram()
+    lock = threading.Lock()
+    counts = {"sent": 0, "ok": 0, "errors": 0}
+    interval = 1.0 / qps
+    total = max(1, int(qps * duration_s))
+
+    def one(query: str, scheduled: float):
+        try:
+            failed = is_error(call(query))
+        except Exception:
+            failed = True
+        latency = time.perf_counter() - scheduled
+        with lock:
+            hist.record(latency)
+            counts["errors" if failed else "ok"] += 1
+
+    flights = singleflight.stats()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="load") as pool:
+        for i in range(total):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            query = queries[i % len(queries)]
+            pool.submit(one, f"{query} (request {i})" if unique else query, scheduled)
+            counts["sent"] += 1
+    elapsed = time.perf_counter() - start
+
+    done = counts["ok"] + counts["errors"]
+    return {
+        "target_qps": qps,
+        "sent": counts["sent"],
+        "completed": done,
+        "errors": counts["errors"],
+        "error_rate": counts["errors"] / done if done else 0.0,
+        "elapsed_s": elapsed,
+        "throughput_rps": done / elapsed if elapsed else 0.0,
+        "p50_ms": hist.quantile(0.5) * 1000,
+        "p95_ms": hist.quantile(0.95) * 1000,
+        "p99_ms": hist.quantile(0.99) * 1000,
+        "max_ms": hist.max * 1000,
+        "unique_prompts": unique,
+        "singleflight": _flight_delta(flights, singleflight.stats()),
+    }
+
+
+def advisor_call() -> Callable[[str], dict]:
+    """A fresh AgenticAdvisor built from the current env (so base-URL overrides apply)."""
+    from agentic_advisor import AgenticAdvisor
+    return AgenticAdvisor().respond
+
+
+def point_clients_at(base_url: str):
+    base_url = base_url.rstrip("/")
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    os.environ.setdefault("HUGGINGFACE_API_KEY", "mock")
+    os.environ["OPENAI_BASE_URL"] = base_url + "/v1"
+    os.environ["HUGGINGFACE_BASE_URL"] = base_url
+
+
+def main(argv=None) -> int:
+    from mock_llm_server import MockLLMServer, add_config_args, config_from_args
+
+    parser = argparse.ArgumentParser(description="Load-test AgenticAdvisor.respond at a fixed QPS")
+    parser.add_argument("--qps", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--max-workers", type=int, default=32)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--mock", action="store_true", help="start the stub LLM server in-process")
+    target.add_argument("--base-url", help="stub/compatible server to point the clients at")
+    parser.add_argument("--repeat-prompts", action="store_true",
+                        help="cycle the same few prompts (lets identical in-flight prompts coalesce)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    add_config_args(parser)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.mock:
+        server = MockLLMServer(config_from_args(args)).start()
+        point_clients_at(server.url)
+    elif args.base_url:
+        point_clients_at(args.base_url)
+    try:
+        documents = load_corpus()
+        report = run_load(advisor_call(), args.qps, args.duration, max_workers=args.max_workers,
+                          unique=not args.repeat_prompts)
+        report["documents"] = documents
+        if server:
+            report["upstream"] = server.stats()
+    finally:
+        if server:
+            server.stop()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"sent {report['sent']}  completed {report['completed']}  errors {report['errors']} "
+              f"({report['error_rate']:.1%})")
+        print(f"throughput {report['throughput_rps']:.2f} req/s (target {report['target_qps']:g})")
+        print(f"latency p50 {report['p50_ms']:.0f}ms  p95 {report['p95_ms']:.0f}ms  "
+              f"p99 {report['p99_ms']:.0f}ms  max {report['max_ms']:.0f}ms")
+        print(f"corpus {report['documents']} documents, "
+              f"{'unique' if report['unique_prompts'] else 'repeated'} prompts")
+        for name, flight in report["singleflight"].items():
+            print(f"{name}: {flight['calls']} calls -> {flight['executions']} executions "
+                  f"({flight['shared']} coalesced)")
+        if "upstream" in report:
+            print(f"upstream {report['upstream']} for {report['sent']} requests sent")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+#!/usr/bin/env python
+"""
+Job-market aggregates for the Careers page and the Career Explorer "Market Insights" tab.
+
+Raw job postings (CSV or Parquet dumps) are ingested offline and reduced to one
+compact summary table: postings and salary percentiles per (role, city, month),
+plus every roll-up of those dimensions ("*" = all). Ingestion streams the files
+in chunks and keeps only per-group salary histograms ($1k bins), which merge
+across chunks and roll-ups exactly, so memory depends on the number of groups,
+not on the number of postings.
+
+Posting titles are mapped onto the career catalog (config/careers.json) with
+one keyword-automaton pass per distinct title; anything else becomes "Other".
+
+The app reads through MarketInsights, whose queries return small DataFrames and
+are cached until the next ingest. Every ingest stamps market_meta with a new
+generation, and each query checks it (one primary-key lookup), so a process
+serving the app drops its cached frames when `market_data.py ingest` rewrites
+the summary from another process. When nothing has been ingested yet, a seeded
+synthetic sample is summarized so the charts have something to show.
+
+Usage:
+    python market_data.py ingest postings_2024.csv postings_2025.parquet
+    python market_data.py sample --rows 200000 --out postings_sample.csv
+    python market_data.py show --role "Data Scientist"
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from skill_taxonomy import KeywordMatcher, normalize
+
+DB_PATH = os.environ.get("CAREER_GUIDANCE_DB") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'career_guidance.db')
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "careers.json")
+
+ALL = "*"
+DIMS = ["role", "city", "month"]
+BIN_WIDTH = 1000
+MAX_BIN = 999  # salaries above $1M land in the last bin
+PERCENTILES = {"p10": 0.10, "p25": 0.25, "p50": 0.50, "p75": 0.75, "p90": 0.90}
+CHUNK_ROWS = 100_000
+SAMPLE_CITIES = ["San Francisco", "New York", "Seattle", "Boston", "Austin", "Chicago", "Denver", "Remote"]
+
+_COLUMN_ALIASES = {
+    "title": ["title", "job_title", "role", "position"],
+    "city": ["city", "location", "job_location"],
+    "date": ["posted_date", "date_posted", "date", "posted_at", "month"],
+    "salary": ["salary", "salary_avg", "salary_mid"],
+    "salary_min": ["salary_min", "min_salary"],
+    "salary_max": ["salary_max", "max_salary"],
+}
+
+
+class RoleMapper:
+    """Posting title -> catalog career title (longest catalog title found in it) or "Other"."""
+
+    def __init__(self, titles: List[str]):
+        self.titles = titles
+        self.matcher = KeywordMatcher({normalize(t): i for i, t in enumerate(titles)})
+        self._seen: Dict[str, str] = {}
+
+    @classmethod
+    def load(cls, path: str = CATALOG_PATH) -> "RoleMapper":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls([c["title"] for c in json.load(f)["careers"]])
+
+    def map(self, title: str) -> str:
+        role = self._seen.get(title)
+        if role is None:
+            found = self.matcher.find(str(title))
+            role = self.titles[max(found, key=lambda m: m[1] - m[0])[2]] if found else "Other"
+            self._seen[title] = role
+        return role
+
+
+def _column(frame: pd.DataFrame, kind: str) -> Optional[str]:
+    lower = {c.lower(): c for c in frame.columns}
+    return next((lower[a] for a in _COLUMN_ALIASES[kind] if a in lower), None)
+
+
+def _read_chunks(path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    if path.lower().endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+        # one record batch at a time, never the whole file
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def _histogram(chunk: pd.DataFrame, roles: RoleMapper) -> pd.Series:
+    """Posting counts per (role, city, month, salary bin) for one chunk; bin -1 = no salary."""
+    title, city, date = _column(chunk, "title"), _column(chunk, "city"), _column(chunk, "date")
+    if title is None:
+        raise ValueError(f"no job title column among {list(chunk.columns)}")
+    salary_col = _column(chunk, "salary")
+    if salary_col is not None:
+        salary = pd.to_numeric(chunk[salary_col], errors="coerce")
+    else:
+        lo, hi = _column(chunk, "salary_min"), _column(chunk, "salary_max")
+        parts = [pd.to_numeric(chunk[c], errors="coerce") for c in (lo, hi) if c is not None]
+        salary = pd.concat(parts, axis=1).mean(axis=1) if parts else pd.Series(np.nan, index=chunk.index)
+
+    titles = chunk[title].astype(str)
+    uniques = titles.unique()  # map each distinct title once, not every row
+    role = titles.map(dict(zip(uniques, (roles.map(t) for t in uniques))))
+    where = (chunk[city].astype(str).str.split(",").str[0].str.strip() if city is not None
+             else pd.Series("Unknown", index=chunk.index))
+    month = (pd.to_datetime(chunk[date], errors="coerce").dt.strftime("%Y-%m").fillna("unknown")
+             if date is not None else pd.Series("unknown", index=chunk.index))
+    bins = np.where(salary.notna(), np.clip(salary.fillna(0) // BIN_WIDTH, 0, MAX_BIN), -1).astype(np.int32)
+    frame = pd.DataFrame({"role": role.values, "city": where.values, "month": month.values, "bin": bins})
+    return frame.groupby(DIMS + ["bin"]).size()
+
+
+def summarize(counts: pd.Series) -> pd.DataFrame:
+    """Summary rows for every roll-up of (role, city, month) from merged histogram counts."""
+    hist = counts.rename("n").reset_index()
+    frames = []
+    for mask in range(1 << len(DIMS)):
+        keep = [d for i, d in enumerate(DIMS) if mask & (1 << i)]
+        grouped = hist.groupby(keep + ["bin"], sort=True)["n"].sum().reset_index() if keep else \
+            hist.groupby("bin", sort=True)["n"].sum().reset_index()
+        keys = keep or ["_all"]
+        if not keep:
+            grouped["_all"] = ALL
+        postings = grouped.groupby(keys)["n"].sum()
+        paid = grouped[grouped["bin"] >= 0].copy()
+        paid["cum"] = paid.groupby(keys)["n"].cumsum()
+        paid["total"] = paid.groupby(keys)["n"].transform("sum")
+        paid["value"] = paid["bin"] * BIN_WIDTH + BIN_WIDTH / 2
+        out = pd.DataFrame({"postings": postings})
+        out["salaried"] = paid.groupby(keys)["n"].sum()
+        out["mean"] = (paid["value"] * paid["n"]).groupby([paid[k] for k in keys]).sum() / out["salaried"]
+        for name, q in PERCENTILES.items():
+            reached = paid[paid["cum"] >= q * paid["total"]]
+            out[name] = reached.groupby(keys)["value"].first()
+        out = out.reset_index()
+        for d in DIMS:
+            if d not in keep:
+                out[d] = ALL
+        frames.append(out[DIMS + ["postings", "salaried", "mean", *PERCENTILES]])
+    summary = pd.concat(frames, ignore_index=True)
+    summary["salaried"] = summary["salaried"].fillna(0).astype(int)
+    return summary
+
+
+def generate_sample(rows: int = 50_000, seed: int = 7, months: int = 24,
+                    catalog_path: str = CATALOG_PATH) -> pd.DataFrame:
+    """Synthetic postings shaped by the career catalog (salary bands, growth rates)."""
+    with open(catalog_path, "r", encoding="utf-8") as f:
+        careers = json.load(f)["careers"]
+    rng = np.random.default_rng(seed)
+    growth = np.asarray([c["growth_rate"] for c in careers], dtype=float)
+    weights = (growth + 5) / (growth + 5).sum()
+    pick = rng.choice(len(careers), size=rows, p=weights)
+    lo = np.asarray([c["salary_min"] for c in careers], dtype=float)[pick]
+    hi = np.asarray([c["salary_max"] for c in careers], dtype=float)[pick]
+    # later months get more postings for fast-growing roles, and slightly higher pay
+    month_idx = np.minimum((rng.power(1 + growth[pick] / 20) * months).astype(int), months - 1)
+    end = pd.Timestamp.today().normalize().replace(day=1)
+    start = end - pd.DateOffset(months=months - 1)
+    dates = start + pd.to_timedelta(month_idx * 30 + rng.integers(0, 28, rows), unit="D")
+    city_mult = np.asarray([1.25, 1.2, 1.12, 1.08, 1.0, 1.02, 0.98, 0.95])
+    city = rng.choice(len(SAMPLE_CITIES), size=rows, p=[0.18, 0.18, 0.14, 0.1, 0.1, 0.1, 0.08, 0.12])
+    mid = (lo + (hi - lo) * rng.beta(2, 2, rows)) * city_mult[city] * (1 + 0.002 * month_idx)
+    titles = np.asarray([c["title"] for c in careers], dtype=object)[pick]
+    seniority = rng.choice(np.asarray(["", "Senior ", "Junior ", "Lead "], dtype=object), size=rows,
+                           p=[0.6, 0.2, 0.15, 0.05])
+    return pd.DataFrame({
+        "title": seniority + titles,
+        "city": np.asarray(SAMPLE_CITIES, dtype=object)[city],
+        "posted_date": dates.strftime("%Y-%m-%d"),
+        "salary_min": np.round(mid * 0.9, -3),
+        "salary_max": np.round(mid * 1.1, -3),
+    })
+
+
+class MarketInsights:
+    def __init__(self, db_path: str = None, roles: RoleMapper = None, cache_size: int = 256):
+        self.db_path = db_path or DB_PATH
+        self.roles = roles or RoleMapper.load()
+        self._cache: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._summary: Optional[pd.DataFrame] = None
+        self._generation: Optional[str] = None  # market_meta generation the cached frames belong to
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS market_summary (
+                    role TEXT NOT NULL,
+                    city TEXT NOT NULL,
+                    month TEXT NOT NULL,
+                    postings INTEGER NOT NULL,
+                    salaried INTEGER NOT NULL,
+                    mean REAL,
+                    {", ".join(f"{p} REAL" for p in PERCENTILES)},
+                    PRIMARY KEY (role, city, month)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('CREATE TABLE IF NOT EXISTS market_meta (key TEXT PRIMARY KEY, value TEXT)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---- offline ingestion -------------------------------------------------
+
+    def ingest(self, sources: Iterable[Union[str, pd.DataFrame]], chunksize: int = CHUNK_ROWS,
+               source: str = None) -> dict:
+        """Replace the summary with aggregates of the given CSV/Parquet files or DataFrames."""
+        started = time.perf_counter()
+        counts: Optional[pd.Series] = None
+        rows = 0
+        names = []
+        for src in sources:
+            chunks = [src] if isinstance(src, pd.DataFrame) else _read_chunks(src, chunksize)
+            names.append("DataFrame" if isinstance(src, pd.DataFrame) else os.path.basename(src))
+            for chunk in chunks:
+                rows += len(chunk)
+                part = _histogram(chunk, self.roles)
+                counts = part if counts is None else counts.add(part, fill_value=0)
+        if counts is None:
+            raise ValueError("nothing to ingest")
+        summary = summarize(counts.astype(np.int64))
+        meta = {"source": source or ", ".join(names), "rows": str(rows), "groups": str(len(summary)),
+                "ingested_at": time.strftime("%Y-%m-%d %H:%M:%S"), "generation": uuid.uuid4().hex}
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM market_summary')
+            cols = DIMS + ["postings", "salaried", "mean", *PERCENTILES]
+            conn.executemany(
+                f'INSERT INTO market_summary ({", ".join(cols)}) VALUES ({", ".join("?" * len(cols))})',
+                summary[cols].astype(object).where(summary[cols].notna(), None).itertuples(index=False, name=None))
+            conn.executemany('INSERT OR REPLACE INTO market_meta (key, value) VALUES (?, ?)', meta.items())
+            conn.commit()
+        finally:
+            conn.close()
+        with self._lock:
+            self._summary = None
+            self._cache.clear()
+        meta["seconds"] = round(time.perf_counter() - started, 3)
+        return meta
+
+    def ensure_data(self, sample_rows: int = 50_000):
+        """Summarize a synthetic sample if no real postings were ever ingested."""
+        if self.info().get("groups") is None:
+            self.ingest([generate_sample(sample_rows)], source="synthetic sample")
+
+    # ---- cached query API ----------------------------------------------------
+
+    def _sync(self):
+        """Drop cached aggregates if the summary was re-ingested since they were read (by any process)."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM market_meta WHERE key = 'generation'").fetchone()
+        finally:
+            conn.close()
+        generation = row[0] if row else None
+        with self._lock:
+            if generation != self._generation:
+                self._generation = generation
+                self._summary = None
+                self._cache.clear()
+
+    def _load(self) -> pd.DataFrame:
+        summary = self._summary
+        if summary is None:
+            conn = self._connect()
+            try:
+                # summary and generation from one read transaction, so they always match
+                conn.execute('BEGIN')
+                summary = pd.read_sql_query('SELECT * FROM market_summary', conn)
+                row = conn.execute("SELECT value FROM market_meta WHERE key = 'generation'").fetchone()
+            finally:
+                conn.close()
+            with self._lock:
+                if (row[0] if row else None) == self._generation:
+                    self._summary = summary
+        return summary
+
+    def _table(self) -> pd.DataFrame:
+        self._sync()
+        return self._load()
+
+    def _cached(self, key: tuple, build) -> pd.DataFrame:
+        self._sync()
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                return hit.copy()
+        generation = self._generation
+        frame = build(self._load())
+        with self._lock:
+            if generation != self._generation:
+                return frame.copy()  # re-ingested meanwhile: don't cache under the new generation
+            self._cache[key] = frame
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return frame.copy()
+
+    def info(self) -> dict:
+        conn = self._connect()
+        try:
+            return dict(conn.execute('SELECT key, value FROM market_meta').fetchall())
+        finally:
+            conn.close()
+
+    def roles_list(self) -> List[str]:
+        t = self._table()
+        return sorted(t.loc[(t.role != ALL) & (t.city == ALL) & (t.month == ALL), "role"])
+
+    def salary_trend(self, role: str = ALL, city: str = ALL) -> pd.DataFrame:
+        """Monthly postings and salary percentiles for one role/city (ALL = every one)."""
+        def build(t):
+            rows = t[(t.role == role) & (t.city == city) & (t.month != ALL) & (t.month != "unknown")]
+            return rows.sort_values("month").reset_index(drop=True)
+        return self._cached(("trend", role, city), build)
+
+    def demand_by_role(self, city: str = ALL, month: str = ALL, top: int = 10) -> pd.DataFrame:
+        """Roles with the most postings, with their salary percentiles."""
+        def build(t):
+            rows = t[(t.role != ALL) & (t.role != "Other") & (t.city == city) & (t.month == month)]
+            return rows.nlargest(top, "postings").reset_index(drop=True)
+        return self._cached(("demand", city, month, top), build)
+
+    def by_city(self, role: str = ALL, top: int = 10) -> pd.DataFrame:
+        """Postings and salary percentiles per city for one role (ALL = every role)."""
+        def build(t):
+            rows = t[(t.role == role) & (t.city != ALL) & (t.month == ALL)]
+            return rows.nlargest(top, "postings").reset_index(drop=True)
+        return self._cached(("city", role, top), build)
+
+    def growth(self, window: int = 6, top: int = 5) -> pd.DataFrame:
+        """Change in postings per role: last `window` months vs the `window` before."""
+        def build(t):
+            rows = t[(t.role != ALL) & (t.role != "Other") & (t.city == ALL) & (t.month != ALL)
+                     & (t.month != "unknown")]
+            months = sorted(rows.month.unique())
+            recent, previous = months[-window:], months[-2 * window:-window]
+            by_month = rows.pivot_table(index="role", columns="month", values="postings", aggfunc="sum").fillna(0)
+            now, before = by_month[recent].sum(axis=1), by_month[previous].sum(axis=1)
+            out = pd.DataFrame({"role": by_month.index, "recent": now.values, "previous": before.values})
+            out["change_pct"] = np.where(out.previous > 0, (out.recent / out.previous.where(out.previous > 0, 1) - 1) * 100, 0)
+            return out.nlargest(top, "change_pct").reset_index(drop=True)
+        return self._cached(("growth", window, top), build)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="aggregate job-posting CSV/Parquet files into the summary table")
+    ingest.add_argument("paths", nargs="+")
+    ingest.add_argument("--chunksize", type=int, default=CHUNK_ROWS)
+    sample = sub.add_parser("sample", help="write a synthetic postings CSV")
+    sample.add_argument("--rows", type=int, default=200_000)
+    sample.add_argument("--seed", type=int, default=7)
+    sample.add_argument("--out", default="postings_sample.csv")
+    show = sub.add_parser("show", help="print the stored aggregates for a role")
+    show.add_argument("--role", default=ALL)
+    args = parser.parse_args(argv)
+
+    if args.command == "sample":
+        generate_sample(args.rows, args.seed).to_csv(args.out, index=False)
+        print(f"Wrote {args.rows} postings to {args.out}")
+    elif args.command == "ingest":
+        print(json.dumps(MarketInsights().ingest(args.paths, chunksize=args.chunksize), indent=2))
+    else:
+        insights = MarketInsights()
+        print(json.dumps(insights.info(), indent=2))
+        print(insights.salary_trend(args.role).to_string(index=False))
+        print(insights.by_city(args.role).to_string(index=False))
+    return 0
+
+
+__all__ = ["MarketInsights", "RoleMapper", "summarize", "generate_sample", "ALL"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
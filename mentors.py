@@ -0,0 +1,253 @@
+"""
+Mentor directory: mentors in SQLite, searchable by expertise, free time slots and goals.
+
+Storage (same database as database.py / jobs.py):
+- mentors: one row per mentor profile
+- mentor_expertise: inverted index (skill -> mentor), one row per canonical taxonomy
+  skill a mentor covers, including the ancestors of what they list, so a search
+  for "Machine Learning" also finds Deep Learning mentors
+- mentor_availability: weekly intervals (weekday, start_min, end_min), indexed for
+  overlap queries (start_min < slot_end AND end_min > slot_start)
+
+search() narrows the directory with one SQL query (expertise, time slot and
+name/expertise text), then ranks the survivors by cosine similarity between the
+student's goals and each mentor's profile embedding. Embeddings are kept in
+memory as one float32 matrix: taxonomy concepts (with ancestors at half weight)
+plus hashed word features, so ranking thousands of mentors is one mat-vec.
+
+Usage:
+    directory = MentorDirectory()
+    directory.search(goals="get into NLP research", expertise="NLP", slot=("evening", None))
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from skill_taxonomy import SkillTaxonomy, normalize
+
+DB_PATH = os.environ.get("CAREER_GUIDANCE_DB") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'career_guidance.db')
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "mentors.json")
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+# named parts of the day as [start, end) minutes
+DAY_PARTS = {"morning": (6 * 60, 12 * 60), "afternoon": (12 * 60, 17 * 60), "evening": (17 * 60, 22 * 60)}
+HASH_DIM = 512
+GOAL_WEIGHT = 0.8  # the rest of the score is the mentor's rating
+
+Slot = Tuple[Optional[str], Optional[str]]  # (day part or "HH:MM-HH:MM", weekday or None)
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _like_escape(text: str) -> str:
+    """`text` with LIKE wildcards escaped, for patterns using ESCAPE '\\'."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def parse_slot(slot: Slot) -> Optional[Tuple[Optional[int], int, int]]:
+    """(weekday index or None, start_min, end_min) for ("evening", "tue") or ("09:00-11:00", None)."""
+    part, day = slot
+    if not part or part.lower() in ("any", "any time"):
+        if not day:
+            return None
+        start, end = 0, 24 * 60
+    elif part.lower() in DAY_PARTS:
+        start, end = DAY_PARTS[part.lower()]
+    else:
+        lo, hi = part.split("-")
+        start, end = _minutes(lo.strip()), _minutes(hi.strip())
+    weekday = WEEKDAYS.index(day.lower()[:3]) if day else None
+    return weekday, start, end
+
+
+class MentorDirectory:
+    def __init__(self, db_path: str = None, taxonomy: SkillTaxonomy = None, seed_path: str = SEED_PATH):
+        self.db_path = db_path or DB_PATH
+        self.taxonomy = taxonomy if taxonomy is not None else SkillTaxonomy.load()
+        self.dim = len(self.taxonomy) + HASH_DIM
+        self._lock = threading.Lock()
+        self._init_db()
+        if seed_path and self.count() == 0:
+            with open(seed_path, "r", encoding="utf-8") as f:
+                self.add_mentors(json.load(f)["mentors"], reload=False)
+        self._load()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS mentors (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    role TEXT,
+                    experience_years INTEGER,
+                    rating REAL,
+                    sessions INTEGER,
+                    expertise TEXT,
+                    bio TEXT
+                );
+                CREATE TABLE IF NOT EXISTS mentor_expertise (
+                    skill TEXT NOT NULL,
+                    mentor_id INTEGER NOT NULL,
+                    direct INTEGER NOT NULL,
+                    PRIMARY KEY (skill, mentor_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS mentor_availability (
+                    mentor_id INTEGER NOT NULL,
+                    weekday INTEGER NOT NULL,
+                    start_min INTEGER NOT NULL,
+                    end_min INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_mentor_availability
+                    ON mentor_availability (weekday, start_min, end_min, mentor_id);
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def count(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT COUNT(*) FROM mentors').fetchone()[0]
+        finally:
+            conn.close()
+
+    def add_mentors(self, mentors: Iterable[dict], reload: bool = True) -> List[int]:
+        """Insert mentor profiles (see config/mentors.json for the shape); returns their ids."""
+        ids = []
+        conn = self._connect()
+        try:
+            for m in mentors:
+                cur = conn.execute('''
+                    INSERT INTO mentors (name, role, experience_years, rating, sessions, expertise, bio)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (m["name"], m.get("role", ""), m.get("experience_years", 0), m.get("rating", 0.0),
+                      m.get("sessions", 0), json.dumps(m.get("expertise", [])), m.get("bio", "")))
+                mid = cur.lastrowid
+                direct = self.taxonomy.ids(m.get("expertise", []))
+                rows = {normalize(self.taxonomy.names[s]): int(s in direct) for s in self.taxonomy.expand(direct)}
+                # skills the taxonomy doesn't know are indexed under their own name, not added to it
+                rows.update((normalize(name), 1) for name in m.get("expertise", [])
+                            if self.taxonomy.resolve(name) is None)
+                conn.executemany('INSERT INTO mentor_expertise (skill, mentor_id, direct) VALUES (?, ?, ?)',
+                                 [(skill, mid, d) for skill, d in rows.items()])
+                conn.executemany('''
+                    INSERT INTO mentor_availability (mentor_id, weekday, start_min, end_min) VALUES (?, ?, ?, ?)
+                ''', [(mid, WEEKDAYS.index(day), _minutes(a["start"]), _minutes(a["end"]))
+                      for a in m.get("availability", []) for day in a["days"]])
+                ids.append(mid)
+            conn.commit()
+        finally:
+            conn.close()
+        if reload:
+            self._load()
+        return ids
+
+    def _load(self):
+        """Read every profile and build the embedding matrix (startup and after writes)."""
+        conn = self._connect()
+        try:
+            rows = conn.execute('''
+                SELECT id, name, role, experience_years, rating, sessions, expertise, bio FROM mentors ORDER BY id
+            ''').fetchall()
+            slots = conn.execute('SELECT mentor_id, weekday, start_min, end_min FROM mentor_availability').fetchall()
+        finally:
+            conn.close()
+        availability: Dict[int, list] = {}
+        for mid, weekday, start, end in slots:
+            availability.setdefault(mid, []).append(
+                f"{WEEKDAYS[weekday].title()} {start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}")
+        profiles = [{
+            "id": r[0], "name": r[1], "role": r[2], "experience_years": r[3], "rating": r[4],
+            "sessions": r[5], "expertise": json.loads(r[6] or "[]"), "bio": r[7],
+            "availability": availability.get(r[0], []),
+        } for r in rows]
+        matrix = np.zeros((len(profiles), self.dim), dtype=np.float32)
+        for i, p in enumerate(profiles):
+            matrix[i] = self.embed(f"{p['role']} {p['bio']} {' '.join(p['expertise'])}", p["expertise"])
+        with self._lock:
+            self.profiles = profiles
+            self.row_of = {p["id"]: i for i, p in enumerate(profiles)}
+            self.embeddings = matrix
+            self.ratings = np.asarray([p["rating"] or 0.0 for p in profiles], dtype=np.float32)
+
+    def embed(self, text: str, skills: Iterable[str] = ()) -> np.ndarray:
+        """Unit vector: taxonomy concepts in the text/skills (ancestors at half weight) + hashed words."""
+        vec = np.zeros(self.dim, dtype=np.float32)
+        n = self.dim - HASH_DIM
+        direct = [int(s) for s in self.taxonomy.extract(text)] + [int(s) for s in self.taxonomy.ids(skills)]
+        for sid in direct:
+            if sid < n:
+                vec[sid] = 1.0
+                for depth, anc in enumerate(self.taxonomy.ancestors(sid), 1):
+                    vec[anc] = max(vec[anc], 0.5 ** depth)
+        for word in re.findall(r"[a-z0-9+#]{3,}", (text or "").lower()):
+            vec[n + zlib.crc32(word.encode("utf-8")) % HASH_DIM] += 0.5
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def candidates(self, expertise: Optional[str] = None, slot: Slot = (None, None),
+                   query: Optional[str] = None) -> List[int]:
+        """Mentor ids passing every filter, from a single SQL query."""
+        where, params = [], []
+        if expertise and expertise.lower() not in ("all", "all areas"):
+            sid = self.taxonomy.resolve(expertise)
+            where.append('m.id IN (SELECT mentor_id FROM mentor_expertise WHERE skill = ?)')
+            params.append(normalize(self.taxonomy.names[sid] if sid is not None else expertise))
+        window = parse_slot(slot)
+        if window is not None:
+            weekday, start, end = window
+            day_clause = 'a.weekday = ? AND ' if weekday is not None else ''
+            where.append(f'''EXISTS (SELECT 1 FROM mentor_availability a
+                            WHERE a.mentor_id = m.id AND {day_clause}a.start_min < ? AND a.end_min > ?)''')
+            params.extend(([weekday] if weekday is not None else []) + [end, start])
+        term = (query or "").strip()
+        if term:
+            sid = self.taxonomy.resolve(term)
+            skill = normalize(self.taxonomy.names[sid]) if sid is not None else normalize(term)
+            skill = skill or term.lower()  # normalize() turns punctuation-only text into ''
+            where.append(r'''(lower(m.name) LIKE ? ESCAPE '\' OR lower(m.role) LIKE ? ESCAPE '\'
+                             OR m.id IN (SELECT mentor_id FROM mentor_expertise WHERE skill LIKE ? ESCAPE '\'))''')
+            text = f"%{_like_escape(term.lower())}%"
+            params.extend([text, text, f"%{_like_escape(skill)}%"])
+        sql = 'SELECT m.id FROM mentors m' + (' WHERE ' + ' AND '.join(where) if where else '')
+        conn = self._connect()
+        try:
+            return [r[0] for r in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def search(self, goals: str = "", expertise: Optional[str] = None, slot: Slot = (None, None),
+               query: Optional[str] = None, limit: int = 10) -> List[dict]:
+        """Available mentors matching the filters, best match for `goals` first (rating breaks ties)."""
+        ids = self.candidates(expertise, slot, query)
+        with self._lock:
+            rows = np.asarray([self.row_of[i] for i in ids if i in self.row_of], dtype=np.int64)
+            if rows.size == 0:
+                return []
+            prior = self.ratings[rows] / 5.0
+            if (goals or "").strip():
+                similarity = self.embeddings[rows] @ self.embed(goals)
+                score = GOAL_WEIGHT * similarity + (1 - GOAL_WEIGHT) * prior
+            else:
+                similarity = np.zeros(rows.size, dtype=np.float32)
+                score = prior
+            order = np.argsort(-score, kind="stable")[:limit]
+            return [dict(self.profiles[rows[i]], match=int(round(float(similarity[i]) * 100)))
+                    for i in order]
+
+
+__all__ = ["MentorDirectory", "parse_slot", "DAY_PARTS", "WEEKDAYS"]
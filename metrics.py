@@ -0,0 +1,235 @@
+"""
+Lightweight in-process metrics: call/error counters and latency histograms per operation.
+
+- observe(op, seconds, error=False): record one call
+- timed(op): context manager; records latency, and an error if the block raises or t.fail() is called
+- instrument(op): decorator form of timed()
+- snapshot(): per-op counts, rates and p50/p95/p99, all-time and over the rolling window
+- render_prometheus(): Prometheus text exposition of the same data
+
+Latencies go into HDR-style log-linear histograms: each power-of-two range of
+microseconds is split into 16 linear sub-buckets, so quantiles are accurate to a
+few percent with O(1) recording and memory bounded by the value range, not the
+number of samples. The rolling window is a ring of per-slot histograms.
+"""
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+SUB_BITS = 4
+SUB_BUCKETS = 1 << SUB_BITS
+WINDOW_S = 300
+SLOT_S = 10
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _bucket(us: int) -> int:
+    if us < SUB_BUCKETS:
+        return us
+    shift = us.bit_length() - (SUB_BITS + 1)
+    return (shift + 1) * SUB_BUCKETS + ((us >> shift) - SUB_BUCKETS)
+
+
+def _bucket_value(index: int) -> float:
+    """Midpoint (in microseconds) of the values that map to `index`."""
+    if index < SUB_BUCKETS:
+        return float(index)
+    shift = index // SUB_BUCKETS - 1
+    top = SUB_BUCKETS + index % SUB_BUCKETS
+    return ((top << shift) + ((top + 1) << shift) - 1) / 2.0
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        seconds = max(0.0, seconds)
+        idx = _bucket(int(seconds * 1e6))
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram"):
+        for idx, n in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + n
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Latency in seconds at quantile q (0 when empty)."""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(q * self.count))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= target:
+                return min(self.max, _bucket_value(idx) / 1e6)
+        return self.max
+
+
+class _Slot:
+    def __init__(self, slot_id: int):
+        self.slot_id = slot_id
+        self.hist = LatencyHistogram()
+        self.errors = 0
+
+
+class OpStats:
+    """All-time and rolling-window stats for one operation."""
+    def __init__(self, window_s: int = WINDOW_S, slot_s: int = SLOT_S):
+        self.slot_s = slot_s
+        self.n_slots = max(1, window_s // slot_s)
+        self.total = LatencyHistogram()
+        self.errors = 0
+        self._slots: List[_Slot] = []
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False, now: float = None):
+        slot_id = int((now if now is not None else time.time()) // self.slot_s)
+        with self._lock:
+            self.total.record(seconds)
+            if error:
+                self.errors += 1
+            if not self._slots or self._slots[-1].slot_id != slot_id:
+                self._slots.append(_Slot(slot_id))
+                self._slots = [s for s in self._slots if s.slot_id > slot_id - self.n_slots]
+            slot = self._slots[-1]
+            slot.hist.record(seconds)
+            if error:
+                slot.errors += 1
+
+    def window(self, now: float = None):
+        """(histogram, errors, window_seconds) over the rolling window."""
+        slot_id = int((now if now is not None else time.time()) // self.slot_s)
+        hist, errors = LatencyHistogram(), 0
+        with self._lock:
+            for s in self._slots:
+                if s.slot_id > slot_id - self.n_slots:
+                    hist.merge(s.hist)
+                    errors += s.errors
+        return hist, errors, self.n_slots * self.slot_s
+
+
+_OPS: Dict[str, OpStats] = {}
+_OPS_LOCK = threading.Lock()
+
+
+def _stats(op: str) -> OpStats:
+    stats = _OPS.get(op)
+    if stats is None:
+        with _OPS_LOCK:
+            stats = _OPS.setdefault(op, OpStats())
+    return stats
+
+
+def observe(op: str, seconds: float, error: bool = False):
+    _stats(op).observe(seconds, error)
+
+
+class _Timer:
+    def __init__(self):
+        self.failed = False
+
+    def fail(self):
+        """Count this call as an error even though it did not raise."""
+        self.failed = True
+
+
+@contextmanager
+def timed(op: str):
+    timer = _Timer()
+    start = time.perf_counter()
+    try:
+        yield timer
+    except BaseException:
+        timer.failed = True
+        raise
+    finally:
+        observe(op, time.perf_counter() - start, timer.failed)
+
+
+def instrument(op: str):
+    """Decorator: time every call of the function under `op`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(op):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> List[dict]:
+    """Per-op stats, sorted by op name."""
+    with _OPS_LOCK:
+        ops = dict(_OPS)
+    rows = []
+    for op in sorted(ops):
+        stats = ops[op]
+        hist, errors, window_s = stats.window()
+        with stats._lock:
+            total_calls, total_errors = stats.total.count, stats.errors
+        rows.append({
+            "op": op,
+            "calls": total_calls,
+            "errors": total_errors,
+            "window_calls": hist.count,
+            "calls_per_min": hist.count * 60.0 / window_s,
+            "error_rate": (errors / hist.count) if hist.count else 0.0,
+            "p50_ms": hist.quantile(0.5) * 1000,
+            "p95_ms": hist.quantile(0.95) * 1000,
+            "p99_ms": hist.quantile(0.99) * 1000,
+        })
+    return rows
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus(prefix: str = "app") -> str:
+    """Prometheus text format: latency summary (all-time) plus call/error counters."""
+    with _OPS_LOCK:
+        ops = dict(_OPS)
+    lat, calls, errs = f"{prefix}_op_latency_seconds", f"{prefix}_op_calls_total", f"{prefix}_op_errors_total"
+    lines = [
+        f"# HELP {lat} Operation latency in seconds.",
+        f"# TYPE {lat} summary",
+    ]
+    counters = []
+    for op in sorted(ops):
+        stats = ops[op]
+        with stats._lock:
+            hist = LatencyHistogram()
+            hist.merge(stats.total)
+            errors = stats.errors
+        label = f'op="{_label(op)}"'
+        for q in QUANTILES:
+            lines.append(f'{lat}{{{label},quantile="{q}"}} {hist.quantile(q):.6f}')
+        lines.append(f"{lat}_sum{{{label}}} {hist.sum:.6f}")
+        lines.append(f"{lat}_count{{{label}}} {hist.count}")
+        counters.append((label, hist.count, errors))
+    lines += [f"# HELP {calls} Operation calls.", f"# TYPE {calls} counter"]
+    lines += [f"{calls}{{{label}}} {n}" for label, n, _ in counters]
+    lines += [f"# HELP {errs} Operation errors.", f"# TYPE {errs} counter"]
+    lines += [f"{errs}{{{label}}} {e}" for label, _, e in counters]
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Drop all recorded metrics (tests, admin reset)."""
+    with _OPS_LOCK:
+        _OPS.clear()
+
+
+__all__ = ["observe", "timed", "instrument", "snapshot", "render_prometheus", "reset", "LatencyHistogram"]
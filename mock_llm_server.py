@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+"""
+Offline OpenAI- and Hugging Face-compatible stub server for load tests.
+
+Endpoints:
+  POST /v1/chat/completions   OpenAI chat completions (JSON or SSE with "stream": true)
+  POST /models/<model>        HF inference API (string or batched list `inputs`)
+  GET  /health, GET /stats    liveness and request/error counters
+
+Behaviour is configurable: a latency distribution for time to first token, a
+token streaming rate, injected HTTP errors, and HF-style 503 "model loading"
+responses with `estimated_time`.
+
+Point the app at it with base-URL config:
+    OPENAI_API_KEY=mock OPENAI_BASE_URL=http://127.0.0.1:8089/v1 \\
+    HUGGINGFACE_API_KEY=mock HUGGINGFACE_BASE_URL=http://127.0.0.1:8089 streamlit run app_new.py
+
+Run standalone:
+    python mock_llm_server.py --port 8089 --latency normal:300,80 --tokens-per-s 40 --error-rate 0.02
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+_WORDS = ("Focus on fundamentals first, then build two portfolio projects that show Python, SQL and "
+          "machine learning skills. Take a statistics course, practice interview questions weekly, "
+          "and network with practitioners in the field you want to join.").split()
+
+
+class MockConfig:
+    """Latency/streaming/error knobs shared by every request to the server.
+
+    latency: "fixed:MS", "normal:MEAN,STD" or "lognormal:MEDIAN,SIGMA" (ms, time to first token)
+    """
+    def __init__(self, latency: str = "fixed:50", tokens_per_s: float = 0.0, max_tokens: int = 60,
+                 error_rate: float = 0.0, error_status: int = 500, loading_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.tokens_per_s = tokens_per_s  # 0 = emit all tokens at once
+        self.max_tokens = max_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.loading_rate = loading_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._dist, self._params = self._parse_latency(latency)
+
+    @staticmethod
+    def _parse_latency(spec: str):
+        kind, _, args = spec.partition(":")
+        params = [float(x) for x in args.split(",") if x.strip()] if args else []
+        if kind not in ("fixed", "normal", "lognormal") or not params:
+            raise ValueError(f"bad latency spec '{spec}'")
+        return kind, params
+
+    def first_token_s(self) -> float:
+        with self._lock:
+            if self._dist == "fixed":
+                ms = self._params[0]
+            elif self._dist == "normal":
+                ms = self._rng.gauss(self._params[0], self._params[1] if len(self._params) > 1 else 0.0)
+            else:
+                sigma = self._params[1] if len(self._params) > 1 else 0.5
+                ms = self._params[0] * self._rng.lognormvariate(0.0, sigma)
+        return max(0.0, ms) / 1000
+
+    def roll(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self._rng.random() < rate
+
+
+def _answer(prompt: str, n_tokens: int) -> list:
+    """Deterministic pseudo-answer: `n_tokens` words chosen from the prompt's hash."""
+    start = sum(map(ord, prompt)) % len(_WORDS)
+    return [_WORDS[(start + i) % len(_WORDS)] for i in range(max(1, n_tokens))]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockLLMServer"
+
+    def log_message(self, format, *args):  # keep load-test output clean
+        pass
+
+    def _json(self, status: int, body, headers: dict = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._json(200, self.server.stats())
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self):
+        body = self._body()
+        cfg = self.server.config
+        if self.path.rstrip("/").endswith("/chat/completions"):
+            kind = "openai"
+        elif self.path.startswith("/models/"):
+            kind = "huggingface"
+        else:
+            self._json(404, {"error": "not found"})
+            return
+        self.server.count(kind, "requests")
+
+        if kind == "huggingface" and cfg.roll(cfg.loading_rate):
+            self.server.count(kind, "loading")
+            self._json(503, {"error": "Model is currently loading", "estimated_time": 1.0})
+            return
+        time.sleep(cfg.first_token_s())
+        if cfg.roll(cfg.error_rate):
+            self.server.count(kind, "errors")
+            self._json(cfg.error_status, {"error": {"message": "injected failure", "type": "mock_error"}})
+            return
+        if kind == "openai":
+            self._openai(body, cfg)
+        else:
+            self._huggingface(body, cfg)
+
+    def _pace(self, cfg: MockConfig, n_tokens: int):
+        if cfg.tokens_per_s > 0:
+            time.sleep(n_tokens / cfg.tokens_per_s)
+
+    def _openai(self, body: dict, cfg: MockConfig):
+        prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+        tokens = _answer(prompt, min(int(body.get("max_tokens") or cfg.max_tokens), cfg.max_tokens))
+        model = body.get("model", "mock")
+        created = int(time.time())
+        if not body.get("stream"):
+            self._pace(cfg, len(tokens))
+            self._json(200, {
+                "id": "chatcmpl-mock", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(tokens)}}],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(tokens),
+                          "total_tokens": len(prompt.split()) + len(tokens)},
+            })
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for i, tok in enumerate(tokens):
+            chunk = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": {"content": tok if i == 0 else " " + tok},
+                                  "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            self._pace(cfg, 1)
+        done = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode())
+        self.wfile.flush()
+
+    def _huggingface(self, body: dict, cfg: MockConfig):
+        inputs = body.get("inputs", "")
+        n = min(int((body.get("parameters") or {}).get("max_new_tokens") or cfg.max_tokens), cfg.max_tokens)
+        prompts = inputs if isinstance(inputs, list) else [inputs]
+        self._pace(cfg, n)
+        outs = [[{"generated_text": " ".join(_answer(str(p), n))}] for p in prompts]
+        self._json(200, outs if isinstance(inputs, list) else outs[0])
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """Threaded stub server; start() serves on a daemon thread, `url` is its base URL.
+
+    Usage:
+        with MockLLMServer(MockConfig(latency="normal:200,50")) as server:
+            os.environ["OPENAI_BASE_URL"] = server.url + "/v1"
+    """
+    daemon_threads = True
+
+    def __init__(self, config: MockConfig = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.config = config or MockConfig()
+        self._counts = {}
+        self._counts_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, kind: str, field: str):
+        with self._counts_lock:
+            bucket = self._counts.setdefault(kind, {"requests": 0, "errors": 0, "loading": 0})
+            bucket[field] += 1
+
+    def stats(self) -> dict:
+        with self._counts_lock:
+            return {k: dict(v) for k, v in self._counts.items()}
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_config_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", default="fixed:50", help="fixed:MS | normal:MEAN,STD | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--tokens-per-s", type=float, default=0.0, help="streaming rate (0 = instant)")
+    parser.add_argument("--max-tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--loading-rate", type=float, default=0.0, help="fraction of HF calls answered 503 loading")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args) -> MockConfig:
+    return MockConfig(latency=args.latency, tokens_per_s=args.tokens_per_s, max_tokens=args.max_tokens,
+                      error_rate=args.error_rate, error_status=args.error_status,
+                      loading_rate=args.loading_rate, seed=args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline OpenAI/HF-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_config_args(parser)
+    args = parser.parse_args()
+    server = MockLLMServer(config_from_args(args), args.host, args.port)
+    print(f"Mock LLM server on {server.url}  (OPENAI_BASE_URL={server.url}/v1, HUGGINGFACE_BASE_URL={server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -1,38 +1,55 @@
 import os
+from lazy_imports import module_available
+from metrics import timed
+from tracing import span
+from singleflight import SingleFlight
 
-try:
-    from openai import OpenAI, APIError
-    OPENAI_AVAILABLE = True
-except Exception:
-    OpenAI = None
-    APIError = Exception
-    OPENAI_AVAILABLE = False
+# Probe only; the SDK is imported when a client with an API key is created,
+# so keyless/offline runs never pay for importing it.
+OPENAI_AVAILABLE = module_available("openai")
+
+# identical prompts in flight at the same time (across sessions) make one API call
+_FLIGHT = SingleFlight("openai.chat")
 
 class OpenAIClient:
     """Wrapper for OpenAI API with modern client.
 
+    `base_url` (or OPENAI_BASE_URL) points the client at any OpenAI-compatible
+    server, e.g. the offline stub in mock_llm_server.py for load tests.
+
     Usage:
         client = OpenAIClient()
         resp = client.chat("Hello")
     """
-    def __init__(self, api_key: str = None, model: str = "gpt-4o-mini"):
+    def __init__(self, api_key: str = None, model: str = "gpt-4o-mini", base_url: str = None):
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
         self.model = model
+        self.base_url = base_url or os.environ.get("OPENAI_BASE_URL") or None
         self.client = None
         
         if OPENAI_AVAILABLE and self.api_key:
             try:
-                self.client = OpenAI(api_key=self.api_key)
+                from openai import OpenAI
+                self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
             except Exception:
                 pass
 
-    def chat(self, prompt: str, system: str = None, temperature: float = 0.2) -> str:
+    def chat(self, prompt: str, system: str = None, temperature: float = 0.2, timeout: float = None) -> str:
+        """Completion text for `prompt`; `timeout` (seconds) bounds the API call."""
         prompt = (prompt or "").strip()
         if not prompt:
             return "No prompt provided."
 
         # If OpenAI client is initialized, call the API.
         if OPENAI_AVAILABLE and self.client and self.api_key:
+            key = (self.base_url, self.model, system, prompt, temperature)
+            text, _ = _FLIGHT.do(key, lambda: self._complete(prompt, system, temperature, timeout))
+            return text
+
+        return self._fallback(prompt)
+
+    def _complete(self, prompt: str, system: str, temperature: float, timeout: float = None) -> str:
+        with timed("openai.chat") as call, span("llm.openai", model=self.model) as s:
             try:
                 completion = self.client.chat.completions.create(
                     model=self.model,
@@ -42,11 +59,15 @@ class OpenAIClient:
                     ],
                     temperature=temperature,
                     max_tokens=500,
+                    **({"timeout": timeout} if timeout is not None else {}),
                 )
                 return completion.choices[0].message.content.strip()
             except Exception as e:
+                call.fail()
+                s.set_status("error", str(e)[:200])
                 return f"OpenAI request failed: {str(e)[:100]}"
 
+    def _fallback(self, prompt: str) -> str:
         # Fallback deterministic response
         lower = prompt.lower()
         if "course" in lower or "recommend" in lower:
@@ -1,7 +1,9 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-import numpy as np
+from shared_resources import get_resource
+from activity import session_user
+from figure_cache import cached_figure
 
 st.set_page_config(page_title="Skills Analysis", page_icon="📊", layout="wide")
 
@@ -43,14 +45,25 @@ for category, skills in skill_categories.items():
         with col:
             rating = st.slider(skill, 0, 5, 3)
             user_skills[skill] = rating
+# other pages (Careers) score against the latest self-assessment
+st.session_state.skill_ratings = user_skills
+if st.button("Save assessment to my progress"):
+    saved = get_resource("activity_store").record_ratings(session_user(st.session_state), user_skills)
+    st.success(f"Saved {saved} updated rating(s) - see your progress on the Development page.")
 
 # Visualization of Skills
 st.subheader("Skills Radar Chart")
 skills_df = pd.DataFrame(list(user_skills.items()), columns=['Skill', 'Rating'])
 
-fig = px.line_polar(skills_df, r='Rating', theta='Skill', line_close=True)
-fig.update_traces(fill='toself')
-st.plotly_chart(fig)
+
+
+def radar_chart():
+    fig = px.line_polar(skills_df, r='Rating', theta='Skill', line_close=True)
+    fig.update_traces(fill='toself')
+    return fig
+
+
+st.plotly_chart(cached_figure("skills.radar", user_skills, radar_chart))
 
 # Skills Gap Analysis
 st.subheader("Skills Gap Analysis")
@@ -60,33 +73,55 @@ with col1:
     st.markdown('<div class="skill-card">', unsafe_allow_html=True)
     st.markdown("### Strengths")
     strengths = skills_df[skills_df['Rating'] >= 4]
-    for _, skill in strengths.iterrows():
-        st.markdown(f"- **{skill['Skill']}** (Rating: {skill['Rating']})")
+    st.markdown("\n".join("- **" + strengths['Skill'] + "** (Rating: " + strengths['Rating'].astype(str) + ")"))
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col2:
     st.markdown('<div class="skill-card">', unsafe_allow_html=True)
     st.markdown("### Areas for Improvement")
     improvements = skills_df[skills_df['Rating'] <= 2]
-    for _, skill in improvements.iterrows():
-        st.markdown(f"- **{skill['Skill']}** (Rating: {skill['Rating']})")
+    st.markdown("\n".join("- **" + improvements['Skill'] + "** (Rating: " + improvements['Rating'].astype(str) + ")"))
     st.markdown('</div>', unsafe_allow_html=True)
 
 # Recommendations
 st.subheader("Personalized Recommendations")
+analyzer = get_resource("skills_gap")
+get_resource("vector_db")  # learning resources come from the shared document index
+target_roles = st.multiselect(
+    "Target roles (leave empty to compare against every career)",
+    options=sorted(c["title"] for c in analyzer.index.careers),
+)
+report = analyzer.analyze(user_skills, roles=target_roles or None, top_roles=5, top_skills=5)
+
 st.markdown('<div class="skill-card">', unsafe_allow_html=True)
-if len(improvements) > 0:
+if report["roles"]:
+    st.markdown("### Role Readiness")
+    readiness_df = pd.DataFrame(report["roles"])
+    readiness_df["gap_skills"] = readiness_df["gap_skills"].str.join(", ")
+    st.dataframe(
+        readiness_df.rename(columns={"title": "Role", "readiness": "Readiness %", "gap_skills": "Skills to Build"}),
+        use_container_width=True, hide_index=True,
+    )
+
+if report["skills"]:
     st.markdown("### Recommended Learning Paths")
-    for _, skill in improvements.iterrows():
-        st.markdown(f"""
-        #### {skill['Skill']} Development Plan
-        1. Complete online courses in {skill['Skill']}
-        2. Practice with hands-on projects
-        3. Join relevant communities and forums
-        4. Track progress through assessments
-        """)
+    gaps_df = pd.DataFrame(report["skills"])[["skill", "gap"]]
+
+    def gap_chart():
+        fig = px.bar(gaps_df, x="gap", y="skill", orientation="h",
+                     labels={"gap": "Weighted gap", "skill": ""}, title="Biggest skill gaps")
+        fig.update_layout(yaxis={"categoryorder": "total ascending"})
+        return fig
+
+    st.plotly_chart(cached_figure("skills.gaps", gaps_df, gap_chart))
+    for gap in report["skills"]:
+        with st.expander(f"{gap['skill']} - current {gap['current']:g}/5, needed by {gap['roles']} role(s)"):
+            if gap.get("resources"):
+                st.markdown("\n".join(f"- {doc}" for doc in gap["resources"]))
+            else:
+                st.markdown(f"No indexed resources yet. Look for an introductory course and a hands-on project in {gap['skill']}.")
 else:
-    st.markdown("Great job! You're proficient in all areas. Consider advanced specialization courses to further enhance your skills.")
+    st.markdown("Great job! You meet the skill requirements of your target roles. Consider advanced specialization courses to further enhance your skills.")
 st.markdown('</div>', unsafe_allow_html=True)
 
 # Progress Tracking
@@ -95,9 +130,8 @@ tracking_data = {
     'Month': ['Jan', 'Feb', 'Mar', 'Apr', 'May'],
     'Progress': [65, 70, 75, 80, 85]
 }
-df = pd.DataFrame(tracking_data)
-fig = px.line(df, x='Month', y='Progress', title='Skills Progress Over Time')
-st.plotly_chart(fig)
+st.plotly_chart(cached_figure("skills.progress", tracking_data, lambda: px.line(
+    pd.DataFrame(tracking_data), x='Month', y='Progress', title='Skills Progress Over Time')))
 
 # Action Plan
 st.subheader("Next Steps")
@@ -1,7 +1,8 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-import numpy as np
+from shared_resources import get_resource
+from figure_cache import cached_figure
 
 st.set_page_config(page_title="Career Explorer", page_icon="�", layout="wide")
 
@@ -30,6 +31,7 @@ st.markdown("""
 st.title("Career Explorer 🎯")
 
 # Career Search and Filters
+index = get_resource("career_index")
 col1, col2, col3 = st.columns(3)
 
 with col1:
@@ -38,50 +40,31 @@ with col1:
 with col2:
     industry = st.selectbox(
         "Industry",
-        ["All", "Technology", "Healthcare", "Finance", "Education", "Manufacturing"]
+        ["All"] + index.industries
     )
 
 with col3:
     experience = st.selectbox(
         "Experience Level",
-        ["Entry Level", "Mid Level", "Senior Level", "Executive"]
+        index.experience_levels
     )
 
+# Skills to match against: Skills page self-assessment (rated 3+) and profile skills
+ratings = {k: v for k, v in st.session_state.get("skill_ratings", {}).items() if v >= 3}
+profile_skills = st.session_state.get("user_info", {}).get("skills") or []
+known = {s.lower(): s for s in index.skill_names}
+default_skills = list(dict.fromkeys(known[s.lower()] for s in list(ratings) + list(profile_skills) if s.lower() in known))
+my_skills = st.multiselect("Your Skills", sorted(index.skill_names, key=str.lower), default=default_skills)
+user_skills = {s: ratings.get(s, 5) for s in my_skills}
+
 # Career Recommendations
 st.subheader("Recommended Careers")
-
-# Sample career data
-careers = [
-    {
-        "title": "Data Scientist",
-        "industry": "Technology",
-        "salary_range": "$90,000 - $150,000",
-        "growth_rate": "22%",
-        "match_score": 95,
-        "skills_required": ["Python", "Machine Learning", "Statistics", "SQL", "Data Visualization"],
-        "description": "Analyze complex data to help companies make better decisions"
-    },
-    {
-        "title": "AI Engineer",
-        "industry": "Technology",
-        "salary_range": "$100,000 - $160,000",
-        "growth_rate": "25%",
-        "match_score": 88,
-        "skills_required": ["Python", "Deep Learning", "TensorFlow", "Computer Vision", "NLP"],
-        "description": "Design and develop AI systems and solutions"
-    },
-    {
-        "title": "ML Engineer",
-        "industry": "Technology",
-        "salary_range": "$95,000 - $155,000",
-        "growth_rate": "20%",
-        "match_score": 85,
-        "skills_required": ["Python", "Machine Learning", "DevOps", "APIs", "Deployment"],
-        "description": "Build and deploy machine learning models to production"
-    }
-]
+careers = index.top_k(user_skills, k=6, industry=industry, experience=experience, search=search)
+if not careers:
+    st.info("No careers match these filters.")
 
 for career in careers:
+    matched = f" (you have: {', '.join(career['skills_matched'])})" if career["skills_matched"] else ""
     st.markdown(f"""
     <div class="career-card">
         <h3>{career['title']}</h3>
@@ -92,31 +75,30 @@ for career in careers:
             <span>Match Score: <span class="highlight">{career['match_score']}%</span></span>
         </div>
         <p>{career['description']}</p>
-        <p><strong>Required Skills:</strong> {', '.join(career['skills_required'])}</p>
+        <p><strong>Required Skills:</strong> {', '.join(career['skills_required'])}{matched}</p>
     </div>
     """, unsafe_allow_html=True)
 
-# Career Insights
+# Career Insights (pre-aggregated job-posting data, see market_data.py)
 st.subheader("Career Insights")
+market = get_resource("market_insights")
+market_roles = ["All Roles"] + market.roles_list()
+default_role = careers[0]["title"] if careers and careers[0]["title"] in market_roles else "All Roles"
+market_role = st.selectbox("Market data for", market_roles, index=market_roles.index(default_role))
+role_key = "*" if market_role == "All Roles" else market_role
 col1, col2 = st.columns(2)
 
 with col1:
-    # Sample data for salary trends
-    salary_data = pd.DataFrame({
-        'Year': [2020, 2021, 2022, 2023, 2024],
-        'Salary': [85000, 92000, 98000, 105000, 112000]
-    })
-    fig = px.line(salary_data, x='Year', y='Salary', title='Salary Trends')
-    st.plotly_chart(fig)
+    salary_data = market.salary_trend(role_key)
+    st.plotly_chart(cached_figure("careers.salary", (market_role, salary_data), lambda: px.line(
+        salary_data, x='month', y=['p25', 'p50', 'p75'], title=f'Salary Trends: {market_role}',
+        labels={'month': 'Month', 'value': 'Salary', 'variable': 'Percentile'})))
 
 with col2:
-    # Sample data for job demand
-    demand_data = pd.DataFrame({
-        'Role': ['Data Scientist', 'AI Engineer', 'ML Engineer'],
-        'Demand': [85, 90, 80]
-    })
-    fig = px.bar(demand_data, x='Role', y='Demand', title='Job Market Demand')
-    st.plotly_chart(fig)
+    demand_data = market.demand_by_role(top=8)
+    st.plotly_chart(cached_figure("careers.demand", demand_data, lambda: px.bar(
+        demand_data, x='role', y='postings', title='Job Market Demand',
+        labels={'role': 'Role', 'postings': 'Job postings'})))
 
 # Career Development Resources
 st.subheader("Career Development Resources")
@@ -148,13 +130,12 @@ with col2:
 
 # Job Market Analysis
 st.subheader("Job Market Analysis")
-market_data = pd.DataFrame({
-    'City': ['San Francisco', 'New York', 'Seattle', 'Boston', 'Austin'],
-    'Job_Openings': [1200, 1000, 800, 600, 500],
-    'Avg_Salary': [130000, 125000, 115000, 110000, 105000]
-})
-
-fig = px.scatter(market_data, x='Job_Openings', y='Avg_Salary', 
-                size='Job_Openings', text='City',
-                title='Job Market by City')
-st.plotly_chart(fig)
\ No newline at end of file
+market_data = market.by_city(role_key)
+
+st.plotly_chart(cached_figure("careers.cities", (market_role, market_data), lambda: px.scatter(
+    market_data, x='postings', y='p50', size='postings', text='city',
+    labels={'postings': 'Job Openings', 'p50': 'Median Salary'},
+    title=f'Job Market by City: {market_role}')))
+source = market.info()
+st.caption(f"Source: {source.get('source', 'n/a')} ({source.get('rows', '0')} postings, "
+           f"aggregated {source.get('ingested_at', 'never')})")
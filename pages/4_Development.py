@@ -1,8 +1,10 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
+from shared_resources import get_resource
+from activity import session_user
+from figure_cache import cached_figure
 
 st.set_page_config(page_title="Development Timeline", page_icon="📈", layout="wide")
 
@@ -32,50 +34,67 @@ st.markdown("""
 
 st.title("Development Tracking 📈")
 
+# Progress comes from the activity log (activity.py): cards and charts read its rollups
+activity = get_resource("activity_store")
+user = session_user(st.session_state)
+totals = activity.totals(user)
+assessed = totals["skills"]
+
 # Overall Progress
 st.subheader("Overall Progress")
 col1, col2, col3 = st.columns(3)
 
 with col1:
-    st.markdown("""
+    skill_level = f"{sum(assessed.values()) / len(assessed) / 5 * 100:.0f}%" if assessed else "n/a"
+    st.markdown(f"""
     <div class="dev-card">
         <h3>Skill Progress</h3>
-        <h2 style="color: #1E88E5;">85%</h2>
-        <p>Overall skill development</p>
+        <h2 style="color: #1E88E5;">{skill_level}</h2>
+        <p>Average of your latest self-ratings ({len(assessed)} skills)</p>
     </div>
     """, unsafe_allow_html=True)
 
 with col2:
-    st.markdown("""
+    st.markdown(f"""
     <div class="dev-card">
-        <h3>Goals Achieved</h3>
-        <h2 style="color: #1E88E5;">12/15</h2>
-        <p>Completed milestones</p>
+        <h3>Certifications</h3>
+        <h2 style="color: #1E88E5;">{totals['certifications']}</h2>
+        <p>Completed certifications</p>
     </div>
     """, unsafe_allow_html=True)
 
 with col3:
-    st.markdown("""
+    st.markdown(f"""
     <div class="dev-card">
         <h3>Learning Hours</h3>
-        <h2 style="color: #1E88E5;">120</h2>
-        <p>Total hours invested</p>
+        <h2 style="color: #1E88E5;">{totals['hours']:g}</h2>
+        <p>Total hours invested ({totals['sessions']} sessions)</p>
     </div>
     """, unsafe_allow_html=True)
 
 # Skill Development Timeline
 st.subheader("Skill Development Timeline")
-timeline_data = pd.DataFrame({
-    'Date': pd.date_range(start='2025-01-01', periods=10, freq='ME'),
-    'Technical_Skills': np.random.randint(60, 100, size=10),
-    'Soft_Skills': np.random.randint(70, 95, size=10),
-    'Domain_Knowledge': np.random.randint(50, 90, size=10)
-})
-
-fig = px.line(timeline_data, x='Date', 
-              y=['Technical_Skills', 'Soft_Skills', 'Domain_Knowledge'],
-              title='Skills Progress Over Time')
-st.plotly_chart(fig)
+grain = st.radio("Group by", ["week", "month", "day"], horizontal=True)
+col1, col2 = st.columns(2)
+
+with col1:
+    tracked = sorted(assessed, key=lambda s: -assessed[s])[:6]
+    scores = activity.series(user, grain="month", skills=tracked) if tracked else pd.DataFrame()
+    if scores.empty:
+        st.info("Save a self-assessment on the Skills page to track your skill scores over time.")
+    else:
+        st.plotly_chart(cached_figure("development.scores", scores, lambda: px.line(
+            scores, x="period", y="score", color="skill", markers=True, title="Skill Scores by Month",
+            labels={"period": "Month", "score": "Average rating (0-5)", "skill": "Skill"})))
+
+with col2:
+    hours = activity.series(user, grain=grain)
+    if hours["hours"].sum() == 0:
+        st.info("Log a learning activity below to see your study hours.")
+    else:
+        st.plotly_chart(cached_figure("development.hours", (grain, hours), lambda: px.bar(
+            hours, x="period", y="hours", title=f"Learning Hours by {grain.title()}",
+            labels={"period": grain.title(), "hours": "Hours"})))
 
 # Learning Goals
 st.subheader("Learning Goals")
@@ -115,21 +134,35 @@ with col2:
 
 # Learning Activities
 st.subheader("Recent Learning Activities")
-activities = [
-    {"date": "2025-10-19", "activity": "Completed Python Advanced Course", "hours": 2.5},
-    {"date": "2025-10-18", "activity": "Worked on Portfolio Project", "hours": 3.0},
-    {"date": "2025-10-17", "activity": "Attended ML Workshop", "hours": 4.0}
-]
+col1, col2 = st.columns([2, 1])
 
-st.markdown('<div class="dev-card">', unsafe_allow_html=True)
-for activity in activities:
-    st.markdown(f"""
-    <div style="border-left: 3px solid #1E88E5; padding-left: 16px; margin: 16px 0;">
-        <h4>{activity['activity']}</h4>
-        <p>Date: {activity['date']} | Hours: {activity['hours']}</p>
-    </div>
-    """, unsafe_allow_html=True)
-st.markdown('</div>', unsafe_allow_html=True)
+with col2:
+    with st.form("log_activity_form", clear_on_submit=True):
+        st.markdown("### Log Activity")
+        title = st.text_input("What did you do?", placeholder="e.g., Completed Python Advanced Course")
+        skill = st.text_input("Skill (optional)", placeholder="e.g., Python")
+        kind = st.selectbox("Type", ["Study session", "Certification earned"])
+        hours_spent = st.number_input("Hours", min_value=0.0, max_value=24.0, value=1.0, step=0.5)
+        day = st.date_input("Date")
+        if st.form_submit_button("Log Activity") and title.strip():
+            activity.record(user, "certification" if kind == "Certification earned" else "study",
+                            ts=day, skill=skill, hours=hours_spent, title=title.strip())
+            st.success("Activity logged!")
+            st.rerun()
+
+with col1:
+    st.markdown('<div class="dev-card">', unsafe_allow_html=True)
+    activities = activity.recent(user, limit=5, kinds=["study", "certification"])
+    if not activities:
+        st.markdown("No activities logged yet.")
+    for entry in activities:
+        st.markdown(f"""
+        <div style="border-left: 3px solid #1E88E5; padding-left: 16px; margin: 16px 0;">
+            <h4>{entry['title'] or entry['skill'] or entry['kind'].title()}</h4>
+            <p>Date: {entry['ts'][:10]} | Hours: {entry['hours']:g}</p>
+        </div>
+        """, unsafe_allow_html=True)
+    st.markdown('</div>', unsafe_allow_html=True)
 
 # Certifications and Achievements
 st.subheader("Certifications & Achievements")
@@ -138,13 +171,11 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown('<div class="dev-card">', unsafe_allow_html=True)
     st.markdown("### Completed Certifications")
-    certifications = [
-        "Python Developer Certification",
-        "Machine Learning Fundamentals",
-        "Data Science Essentials"
-    ]
+    certifications = activity.recent(user, limit=20, kinds=["certification"])
+    if not certifications:
+        st.markdown("None logged yet - log a certification above when you earn one.")
     for cert in certifications:
-        st.markdown(f"✅ {cert}")
+        st.markdown(f"✅ {cert['title']} ({cert['ts'][:10]})")
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col2:
@@ -161,19 +192,52 @@ with col2:
 
 # Development Recommendations
 st.subheader("Personalized Recommendations")
+career_index = get_resource("career_index")
+planner = get_resource("learning_planner")
+
+# saved assessments, the latest self-assessment from the Skills page, plus profile skills as known
+ratings = dict(assessed)
+ratings.update(st.session_state.get("skill_ratings", {}))
+user_info = st.session_state.get("user_info") or {}
+for skill in user_info.get("skills", []):
+    ratings[skill] = max(ratings.get(skill, 0), 5)
+
+col1, col2 = st.columns([2, 1])
+with col1:
+    target_role = st.selectbox("Target role", sorted(c["title"] for c in career_index.careers))
+with col2:
+    hours_per_week = st.slider("Study hours per week", 2, 40, 8)
+
+plan = planner.plan_for_career(ratings, career_index.career(target_role))
+if not ratings:
+    st.caption("Rate your skills on the Skills page (or add them to your profile) to skip what you already know.")
+
 st.markdown('<div class="dev-card">', unsafe_allow_html=True)
-st.markdown("""
-### Recommended Next Steps
-1. **Complete Advanced Python Course**
-   - Estimated time: 20 hours
-   - Priority: High
-   
-2. **Start Cloud Computing Project**
-   - Estimated time: 15 hours
-   - Priority: Medium
-   
-3. **Prepare for ML Certification**
-   - Estimated time: 30 hours
-   - Priority: High
-""")
-st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
+if plan["steps"]:
+    weeks = plan["total_hours"] / hours_per_week
+    st.markdown(f"### Fastest path to {plan['role']}: {plan['total_hours']:.0f} hours (~{weeks:.0f} weeks)")
+    start_date = datetime.now().date()
+
+    def plan_chart():
+        plan_df = pd.DataFrame(plan["steps"])
+        start = pd.Timestamp(start_date)
+        plan_df["Start"] = start + pd.to_timedelta((plan_df["cumulative_hours"] - plan_df["hours"]) / hours_per_week * 7, unit="D")
+        plan_df["Finish"] = start + pd.to_timedelta(plan_df["cumulative_hours"] / hours_per_week * 7, unit="D")
+        fig = px.timeline(plan_df, x_start="Start", x_end="Finish", y="skill", hover_data=["resource", "hours"],
+                          title="Learning Path")
+        fig.update_yaxes(autorange="reversed", title="")
+        return fig
+
+    st.plotly_chart(cached_figure("development.plan", (plan["steps"], hours_per_week, start_date), plan_chart))
+
+    st.markdown("### Recommended Next Steps")
+    st.markdown("\n".join(
+        f"{i}. **{step['skill']}**" + (f" - {step['resource']}" if step["resource"] else "")
+        + f"\n   - Estimated time: {step['hours']:.0f} hours"
+        + (f"\n   - After: {', '.join(step['after'])}" if step["after"] else "")
+        for i, step in enumerate(plan["steps"][:3], 1)
+    ))
+else:
+    st.markdown(f"### You already cover every skill {plan['role']} requires")
+    st.markdown("Consider advanced specialization courses or mentoring others to keep growing.")
+st.markdown('</div>', unsafe_allow_html=True)
@@ -1,7 +1,8 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-import numpy as np
+from shared_resources import get_resource
+from figure_cache import cached_figure
 
 st.set_page_config(page_title="Mentorship", page_icon="👥", layout="wide")
 
@@ -35,10 +36,18 @@ st.markdown("""
 st.title("Mentorship Hub 👥")
 
 # Find a Mentor
+directory = get_resource("mentor_directory")
 st.markdown('<div class="mentor-container">', unsafe_allow_html=True)
 st.subheader("🔍 Find a Mentor")
 
-col1, col2, col3 = st.columns([2,1,1])
+user_goals = (st.session_state.get("user_info") or {}).get("goals", [])
+goals = st.text_area(
+    "What would you like help with?",
+    value=", ".join(user_goals) if isinstance(user_goals, list) else str(user_goals),
+    placeholder="e.g., Move from data analysis into machine learning engineering",
+)
+
+col1, col2, col3, col4 = st.columns([2,1,1,1])
 
 with col1:
     search = st.text_input("Search mentors by name or expertise", placeholder="e.g., Machine Learning, Python")
@@ -46,7 +55,7 @@ with col1:
 with col2:
     expertise = st.selectbox(
         "Area of Expertise",
-        ["All Areas", "Machine Learning", "Data Science", "AI Research", "MLOps"]
+        ["All Areas"] + sorted({skill for m in directory.profiles for skill in m["expertise"]})
     )
 
 with col3:
@@ -54,40 +63,27 @@ with col3:
         "Availability",
         ["Any Time", "Morning", "Afternoon", "Evening"]
     )
+
+with col4:
+    day = st.selectbox("Day", ["Any Day", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"])
 st.markdown('</div>', unsafe_allow_html=True)
 
 # Mentor Profiles
 st.markdown('<div class="mentor-container">', unsafe_allow_html=True)
-st.subheader("👨‍🏫 Featured Mentors")
-
-mentors = [
-    {
-        "name": "Dr. Sarah Johnson",
-        "role": "Senior AI Researcher at Google",
-        "expertise": ["Machine Learning", "Deep Learning", "Computer Vision"],
-        "experience": "15+ years",
-        "rating": 4.9,
-        "sessions": 120
-    },
-    {
-        "name": "Michael Chen",
-        "role": "Lead Data Scientist at Amazon",
-        "expertise": ["Data Science", "NLP", "Big Data"],
-        "experience": "10+ years",
-        "rating": 4.8,
-        "sessions": 85
-    },
-    {
-        "name": "Dr. James Wilson",
-        "role": "AI Research Director at OpenAI",
-        "expertise": ["AI Research", "Reinforcement Learning", "Neural Networks"],
-        "experience": "12+ years",
-        "rating": 4.9,
-        "sessions": 150
-    }
-]
+st.subheader("👨‍🏫 Recommended Mentors" if goals.strip() else "👨‍🏫 Featured Mentors")
+
+mentors = directory.search(
+    goals=goals,
+    expertise=expertise,
+    slot=(availability, None if day == "Any Day" else day),
+    query=search,
+    limit=10,
+)
+if not mentors:
+    st.info("No mentors match these filters. Try another time slot or a broader area of expertise.")
 
 for mentor in mentors:
+    match = f" | Goal match: {mentor['match']}%" if goals.strip() else ""
     st.markdown(f"""
     <div class="profile-card">
         <div style="display: flex; justify-content: space-between; align-items: center;">
@@ -97,7 +93,9 @@ for mentor in mentors:
             </span>
         </div>
         <p><strong>{mentor['role']}</strong></p>
-        <p>Experience: {mentor['experience']} | Sessions Completed: {mentor['sessions']}</p>
+        <p>{mentor['bio']}</p>
+        <p>Experience: {mentor['experience_years']}+ years | Sessions Completed: {mentor['sessions']}{match}</p>
+        <p>Available: {', '.join(mentor['availability'])}</p>
         <div>
             {''.join([f'<span style="background-color: #E1BEE7; color: #4A148C; padding: 4px 12px; border-radius: 15px; margin: 4px; display: inline-block;">{exp}</span>' for exp in mentor['expertise']])}
         </div>
@@ -172,18 +170,18 @@ with col1:
 
 with col2:
     # Sample progress data
-    dates = pd.date_range(start='2025-01-01', end='2025-06-30', freq='M')
+    dates = pd.date_range(start='2025-01-01', end='2025-06-30', freq='ME')
     progress_data = pd.DataFrame({
         'Month': dates,
         'Sessions': [4, 6, 5, 8, 7, 9],
         'Goals Completed': [2, 4, 3, 5, 4, 6]
     })
     
-    fig = px.line(
+    fig = cached_figure("mentorship.activity", progress_data, lambda: px.line(
         progress_data,
         x='Month',
         y=['Sessions', 'Goals Completed'],
         title='Mentorship Activity'
-    )
+    ))
     st.plotly_chart(fig, use_container_width=True)
 st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
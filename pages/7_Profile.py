@@ -2,7 +2,11 @@ import streamlit as st
 import json
 import pandas as pd
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+import plotly.express as px
+from shared_resources import get_resource
+from activity import session_user
+from figure_cache import cached_figure
 
 st.set_page_config(page_title="Profile & Quick Actions", page_icon="👤", layout="wide")
 
@@ -38,6 +42,24 @@ with tab1:
         for goal in user.get('goals', []):
             st.write(f"• {goal}")
 
+    # Learning activity, from the pre-rolled aggregates of the activity log
+    st.subheader("Learning Activity")
+    activity = get_resource("activity_store")
+    username = session_user(st.session_state)
+    totals = activity.totals(username)
+    recent_weeks = activity.series(username, grain="week", since=datetime.now() - timedelta(weeks=12))
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Learning Hours", f"{totals['hours']:g}")
+    col2.metric("Last 12 Weeks", f"{recent_weeks['hours'].sum():g} h")
+    col3.metric("Certifications", totals["certifications"])
+    if recent_weeks["hours"].sum() > 0:
+        st.plotly_chart(cached_figure("profile.weekly_hours", recent_weeks, lambda: px.bar(
+            recent_weeks, x="period", y="hours", title="Weekly Learning Hours",
+            labels={"period": "Week", "hours": "Hours"})), use_container_width=True)
+    practiced = sorted(((s, h) for s, h in totals["skill_hours"].items() if h), key=lambda kv: -kv[1])[:5]
+    if practiced:
+        st.write("Most practiced: " + ", ".join(f"{skill} ({hours:g} h)" for skill, hours in practiced))
+
 # ===== TAB 2: Update Profile =====
 with tab2:
     st.header("Update Profile Information")
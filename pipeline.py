@@ -0,0 +1,123 @@
+"""
+Streaming pipeline executor for chains of LLM stages.
+
+A stage declares the upstream stages it reads from. The executor:
+- runs every stage's `prefetch` (e.g. vector DB retrieval) up front, in parallel
+- streams each stage's chunks to the caller as they are produced
+- starts a downstream stage as soon as its inputs are complete, or earlier when the
+  stage's `prefix_ready(dep, text)` says the streamed prefix of an upstream is enough
+
+Usage:
+    stages = [
+        Stage("outline", lambda up, ctx, emit: write(emit)),
+        Stage("review", lambda up, ctx, emit: review(up["outline"], emit), deps=["outline"]),
+    ]
+    for event in StreamingPipeline(stages).stream():
+        print(event.stage, event.kind, event.text)
+"""
+import contextvars
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+
+class PipelineEvent(NamedTuple):
+    stage: str
+    kind: str  # "chunk", "done" or "error"
+    text: str
+
+
+class Stage:
+    """One step of a pipeline.
+
+    `fn(upstream, context, emit)` receives the text of each dependency (complete, or
+    the prefix it was started from), the result of `prefetch()` and an `emit(chunk)`
+    callback for streaming; it returns the stage's full output.
+    """
+    def __init__(self, name: str, fn: Callable, deps: List[str] = None,
+                 prefetch: Callable[[], object] = None,
+                 prefix_ready: Callable[[str, str], bool] = None):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps or [])
+        self.prefetch = prefetch
+        self.prefix_ready = prefix_ready
+
+
+def section_reached(number: int) -> Callable[[str, str], bool]:
+    """prefix_ready rule: upstream has started numbered section `number` (e.g. '3.')."""
+    pattern = re.compile(rf"^\s*{number}[.)]\s", re.MULTILINE)
+    return lambda dep, text: bool(pattern.search(text))
+
+
+class StreamingPipeline:
+    def __init__(self, stages: List[Stage], max_workers: int = None):
+        self.stages = stages
+        names = {s.name for s in stages}
+        for s in stages:
+            missing = [d for d in s.deps if d not in names]
+            if missing:
+                raise ValueError(f"stage '{s.name}' depends on unknown stages {missing}")
+        self.max_workers = max_workers or max(2, 2 * len(stages))
+
+    def _submit(self, executor, fn, *args):
+        # carry the caller's context (prompt-budget turn, tracing span) into the worker
+        return executor.submit(contextvars.copy_context().run, fn, *args)
+
+    def stream(self) -> Iterator[PipelineEvent]:
+        events: "queue.Queue[PipelineEvent]" = queue.Queue()
+        buffers: Dict[str, List[str]] = {s.name: [] for s in self.stages}
+        finished: Dict[str, Optional[str]] = {}  # name -> output (None on error)
+        started = set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as executor:
+            prefetched = {s.name: self._submit(executor, s.prefetch) for s in self.stages if s.prefetch}
+
+            def run(stage: Stage, upstream: Dict[str, str]):
+                try:
+                    fut = prefetched.get(stage.name)
+                    context = fut.result() if fut else None
+                    emit = lambda chunk: events.put(PipelineEvent(stage.name, "chunk", chunk))
+                    out = stage.fn(upstream, context, emit)
+                    events.put(PipelineEvent(stage.name, "done", out or ""))
+                except Exception as e:
+                    events.put(PipelineEvent(stage.name, "error", str(e)))
+
+            def start_ready():
+                for stage in self.stages:
+                    if stage.name in started:
+                        continue
+                    failed = [d for d in stage.deps if d in finished and finished[d] is None]
+                    if failed:
+                        started.add(stage.name)
+                        events.put(PipelineEvent(stage.name, "error", f"upstream stage '{failed[0]}' failed"))
+                        continue
+                    upstream = {}
+                    for dep in stage.deps:
+                        if dep in finished:
+                            upstream[dep] = finished[dep]
+                            continue
+                        prefix = "".join(buffers[dep])
+                        if stage.prefix_ready and prefix and stage.prefix_ready(dep, prefix):
+                            upstream[dep] = prefix
+                        else:
+                            break
+                    else:
+                        started.add(stage.name)
+                        self._submit(executor, run, stage, upstream)
+
+            start_ready()
+            while len(finished) < len(self.stages):
+                event = events.get()
+                if event.kind == "chunk":
+                    buffers[event.stage].append(event.text)
+                elif event.kind == "done":
+                    finished[event.stage] = event.text
+                else:
+                    finished[event.stage] = None
+                yield event
+                start_ready()
+
+
+__all__ = ["PipelineEvent", "Stage", "StreamingPipeline", "section_reached"]
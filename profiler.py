@@ -0,0 +1,201 @@
+"""
+Sampling CPU profiler for the running app process (all threads, pure Python).
+
+A daemon thread wakes every `interval_s`, grabs every thread's stack with
+sys._current_frames() and counts identical stacks. Nothing is hooked into the
+profiled code, so the cost is one stack walk per thread per tick (~1% at the
+default 100 Hz) and it is safe to leave on in production at lower rates.
+
+- start(duration_s, interval_s): begin a capture (one at a time per process)
+- stop(): end it early and write the output files
+- status(): running flag, samples so far, files from the last capture
+- list_profiles(): captures saved under debug_logs/
+
+Each capture is written as a collapsed-stack file (flamegraph.pl / speedscope
+import) and a speedscope JSON document.
+
+Usage:
+    import profiler
+    profiler.start(duration_s=30)
+    ...
+    print(profiler.status()["files"])
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_DIR = "debug_logs"
+DEFAULT_INTERVAL_S = 0.01
+MAX_DEPTH = 128
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+
+class SamplingProfiler:
+    def __init__(self, interval_s: float = DEFAULT_INTERVAL_S, out_dir: str = PROFILE_DIR):
+        self.interval_s = interval_s
+        self.out_dir = out_dir
+        self.stacks: Dict[str, Counter] = {}
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+        self.files: Dict[str, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self, names: Dict[int, str]):
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                code = frame.f_code
+                stack.append((code.co_name, os.path.basename(code.co_filename), code.co_firstlineno))
+                frame = frame.f_back
+            thread = names.get(ident, f"thread-{ident}")
+            self.stacks.setdefault(thread, Counter())[tuple(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self, duration_s: Optional[float]):
+        deadline = time.monotonic() + duration_s if duration_s else None
+        names_refreshed = 0.0
+        names: Dict[int, str] = {}
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if now - names_refreshed > 1.0:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                names_refreshed = now
+            self._sample(names)
+            if deadline is not None and now >= deadline:
+                break
+            self._stop.wait(self.interval_s)
+        self.ended_at = time.time()
+        self.files = self.write()
+
+    def start(self, duration_s: Optional[float] = None):
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, args=(duration_s,), name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def collapsed(self) -> List[str]:
+        """Lines of `thread;outer;...;inner count`, the flamegraph.pl input format."""
+        lines = []
+        for thread, counter in self.stacks.items():
+            for stack, count in counter.items():
+                frames = ";".join(f"{fn} ({file}:{line})" for fn, file, line in stack)
+                lines.append(f"{thread};{frames} {count}")
+        return sorted(lines)
+
+    def speedscope(self, name: str = "profile") -> dict:
+        """Speedscope file-format document with one sampled profile per thread."""
+        frames: List[dict] = []
+        index: Dict[Frame, int] = {}
+        profiles = []
+        for thread, counter in self.stacks.items():
+            samples, weights = [], []
+            for stack, count in counter.items():
+                ids = []
+                for fr in stack:
+                    if fr not in index:
+                        index[fr] = len(frames)
+                        frames.append({"name": fr[0], "file": fr[1], "line": fr[2]})
+                    ids.append(index[fr])
+                samples.append(ids)
+                weights.append(count * self.interval_s)
+            profiles.append({"type": "sampled", "name": thread, "unit": "seconds", "startValue": 0,
+                             "endValue": sum(weights), "samples": samples, "weights": weights})
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "career-guidance profiler",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def write(self) -> Dict[str, str]:
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(self.out_dir, f"profile_{stamp}")
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            f.write("\n".join(self.collapsed()) + "\n")
+        with open(base + ".speedscope.json", "w", encoding="utf-8") as f:
+            json.dump(self.speedscope(name=f"profile_{stamp}"), f)
+        return {"collapsed": base + ".collapsed", "speedscope": base + ".speedscope.json"}
+
+    def top_functions(self, limit: int = 15) -> List[dict]:
+        """Self-time ranking: how often each function was the innermost frame."""
+        own = Counter()
+        for counter in self.stacks.values():
+            for stack, count in counter.items():
+                if stack:
+                    own[stack[-1]] += count
+        total = sum(own.values()) or 1
+        return [{"function": fn, "file": f"{file}:{line}", "samples": n, "share": n / total}
+                for (fn, file, line), n in own.most_common(limit)]
+
+
+_CURRENT: Optional[SamplingProfiler] = None
+_LOCK = threading.Lock()
+
+
+def start(duration_s: Optional[float] = 30.0, interval_s: float = DEFAULT_INTERVAL_S,
+          out_dir: str = PROFILE_DIR) -> bool:
+    """Start a capture; returns False if one is already running in this process."""
+    global _CURRENT
+    with _LOCK:
+        if _CURRENT is not None and _CURRENT.running:
+            return False
+        _CURRENT = SamplingProfiler(interval_s, out_dir)
+        _CURRENT.start(duration_s)
+        return True
+
+
+def stop() -> Dict[str, str]:
+    """Stop the running capture (if any) and return the files it wrote."""
+    with _LOCK:
+        prof = _CURRENT
+    if prof is None:
+        return {}
+    prof.stop()
+    return prof.files
+
+
+def status() -> dict:
+    with _LOCK:
+        prof = _CURRENT
+    if prof is None:
+        return {"running": False, "samples": 0, "files": {}, "top": []}
+    return {
+        "running": prof.running,
+        "samples": prof.samples,
+        "interval_s": prof.interval_s,
+        "started_at": prof.started_at,
+        "ended_at": prof.ended_at,
+        "files": dict(prof.files),
+        "top": [] if prof.running else prof.top_functions(),
+    }
+
+
+def list_profiles(out_dir: str = PROFILE_DIR) -> List[str]:
+    """Saved capture files, newest first."""
+    if not os.path.exists(out_dir):
+        return []
+    return sorted((f for f in os.listdir(out_dir) if f.startswith("profile_")), reverse=True)
+
+
+__all__ = ["SamplingProfiler", "start", "stop", "status", "list_profiles"]
@@ -0,0 +1,253 @@
+"""
+Token-aware prompt budgeting for agent prompts built from retrieved context.
+
+- count_tokens(text): offline token estimate from a local table (no tokenizer download)
+- PromptBudgeter.fit(agent, items): keep retrieved items within the agent's budget,
+  summarizing each item to its headline first and then dropping the tail
+- PromptBudgeter.fit_text(agent, text): truncate a free-text block (profile, prior plan)
+- PromptBudgeter.turn(order): scope for one advisor turn; when an agent's items don't
+  fit its budget, items already sent to another agent during the turn make room
+  first (never its own top MIN_OWN_ITEMS), and tokens saved are reported.
+  Agents listed in `order` fit their context in that order even when they run in
+  parallel, so which agent gets a shared item does not depend on thread timing;
+  the dispatcher calls done(agent) when an agent finishes, so one that fails
+  before fit() never holds up the agents after it
+
+The active turn is kept in a ContextVar so one budgeter can be shared by concurrent
+sessions without their turns mixing.
+"""
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence
+
+_PIECE_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+# Words that BPE vocabularies encode as a single token regardless of length.
+_COMMON_TOKENS = frozenset("""
+a about after all also an and any are as at be because been before being between both but by can
+could course courses data do does each for from get has have how if in into is it its learn
+learning like machine make more most need new no not of on one only or other our out over own
+project projects python science should skills so some such than that the their them then there
+these they this through to up use used using very was way we well were what when where which
+while who will with work would you your career careers student students engineer engineering
+development developer programming statistics interview resume portfolio advisor guidance plan
+""".split())
+
+DEFAULT_BUDGETS = {
+    "academic_advisor": 250,
+    "career_counselor": 250,
+    "skills_advisor": 250,
+    "student_profile": 120,
+    "prior_plan": 300,
+}
+# longest an agent waits for the agents ahead of it in the turn order to fit their context
+TURN_WAIT_S = 5.0
+# an agent's best-ranked items are its own grounding: never dropped as cross-agent duplicates
+MIN_OWN_ITEMS = 2
+
+
+def _piece_tokens(piece: str) -> int:
+    if piece.isdigit():
+        return math.ceil(len(piece) / 3)
+    if not piece.isalpha():
+        return 1
+    if piece.lower() in _COMMON_TOKENS:
+        return 1
+    # Uncommon words split into roughly four-character sub-word pieces.
+    return max(1, math.ceil(len(piece) / 4))
+
+
+def count_tokens(text: str) -> int:
+    """Approximate the number of model tokens in `text`."""
+    return sum(_piece_tokens(p) for p in _PIECE_RE.findall(text or ""))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, ellipsis: str = "…") -> str:
+    """Cut `text` at a word boundary so it fits in `max_tokens`."""
+    text = (text or "").strip()
+    if count_tokens(text) <= max_tokens:
+        return text
+    used = 0
+    end = 0
+    for m in _PIECE_RE.finditer(text):
+        cost = _piece_tokens(m.group())
+        if used + cost > max_tokens - 1:
+            break
+        used += cost
+        end = m.end()
+    return text[:end].rstrip() + ellipsis if end else ""
+
+
+def summarize_item(text: str) -> str:
+    """Headline of a retrieved item: the part before ':' or its first sentence."""
+    text = (text or "").strip()
+    head = text.split(":", 1)[0] if ":" in text[:80] else re.split(r"(?<=[.!?])\s", text, 1)[0]
+    return head.strip()
+
+
+def _signature(text: str) -> frozenset:
+    return frozenset(w.lower() for w in re.findall(r"[A-Za-z]{3,}", summarize_item(text)))
+
+
+class TurnLedger:
+    """Per-turn record of what each agent was sent and how many tokens were saved."""
+    def __init__(self, order: Sequence[str] = ()):
+        self._seen: List[frozenset] = []
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._order = list(dict.fromkeys(order))
+        self._fitted = {agent: threading.Event() for agent in self._order}
+
+    @staticmethod
+    def _overlaps(sig: frozenset, other: frozenset) -> bool:
+        return bool(sig and other and len(sig & other) / len(sig | other) >= 0.8)
+
+    def seen(self, item: str) -> bool:
+        """True if an overlapping item was already sent to an agent this turn."""
+        sig = _signature(item)
+        with self._lock:
+            return any(self._overlaps(sig, other) for other in self._seen)
+
+    def claim(self, item: str) -> bool:
+        """Atomically mark `item` as sent; False if an overlapping item already was."""
+        sig = _signature(item)
+        with self._lock:
+            if any(self._overlaps(sig, other) for other in self._seen):
+                return False
+            self._seen.append(sig)
+            return True
+
+    def wait_turn(self, agent: str, timeout: float = TURN_WAIT_S):
+        """Block until every agent ahead of `agent` in the turn order has fitted its context."""
+        if agent not in self._fitted:
+            return
+        deadline = time.monotonic() + timeout
+        for earlier in self._order[:self._order.index(agent)]:
+            self._fitted[earlier].wait(max(0.0, deadline - time.monotonic()))
+
+    def fitted(self, agent: str):
+        event = self._fitted.get(agent)
+        if event is not None:
+            event.set()
+
+    def record(self, agent: str, tokens_in: int, tokens_kept: int):
+        with self._lock:
+            s = self.stats.setdefault(agent, {"tokens_in": 0, "tokens_kept": 0, "tokens_saved": 0})
+            s["tokens_in"] += tokens_in
+            s["tokens_kept"] += tokens_kept
+            s["tokens_saved"] += max(0, tokens_in - tokens_kept)
+
+    def report(self) -> Dict:
+        with self._lock:
+            agents = {k: dict(v) for k, v in self.stats.items()}
+        return {
+            "agents": agents,
+            "tokens_saved": sum(v["tokens_saved"] for v in agents.values()),
+        }
+
+
+_TURN: ContextVar[Optional[TurnLedger]] = ContextVar("prompt_budget_turn", default=None)
+
+
+class PromptBudgeter:
+    """Bounds the retrieved context interpolated into each agent's prompt.
+
+    Usage:
+        budgeter = PromptBudgeter()
+        with budgeter.turn(order=["academic_advisor", "career_counselor"]) as ledger:
+            context = budgeter.fit("academic_advisor", resources)
+        ledger.report()["tokens_saved"]
+    """
+    def __init__(self, budgets: Dict[str, int] = None, default_budget: int = 250):
+        self.budgets = dict(DEFAULT_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.default_budget = default_budget
+
+    def budget_for(self, agent: str) -> int:
+        return self.budgets.get(agent, self.default_budget)
+
+    @contextmanager
+    def turn(self, order: Sequence[str] = ()):
+        """Ledger scope for one turn; agents in `order` get first pick of shared items in that order."""
+        ledger = TurnLedger(order)
+        token = _TURN.set(ledger)
+        try:
+            yield ledger
+        finally:
+            _TURN.reset(token)
+
+    def _ledger(self) -> TurnLedger:
+        # Outside a turn, use a throwaway ledger (no cross-agent dedup).
+        return _TURN.get() or TurnLedger()
+
+    def done(self, agent: str):
+        """Tell the current turn `agent` is finished (fitted or failed), releasing agents after it."""
+        ledger = _TURN.get()
+        if ledger is not None:
+            ledger.fitted(agent)
+
+    def fit(self, agent: str, items: Iterable[str], budget: int = None) -> List[str]:
+        """Return the retrieved items that fit in the agent's token budget, in rank order."""
+        budget = budget if budget is not None else self.budget_for(agent)
+        ledger = self._ledger()
+        ledger.wait_turn(agent)
+        try:
+            return self._fit(ledger, agent, items, budget)
+        finally:
+            ledger.fitted(agent)
+
+    def _fit(self, ledger: TurnLedger, agent: str, items: Iterable[str], budget: int) -> List[str]:
+        items = [str(i).strip() for i in items or [] if i and str(i).strip()]
+        tokens_in = sum(count_tokens(i) for i in items)
+
+        # dedup only makes room: an agent whose items fit keeps them all, and one
+        # that is over budget still keeps its own top items
+        own = set(items) if tokens_in <= budget else set(items[:MIN_OWN_ITEMS])
+        fresh = [i for i in items if i in own or not ledger.seen(i)]
+        shown = fresh
+        if sum(count_tokens(i) for i in fresh) > budget:
+            shown = [summarize_item(i) for i in fresh]
+
+        kept, used = [], 0
+        for original, item in zip(fresh, shown):
+            if used >= budget:
+                break
+            cost = count_tokens(item)
+            if used + cost > budget:
+                item = truncate_to_tokens(item, budget - used)
+                cost = count_tokens(item)
+                if cost < 4:
+                    break
+            if not ledger.claim(original) and original not in own:
+                continue  # an agent outside the turn order took it meanwhile
+            kept.append(item)
+            used += cost
+        ledger.record(agent, tokens_in, used)
+        return kept
+
+    def fit_text(self, agent: str, text: str, budget: int = None) -> str:
+        """Truncate a free-text block (profile, prior plan) to the budget for `agent`."""
+        budget = budget if budget is not None else self.budget_for(agent)
+        text = "" if text is None else str(text)
+        out = truncate_to_tokens(text, budget)
+        self._ledger().record(agent, count_tokens(text), count_tokens(out))
+        return out
+
+
+def compact_profile(profile: Dict) -> str:
+    """Render a profile dict as 'key: value' lines, skipping empty fields."""
+    lines = []
+    for key, value in (profile or {}).items():
+        if value in (None, "", [], {}):
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = ", ".join(str(v) for v in value)
+        lines.append(f"{key}: {value}")
+    return "\n".join(lines)
+
+
+__all__ = ["count_tokens", "truncate_to_tokens", "PromptBudgeter", "TurnLedger", "compact_profile"]
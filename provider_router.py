@@ -0,0 +1,197 @@
+"""
+Provider router for the LLM backends used by the chatbot.
+
+Routes a prompt across an ordered list of providers (e.g. OpenAI, then Hugging Face):
+- each provider has a circuit breaker that trips on error rate or slow calls
+- the next provider is hedged: it fires after a p95-based delay if nothing has answered yet
+- the first good answer wins; if every circuit is open the local fallback answers at once
+- a hard deadline caps the turn, whatever the providers are doing
+
+Calls that lose the race keep running in the background so their outcome still
+feeds the breaker, but the caller never waits for them. Each provider is called
+as fn(prompt, timeout) with the seconds left before the deadline, so a losing
+call gives its worker back by then. Workers are a fixed budget shared by every
+turn (the router is process-wide): when none is free a provider is skipped, as
+if its circuit were open, rather than queued behind other turns' calls.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker (closed -> open -> half-open -> closed).
+
+    A call counts as a failure if it raised, returned an unusable answer, or took
+    longer than `slow_call_s`. Once at least `min_calls` outcomes are in the window
+    and the failure rate reaches `error_threshold`, the circuit opens for
+    `cooldown_s`; after that a single probe call is let through to decide whether
+    to close again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window: int = 20, min_calls: int = 5, error_threshold: float = 0.5,
+                 slow_call_s: float = 8.0, cooldown_s: float = 30.0):
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.slow_call_s = slow_call_s
+        self.cooldown_s = cooldown_s
+        self._outcomes: Deque[Tuple[bool, float]] = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown_s:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+    def _trip(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now (claims the probe slot when half-open)."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.OPEN:
+                return False
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record(self, ok: bool, latency: float):
+        failed = (not ok) or latency >= self.slow_call_s
+        with self._lock:
+            self._outcomes.append((failed, latency))
+            if self._state == self.HALF_OPEN:
+                if failed:
+                    self._trip()
+                else:
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                return
+            if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for f, _ in self._outcomes if f)
+                if failures / len(self._outcomes) >= self.error_threshold:
+                    self._trip()
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        """Quantile of recent successful call latencies, or None without history."""
+        with self._lock:
+            lat = sorted(l for f, l in self._outcomes if not f)
+        if not lat:
+            return None
+        return lat[min(len(lat) - 1, int(q * len(lat)))]
+
+
+class ProviderRouter:
+    """Hedged, circuit-broken routing over an ordered list of providers.
+
+    Usage:
+        router = ProviderRouter([("openai", ask_openai), ("huggingface", ask_hf)], fallback=canned)
+        provider, text = router.route("How do I become a Data Scientist?")
+
+    `max_calls` bounds provider calls in flight across all concurrent turns;
+    size it for expected concurrent turns x providers.
+    """
+    def __init__(self, providers: List[Tuple[str, Callable[[str, float], str]]],
+                 fallback: Callable[[str], str],
+                 accept: Callable[[str], bool] = None,
+                 default_hedge_s: float = 2.0, min_hedge_s: float = 0.25, max_hedge_s: float = 5.0,
+                 deadline_s: float = 12.0, breaker_factory: Callable[[], CircuitBreaker] = None,
+                 max_calls: int = 32):
+        make_breaker = breaker_factory or CircuitBreaker
+        self.providers = [(name, call, make_breaker()) for name, call in providers]
+        self.fallback = fallback
+        self.accept = accept or (lambda text: bool(text and text.strip()))
+        self.default_hedge_s = default_hedge_s
+        self.min_hedge_s = min_hedge_s
+        self.max_hedge_s = max_hedge_s
+        self.deadline_s = deadline_s
+        # one worker per slot: a call that gets a slot starts at once, it never queues
+        self._slots = threading.BoundedSemaphore(max_calls)
+        self._executor = ThreadPoolExecutor(max_workers=max_calls, thread_name_prefix="provider-router")
+        self._skipped: Dict[str, int] = {name: 0 for name, _, _ in self.providers}
+
+    def _hedge_delay(self, breaker: CircuitBreaker) -> float:
+        p95 = breaker.latency_quantile(0.95)
+        if p95 is None:
+            return self.default_hedge_s
+        return min(self.max_hedge_s, max(self.min_hedge_s, p95))
+
+    def _call(self, name: str, call: Callable[[str, float], str], breaker: CircuitBreaker, prompt: str,
+              deadline: float):
+        start = time.monotonic()
+        try:
+            text = call(prompt, max(0.0, deadline - start))
+            ok = isinstance(text, str) and self.accept(text)
+        except Exception:
+            text, ok = None, False
+        finally:
+            self._slots.release()
+        breaker.record(ok, time.monotonic() - start)
+        return name, ok, text
+
+    def route(self, prompt: str) -> Tuple[str, str]:
+        """Return (provider_name, text); provider_name is 'fallback' for the local answer."""
+        deadline = time.monotonic() + self.deadline_s
+        remaining = list(self.providers)
+        pending = set()
+
+        def launch_next():
+            while remaining:
+                name, call, breaker = remaining.pop(0)
+                if not self._slots.acquire(blocking=False):
+                    self._skipped[name] += 1  # every worker is busy with other turns
+                    continue
+                if breaker.allow():
+                    pending.add(self._executor.submit(self._call, name, call, breaker, prompt, deadline))
+                    return time.monotonic() + self._hedge_delay(breaker)
+                self._slots.release()
+            return None
+
+        next_hedge_at = launch_next()
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wake_at = min(deadline, next_hedge_at) if next_hedge_at else deadline
+            done, pending = wait(pending, timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+            for fut in done:
+                name, ok, text = fut.result()
+                if ok:
+                    return name, text.strip()
+            if done or (next_hedge_at and time.monotonic() >= next_hedge_at):
+                # a provider failed or the hedge timer fired: bring in the next one
+                next_hedge_at = launch_next()
+        return "fallback", self.fallback(prompt)
+
+    def stats(self) -> Dict[str, dict]:
+        """Breaker state, recent latency quantiles and calls skipped for want of a worker, per provider."""
+        return {
+            name: {
+                "state": breaker.state,
+                "p50_s": breaker.latency_quantile(0.5),
+                "p95_s": breaker.latency_quantile(0.95),
+                "skipped_busy": self._skipped[name],
+            }
+            for name, _, breaker in self.providers
+        }
+
+
+__all__ = ["CircuitBreaker", "ProviderRouter"]
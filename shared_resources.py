@@ -0,0 +1,167 @@
+"""
+Process-wide registry of heavy, shareable objects (agents, chatbot, models).
+
+Streamlit runs every browser session in the same process, so objects that are
+expensive to build and safe to share are built once here and handed out to all
+sessions instead of being stored per session in `st.session_state`.
+
+- register_resource(name, factory): declare how to build a resource
+- get_resource(name): build on first use (thread-safe, built exactly once) and return it
+- reset_resource(name): drop the instance so the next get rebuilds it (e.g. new API key)
+- warm_resources(): build everything up front, optionally on a background thread
+
+Shared objects must not keep per-user state; per-turn state lives in ContextVars
+(see prompt_budget.py) or is passed explicitly.
+"""
+import threading
+from typing import Callable, Dict, List
+
+_FACTORIES: Dict[str, Callable[[], object]] = {}
+_INSTANCES: Dict[str, object] = {}
+_LOCKS: Dict[str, threading.Lock] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def register_resource(name: str, factory: Callable[[], object]):
+    with _REGISTRY_LOCK:
+        _FACTORIES[name] = factory
+        _LOCKS.setdefault(name, threading.Lock())
+
+
+def get_resource(name: str):
+    """Return the shared instance of `name`, building it on first use."""
+    inst = _INSTANCES.get(name)
+    if inst is not None:
+        return inst
+    with _REGISTRY_LOCK:
+        if name not in _FACTORIES:
+            raise KeyError(f"unknown resource '{name}'")
+        lock = _LOCKS[name]
+    with lock:
+        # double-checked: another thread may have built it while we waited
+        inst = _INSTANCES.get(name)
+        if inst is None:
+            inst = _FACTORIES[name]()
+            _INSTANCES[name] = inst
+        return inst
+
+
+def reset_resource(name: str):
+    """Forget the current instance; the next get_resource() rebuilds it."""
+    with _REGISTRY_LOCK:
+        lock = _LOCKS.get(name)
+    if lock is None:
+        return
+    with lock:
+        _INSTANCES.pop(name, None)
+
+
+def resource_status() -> Dict[str, bool]:
+    """Map of registered resource name -> whether it has been built."""
+    with _REGISTRY_LOCK:
+        names = list(_FACTORIES)
+    return {name: name in _INSTANCES for name in names}
+
+
+def warm_resources(names: List[str] = None, background: bool = False) -> Dict[str, str]:
+    """Build the given (default: all) resources; returns name -> error for failures.
+
+    With `background=True` the build runs on a daemon thread and an empty dict is
+    returned immediately.
+    """
+    with _REGISTRY_LOCK:
+        names = list(names or _FACTORIES)
+
+    def build() -> Dict[str, str]:
+        errors = {}
+        for name in names:
+            try:
+                get_resource(name)
+            except Exception as e:
+                errors[name] = str(e)
+        return errors
+
+    if background:
+        threading.Thread(target=build, name="warm-resources", daemon=True).start()
+        return {}
+    return build()
+
+
+def _build_agentic_advisor():
+    from agentic_advisor import AgenticAdvisor
+    return AgenticAdvisor()
+
+
+def _build_career_bot():
+    from career_chatbot import CareerChatbot
+    return CareerChatbot()
+
+
+def _build_job_queue():
+    from jobs import build_job_queue
+    return build_job_queue()
+
+
+def _build_skill_taxonomy():
+    from skill_taxonomy import SkillTaxonomy
+    return SkillTaxonomy.load()
+
+
+def _build_career_index():
+    from career_match import CareerIndex
+    return CareerIndex.load(taxonomy=get_resource("skill_taxonomy"))
+
+
+def _build_skills_gap():
+    from skills_gap import GapAnalyzer
+    return GapAnalyzer(get_resource("career_index"))
+
+
+def _build_learning_planner():
+    from learning_planner import LearningPlanner
+    return LearningPlanner.load(get_resource("skill_taxonomy"))
+
+
+def _build_mentor_directory():
+    from mentors import MentorDirectory
+    return MentorDirectory(taxonomy=get_resource("skill_taxonomy"))
+
+
+def _build_market_insights():
+    from market_data import MarketInsights
+    insights = MarketInsights()
+    insights.ensure_data()
+    return insights
+
+
+def _build_activity_store():
+    from activity import ActivityStore
+    return ActivityStore()
+
+
+def _build_career_paths():
+    from career_guidance_system import CareerPathCatalog
+    return CareerPathCatalog.load()
+
+
+def _build_vector_db():
+    import vector_db
+    vector_db.populate_sample_data()
+    return vector_db
+
+
+register_resource("vector_db", _build_vector_db)
+register_resource("agentic_advisor", _build_agentic_advisor)
+register_resource("career_bot", _build_career_bot)
+register_resource("job_queue", _build_job_queue)
+register_resource("skill_taxonomy", _build_skill_taxonomy)
+register_resource("career_index", _build_career_index)
+register_resource("career_paths", _build_career_paths)
+register_resource("skills_gap", _build_skills_gap)
+register_resource("learning_planner", _build_learning_planner)
+register_resource("mentor_directory", _build_mentor_directory)
+register_resource("market_insights", _build_market_insights)
+register_resource("activity_store", _build_activity_store)
+
+
+__all__ = ["register_resource", "get_resource", "reset_resource", "resource_status", "warm_resources"]
@@ -0,0 +1,98 @@
+"""
+Single-flight request coalescing.
+
+When several threads (Streamlit sessions) ask for the same thing at the same
+time, the first caller runs the work and the others wait for and share its
+result, so a burst of identical requests costs one upstream call. Nothing is
+kept once the call finishes; caching stays the job of the callers' own caches.
+
+- SingleFlight(name).do(key, fn): returns (value, shared); exceptions propagate to every waiter
+- normalize_query(text) / fingerprint(obj): helpers for building keys
+- stats(): per-group calls / executions / shared counts
+
+Usage:
+    _FLIGHT = SingleFlight("vector_db")
+    hits, shared = _FLIGHT.do(("search", query), lambda: expensive_search(query))
+"""
+import hashlib
+import json
+import re
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Tuple
+
+_GROUPS: Dict[str, "SingleFlight"] = {}
+_GROUPS_LOCK = threading.Lock()
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, Tuple[Future, int]] = {}
+        self._lock = threading.Lock()
+        self.counts = {"calls": 0, "executions": 0, "shared": 0}
+        with _GROUPS_LOCK:
+            _GROUPS[name] = self
+
+    def do(self, key: Hashable, fn: Callable[[], object]) -> Tuple[object, bool]:
+        """Run fn() once per concurrent `key`; returns (value, shared_with_another_caller)."""
+        me = threading.get_ident()
+        with self._lock:
+            self.counts["calls"] += 1
+            inflight = self._calls.get(key)
+            # a re-entrant call from the leader's own thread must not wait on itself
+            follower = inflight is not None and inflight[1] != me
+            if follower:
+                self.counts["shared"] += 1
+            else:
+                self.counts["executions"] += 1
+                if inflight is None:
+                    fut = Future()
+                    self._calls[key] = (fut, me)
+        if follower:
+            return inflight[0].result(), True
+        if inflight is not None:
+            return fn(), False
+        try:
+            value = fn()
+        except BaseException as e:
+            self._finish(key)
+            fut.set_exception(e)
+            raise
+        self._finish(key)
+        fut.set_result(value)
+        return value, False
+
+    def _finish(self, key: Hashable):
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def inflight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+def normalize_query(text: str) -> str:
+    """Case/whitespace/trailing-punctuation-insensitive form of a user query."""
+    return re.sub(r"\s+", " ", (text or "").strip().lower()).rstrip("?!. ")
+
+
+def fingerprint(obj) -> str:
+    """Stable short hash of a JSON-able object (e.g. a user profile); '' for None."""
+    if obj is None:
+        return ""
+    raw = json.dumps(obj, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def stats() -> Dict[str, dict]:
+    with _GROUPS_LOCK:
+        groups = dict(_GROUPS)
+    out = {}
+    for name, group in sorted(groups.items()):
+        with group._lock:
+            out[name] = dict(group.counts, inflight=len(group._calls))
+    return out
+
+
+__all__ = ["SingleFlight", "normalize_query", "fingerprint", "stats"]
@@ -0,0 +1,191 @@
+"""
+Skill taxonomy: one integer id per skill, with synonyms and a parent hierarchy.
+
+Skills show up as free strings all over the app (role dicts, the Skills page
+categories, career requirements, the free-text `skills` column of user
+profiles). The taxonomy interns them once, so matchers work on int32 arrays:
+
+- resolve(name): id of a canonical name or synonym ("ML", "k8s", "Problem-Solving"), or None
+- intern(name): like resolve, but adds unknown skills as new roots
+- extract(text): ids of every skill mentioned in free text, in one automaton pass
+- expand(ids): ids plus all their ancestors (TensorFlow -> Deep Learning -> Machine Learning -> ...)
+
+Names and synonyms live in config/skills.json. Extraction runs an Aho-Corasick
+automaton over every normalized alias and keeps leftmost-longest matches on
+word boundaries, so "machine learning engineer" yields Machine Learning once
+and "javascript" never matches "Java".
+
+Usage:
+    tax = SkillTaxonomy.load()
+    tax.extract("5 years of Python, scikit-learn and k8s")   # -> ids of Python, Machine Learning, Kubernetes
+    tax.names_of(tax.expand([tax.resolve("React")]))        # -> ['Programming', 'Web Development', 'JavaScript', 'React']
+"""
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "skills.json")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, '-'/'_' as spaces, whitespace collapsed: the form aliases are matched in."""
+    return " ".join(text.lower().replace("-", " ").replace("_", " ").split())
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over normalized patterns, each mapped to an integer id.
+
+    Shared by every keyword lookup in the app: build it once, then each text is
+    a single pass however many patterns there are.
+    """
+
+    def __init__(self, patterns: Dict[str, int]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.out: List[List[Tuple[int, int]]] = [[]]
+        for alias, sid in patterns.items():
+            state = 0
+            for ch in alias:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.out.append([])
+                state = nxt
+            self.out[state].append((len(alias), sid))
+
+        # breadth-first failure links; each state also inherits its suffix states' outputs
+        self.fail = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for ch, nxt in self.goto[state].items():
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+                queue.append(nxt)
+
+    def matches(self, text: str) -> List[Tuple[int, int, int]]:
+        """Every (start, end, id) alias occurrence in `text` that sits on word boundaries."""
+        found = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for length, sid in self.out[state]:
+                start, end = i - length + 1, i + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    found.append((start, end, sid))
+        return found
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """Leftmost-longest, non-overlapping (start, end, id) matches in normalized `text`."""
+        matches = self.matches(normalize(text or ""))
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        kept, pos = [], 0
+        for match in matches:
+            if match[0] >= pos:
+                kept.append(match)
+                pos = match[1]
+        return kept
+
+
+class SkillTaxonomy:
+    def __init__(self, skills: List[dict]):
+        self.names: List[str] = []
+        self.aliases: Dict[str, int] = {}
+        parents: List[Optional[str]] = []
+        for skill in skills:
+            sid = len(self.names)
+            self.names.append(skill["name"])
+            parents.append(skill.get("parent"))
+            for alias in [skill["name"], *skill.get("synonyms", [])]:
+                key = normalize(alias)
+                if self.aliases.setdefault(key, sid) != sid:
+                    raise ValueError(f"alias '{alias}' maps to both {self.names[self.aliases[key]]} and {skill['name']}")
+        self.parent = np.asarray([self.aliases[normalize(p)] if p else -1 for p in parents], dtype=np.int32)
+        self._automaton: Optional[KeywordMatcher] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str = TAXONOMY_PATH) -> "SkillTaxonomy":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f)["skills"])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def resolve(self, name: str) -> Optional[int]:
+        return self.aliases.get(normalize(name))
+
+    def intern(self, name: str) -> int:
+        """Id of `name`, adding it as a new root skill if the taxonomy doesn't know it."""
+        key = normalize(name)
+        sid = self.aliases.get(key)
+        if sid is not None:
+            return sid
+        with self._lock:
+            sid = self.aliases.get(key)
+            if sid is None:
+                sid = len(self.names)
+                self.names.append(name.strip())
+                self.parent = np.append(self.parent, np.int32(-1))
+                self.aliases[key] = sid
+                self._automaton = None  # rebuilt on the next extract()
+        return sid
+
+    def ids(self, names: Iterable[str], intern: bool = False) -> np.ndarray:
+        """int32 ids of `names` in order; unknown names are dropped unless `intern`."""
+        if intern:
+            return np.asarray([self.intern(n) for n in names], dtype=np.int32)
+        found = (self.resolve(n) for n in names)
+        return np.asarray([sid for sid in found if sid is not None], dtype=np.int32)
+
+    def names_of(self, ids: Iterable[int]) -> List[str]:
+        return [self.names[int(i)] for i in ids]
+
+    def _get_automaton(self) -> KeywordMatcher:
+        automaton = self._automaton
+        if automaton is None:
+            with self._lock:
+                if self._automaton is None:
+                    self._automaton = KeywordMatcher(dict(self.aliases))
+                automaton = self._automaton
+        return automaton
+
+    def extract(self, text: str) -> np.ndarray:
+        """Ids of the skills mentioned in `text`, in order of first mention (leftmost-longest, no overlaps)."""
+        ids, seen = [], set()
+        for _, _, sid in self._get_automaton().find(text):
+            if sid not in seen:
+                seen.add(sid)
+                ids.append(sid)
+        return np.asarray(ids, dtype=np.int32)
+
+    def ancestors(self, sid: int) -> List[int]:
+        """Parent chain of `sid`, nearest first."""
+        chain = []
+        sid = int(self.parent[sid])
+        while sid >= 0:
+            chain.append(sid)
+            sid = int(self.parent[sid])
+        return chain
+
+    def expand(self, ids: Iterable[int]) -> np.ndarray:
+        """Sorted unique ids plus every ancestor of them."""
+        parent = self.parent
+        frontier = np.unique(np.asarray(list(ids), dtype=np.int32))
+        out = [frontier]
+        while frontier.size:
+            frontier = parent[frontier]
+            frontier = np.unique(frontier[frontier >= 0])
+            out.append(frontier)
+        return np.unique(np.concatenate(out))
+
+
+__all__ = ["SkillTaxonomy", "KeywordMatcher", "normalize", "TAXONOMY_PATH"]
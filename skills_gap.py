@@ -0,0 +1,102 @@
+"""
+Skills gap analysis against career requirement vectors.
+
+Every career in the CareerIndex is a sparse requirement vector (skill ->
+importance 1-3). Importance sets the proficiency the role expects, and the gap
+on a skill is importance * (expected - current), floored at 0. Gaps are
+computed for every nonzero of the career x skill matrix in one vectorized
+pass, then reduced per role (readiness) and per skill (what to learn next) with
+np.bincount, so analysing all roles costs the same as analysing one.
+
+Learning resources for the top gap skills come from a single batched
+vector_db query.
+
+Usage:
+    analyzer = GapAnalyzer(get_resource("career_index"))
+    report = analyzer.analyze({"Python": 4, "SQL": 1}, roles=["Data Scientist"])
+    report["skills"][0]      # {"skill": "SQL", "gap": ..., "roles": 1, "resources": [...]}
+"""
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+
+from career_match import MAX_RATING, CareerIndex, SkillInput
+from skill_taxonomy import normalize
+
+# expected proficiency (0..1) by requirement importance: nice-to-have, important, core
+EXPECTED_LEVEL = np.asarray([0.0, 0.6, 0.8, 1.0], dtype=np.float32)
+
+
+class GapAnalyzer:
+    def __init__(self, index: CareerIndex):
+        self.index = index
+        self.role_ids = {normalize(c["title"]): i for i, c in enumerate(index.careers)}
+        importance = np.clip(np.rint(index.weights), 0, len(EXPECTED_LEVEL) - 1).astype(np.int8)
+        self.expected = EXPECTED_LEVEL[importance]
+        # weighted expectation per role: the gap of a user with no skills at all
+        self.max_gap = np.maximum(np.bincount(index.rows, weights=index.weights * self.expected,
+                                              minlength=len(index)), 1e-9)
+
+    def roles(self, titles: Optional[Iterable[str]] = None) -> np.ndarray:
+        """Row ids of the given career titles (unknown ones dropped); every role when None."""
+        if titles is None:
+            return np.arange(len(self.index), dtype=np.int32)
+        found = (self.role_ids.get(normalize(t)) for t in titles)
+        return np.asarray([i for i in found if i is not None], dtype=np.int32)
+
+    def gap_values(self, user_vec: np.ndarray) -> np.ndarray:
+        """Weighted gap of every nonzero of the career x skill matrix."""
+        return self.index.weights * np.maximum(self.expected - user_vec[self.index.indices], 0.0)
+
+    def gaps(self, skills: SkillInput, roles: Optional[Iterable[str]] = None,
+             top_roles: int = 5, top_skills: int = 5) -> dict:
+        """Closest roles by readiness and the skills with the largest summed gap across `roles`."""
+        index = self.index
+        user_vec = index.skill_vector(skills)
+        gap = self.gap_values(user_vec)
+        readiness = 1.0 - np.bincount(index.rows, weights=gap, minlength=len(index)) / self.max_gap
+
+        selected = self.roles(roles)
+        if selected.size == 0:
+            return {"roles": [], "skills": []}
+        in_scope = np.zeros(len(index), dtype=bool)
+        in_scope[selected] = True
+        nz = in_scope[index.rows] & (gap > 0)
+        skill_gap = np.bincount(index.indices[nz], weights=gap[nz], minlength=len(user_vec))
+        skill_roles = np.bincount(index.indices[nz], minlength=len(user_vec))
+
+        k = min(top_roles, selected.size)
+        best = selected[np.argsort(-readiness[selected], kind="stable")[:k]]
+        ranked_skills = np.flatnonzero(skill_gap)
+        ranked_skills = ranked_skills[np.argsort(-skill_gap[ranked_skills], kind="stable")[:top_skills]]
+        return {
+            "roles": [self._role(i, readiness[i], gap) for i in best],
+            "skills": [{"skill": index.skill_names[s], "gap": round(float(skill_gap[s]), 3),
+                        "roles": int(skill_roles[s]),
+                        "current": round(float(user_vec[s]) * MAX_RATING, 1)} for s in ranked_skills],
+        }
+
+    def _role(self, i: int, readiness: float, gap: np.ndarray) -> dict:
+        lo, hi = self.index.indptr[i], self.index.indptr[i + 1]
+        order = lo + np.argsort(-gap[lo:hi], kind="stable")
+        return {
+            "title": self.index.careers[i]["title"],
+            "readiness": int(round(float(readiness) * 100)),
+            "gap_skills": [self.index.skill_names[self.index.indices[j]] for j in order if gap[j] > 0],
+        }
+
+    def analyze(self, skills: SkillInput, roles: Optional[Iterable[str]] = None, top_roles: int = 5,
+                top_skills: int = 5, resources_per_skill: int = 3,
+                search: Callable[[List[str], int], List[List[str]]] = None) -> dict:
+        """gaps() plus learning resources for each gap skill from one batched vector_db query."""
+        report = self.gaps(skills, roles, top_roles, top_skills)
+        if report["skills"]:
+            if search is None:
+                from vector_db import query_vector_db_batch as search
+            found = search([s["skill"] for s in report["skills"]], resources_per_skill)
+            for entry, docs in zip(report["skills"], found):
+                entry["resources"] = docs
+        return report
+
+
+__all__ = ["GapAnalyzer", "EXPECTED_LEVEL"]
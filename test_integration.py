@@ -195,5 +195,1246 @@ def test_crew_dispatch():
     assert 'academic' in results
 
 
+
+# Test 7: Provider routing
+def test_router_hedges_to_fast_backup():
+    import time
+    from provider_router import ProviderRouter
+
+    def slow(prompt, timeout):
+        time.sleep(1.0)
+        return "slow provider answer"
+
+    router = ProviderRouter(
+        [("slow", slow), ("fast", lambda p, timeout: "fast provider answer")],
+        fallback=lambda p: "fallback answer",
+        default_hedge_s=0.05,
+    )
+    start = time.monotonic()
+    provider, text = router.route("hello")
+
+    assert provider == "fast"
+    assert text == "fast provider answer"
+    assert time.monotonic() - start < 0.5
+
+
+def test_router_open_circuits_use_fallback():
+    from provider_router import CircuitBreaker, ProviderRouter
+
+    def broken(prompt, timeout):
+        raise RuntimeError("provider down")
+
+    router = ProviderRouter(
+        [("broken", broken)],
+        fallback=lambda p: "fallback answer",
+        breaker_factory=lambda: CircuitBreaker(min_calls=2, cooldown_s=60),
+    )
+    for _ in range(2):
+        assert router.route("hello") == ("fallback", "fallback answer")
+
+    assert router.stats()["broken"]["state"] == CircuitBreaker.OPEN
+    assert router.route("hello") == ("fallback", "fallback answer")
+
+
+def test_router_never_queues_behind_busy_workers():
+    import threading
+    import time
+    from provider_router import ProviderRouter
+
+    release, timeouts = threading.Event(), []
+
+    def stuck(prompt, timeout):
+        timeouts.append(timeout)
+        release.wait(5)
+        return "late provider answer"
+
+    router = ProviderRouter([("stuck", stuck)], fallback=lambda p: "fallback answer",
+                            deadline_s=0.2, max_calls=2)
+    # two slow turns hold both workers past their deadline
+    assert [router.route("hello") for _ in range(2)] == [("fallback", "fallback answer")] * 2
+    # a third turn is not queued behind them: it falls back at once
+    start = time.monotonic()
+    assert router.route("hello") == ("fallback", "fallback answer")
+    assert time.monotonic() - start < 0.1
+    assert router.stats()["stuck"]["skipped_busy"] == 1
+    # providers get the time left before the deadline, not an open-ended call
+    assert len(timeouts) == 2 and all(0 < t <= 0.2 for t in timeouts)
+    release.set()
+
+
+
+# Test 8: Hugging Face client retry and batching
+class _FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class _FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.payloads = []
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        self.payloads.append(json)
+        return self.responses.pop(0)
+
+
+def test_hf_client_retries_model_loading():
+    from hf_client import HuggingFaceClient
+
+    session = _FakeSession([
+        _FakeResponse(503, {"error": "loading", "estimated_time": 0.01}),
+        _FakeResponse(200, [{"generated_text": "Learn Python first."}]),
+    ])
+    client = HuggingFaceClient(api_key="hf_test", session=session, backoff_base_s=0.01)
+
+    assert client.generate("Where do I start?") == "Learn Python first."
+    assert len(session.payloads) == 2
+    assert session.payloads[0]["options"]["wait_for_model"] is False
+
+
+def test_hf_client_gives_up_on_slow_cold_model():
+    import time
+    from hf_client import HuggingFaceClient
+
+    session = _FakeSession([
+        _FakeResponse(503, {"error": "loading", "estimated_time": 20.0}),
+        _FakeResponse(200, [{"generated_text": "Loaded."}]),
+    ])
+    client = HuggingFaceClient(api_key="hf_test", session=session, max_wait_s=1)
+
+    # a backoff never undercuts the server's estimate
+    assert all(client._backoff(0, 2.0) >= 2.0 for _ in range(50))
+    # the model needs longer than max_wait_s: fail fast, never block on wait_for_model
+    start = time.monotonic()
+    assert client.generate("Where do I start?") == ""
+    assert time.monotonic() - start < 1
+    assert [p["options"]["wait_for_model"] for p in session.payloads] == [False]
+
+
+def test_hf_client_generate_many_single_request():
+    from hf_client import HuggingFaceClient
+
+    session = _FakeSession([
+        _FakeResponse(200, [[{"generated_text": "A"}], [{"generated_text": "B"}]]),
+    ])
+    client = HuggingFaceClient(api_key="hf_test", session=session)
+
+    assert client.generate_many(["first", "", "second"]) == ["A", "", "B"]
+    assert len(session.payloads) == 1
+    assert session.payloads[0]["inputs"] == ["first", "second"]
+
+
+
+# Test 9: Prompt budgeting
+def test_prompt_budgeter_fits_budget():
+    from prompt_budget import PromptBudgeter, count_tokens
+
+    resources = [f"Course {i}: " + "a very verbose catalog description " * 20 for i in range(10)]
+    budgeter = PromptBudgeter(budgets={"academic_advisor": 40})
+    kept = budgeter.fit("academic_advisor", resources)
+
+    assert kept
+    assert sum(count_tokens(k) for k in kept) <= 40
+
+
+def test_prompt_budgeter_dedups_across_agents_in_turn():
+    from prompt_budget import PromptBudgeter, count_tokens
+
+    docs = ["Intro to Python: Learn programming basics and data structures.",
+            "Statistics for Data Science: Descriptive stats, probability, and inference.",
+            "Machine Learning Foundations: Supervised learning, evaluation, and feature engineering.",
+            "Career Tips: How to write a resume, prepare for interviews, and build a portfolio."]
+    budgeter = PromptBudgeter(budgets={"career_counselor": 60})
+    with budgeter.turn() as ledger:
+        first = budgeter.fit("academic_advisor", docs[:3])
+        second = budgeter.fit("career_counselor", docs)
+
+    assert first == docs[:3]
+    # over budget: the shared third item makes room, but the counselor keeps its own top two
+    assert second == [docs[0], docs[1], docs[3]]
+    report = ledger.report()
+    assert report["agents"]["career_counselor"]["tokens_saved"] == count_tokens(docs[2])
+    assert report["tokens_saved"] == sum(a["tokens_saved"] for a in report["agents"].values())
+
+    # within budget nothing is dropped as a duplicate
+    with budgeter.turn():
+        budgeter.fit("academic_advisor", docs[:3])
+        assert budgeter.fit("skills_advisor", docs) == docs
+
+
+def test_prompt_budgeter_dedup_follows_turn_order_not_timing():
+    import contextvars
+    import threading
+    import time
+    from prompt_budget import PromptBudgeter
+
+    shared = ["Intro to Python: Learn programming basics and data structures.",
+              "Statistics for Data Science: Descriptive stats, probability, and inference.",
+              "Machine Learning Foundations: Supervised learning, evaluation, and feature engineering.",
+              "Career Tips: How to write a resume, prepare for interviews, and build a portfolio."]
+    budgeter = PromptBudgeter(budgets={"career_counselor": 60})
+    got = {}
+
+    def agent(name, delay):
+        time.sleep(delay)
+        got[name] = budgeter.fit(name, shared)
+
+    with budgeter.turn(order=["academic_advisor", "career_counselor"]):
+        # the counselor reaches fit() first but must still come second
+        # (workers run in a copy of the caller's context, as the crew's pool does)
+        threads = [threading.Thread(target=contextvars.copy_context().run, args=(agent, name, delay))
+                   for name, delay in [("career_counselor", 0.0), ("academic_advisor", 0.05)]]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert got == {"academic_advisor": shared, "career_counselor": shared[:2]}
+    assert budgeter.fit("academic_advisor", shared, budget=0) == []
+
+
+def test_failed_agent_does_not_hold_up_the_turn():
+    import time
+    from agentic_advisor import AgenticAdvisor
+
+    advisor = AgenticAdvisor()
+
+    def broken(request):
+        raise RuntimeError("retrieval down")  # fails before it ever calls fit()
+
+    advisor.crew.register_agent("academic_advisor", broken)
+    start = time.monotonic()
+    result = advisor.respond("How do I become a Data Scientist?")
+    assert time.monotonic() - start < 2  # not the 5 s turn wait
+    assert "career_counselor" in result["prompt_budget"]["agents"]
+
+
+
+# Test 10: Streaming pipeline
+def test_pipeline_streams_and_starts_from_prefix():
+    import time
+    from pipeline import Stage, StreamingPipeline, section_reached
+
+    def upstream(up, ctx, emit):
+        for part in ["1. Majors\n", "2. Courses\n", "3. Skills\n"]:
+            emit(part)
+            time.sleep(0.05)
+        time.sleep(0.3)
+        return "1. Majors\n2. Courses\n3. Skills\n4. Research\n"
+
+    def downstream(up, ctx, emit):
+        emit("started")
+        return f"{ctx} saw: {up['plan']}"
+
+    pipeline = StreamingPipeline([
+        Stage("plan", upstream),
+        Stage("next", downstream, deps=["plan"], prefetch=lambda: "docs",
+              prefix_ready=section_reached(3)),
+    ])
+    events = list(pipeline.stream())
+    order = [(e.stage, e.kind) for e in events]
+
+    # downstream finished before upstream, working from the streamed prefix
+    assert order.index(("next", "done")) < order.index(("plan", "done"))
+    done = {e.stage: e.text for e in events if e.kind == "done"}
+    assert done["next"].startswith("docs saw: 1. Majors")
+    assert "4. Research" not in done["next"]
+
+
+def test_pipeline_propagates_upstream_errors():
+    from pipeline import Stage, StreamingPipeline
+
+    def broken(up, ctx, emit):
+        raise RuntimeError("llm down")
+
+    events = list(StreamingPipeline([
+        Stage("a", broken),
+        Stage("b", lambda up, ctx, emit: "never", deps=["a"]),
+    ]).stream())
+
+    assert {(e.stage, e.kind) for e in events} == {("a", "error"), ("b", "error")}
+
+
+
+# Test 11: Task graph scheduling
+def test_crew_run_graph_parallel_with_edges():
+    import time
+    from crewai import CrewAI, TaskGraph
+
+    calls = []
+
+    def slow(tag):
+        def handler(request):
+            calls.append(tag)
+            time.sleep(0.2)
+            return {"text": f"{tag}:{request}"}
+        return handler
+
+    def combine(request, inputs):
+        return {"text": " + ".join(inputs[k]["text"] for k in sorted(inputs))}
+
+    crew = CrewAI({"a": slow("a"), "b": slow("b"), "combine": combine})
+    graph = TaskGraph().add("a").add("b").add("combine", deps=["a", "b"])
+
+    start = time.monotonic()
+    result = crew.run_graph(graph, "q")
+    elapsed = time.monotonic() - start
+
+    assert result.results["combine"] == {"text": "a:q + b:q"}
+    assert elapsed < 0.35  # a and b ran concurrently
+    assert result.critical_path[-1] == "combine"
+    assert len(result.critical_path) == 2
+
+    # same request again is served from the per-request memo
+    again = crew.run_graph(graph, "q")
+    assert again.results == result.results
+    assert all(t["cached"] for t in again.timings.values())
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_crew_memo_is_per_context_and_copied():
+    from crewai import CrewAI, TaskGraph
+
+    calls = []
+
+    def advise(request):
+        calls.append(request)
+        return {"text": request, "resources": ["Intro to Python"]}
+
+    crew = CrewAI({"advise": advise})
+    graph = TaskGraph().add("advise")
+    first = crew.run_graph(graph, "q", context={"user": "alice"})
+    first.results["advise"]["resources"].append("mutated by caller")
+    assert crew.run_graph(graph, "q", context={"user": "alice"}).results["advise"]["resources"] == ["Intro to Python"]
+    crew.run_graph(graph, "q", context={"user": "bob"})
+    assert len(calls) == 2
+
+    crew.register_agent("advise", lambda request: {"text": "replaced"})
+    assert crew.run_graph(graph, "q", context={"user": "alice"}).results["advise"] == {"text": "replaced"}
+
+    # anonymous callables have no stable identity, so they are never memoized
+    lam = TaskGraph().add("n", lambda request: calls.append("lam") or {"text": "x"})
+    crew.run_graph(lam, "q")
+    crew.run_graph(TaskGraph().add("n", lambda request: calls.append("lam") or {"text": "y"}), "q")
+    assert calls.count("lam") == 2
+
+
+def test_task_graph_rejects_cycles():
+    from crewai import TaskGraph
+
+    graph = TaskGraph().add("a", deps=["b"]).add("b", deps=["a"])
+    with pytest.raises(ValueError):
+        graph.topological_order()
+
+
+
+# Test 12: Shared resource registry
+def test_shared_resource_built_once_across_threads():
+    import threading
+    import time
+    from shared_resources import get_resource, register_resource, reset_resource
+
+    builds = []
+
+    def factory():
+        builds.append(1)
+        time.sleep(0.05)
+        return object()
+
+    register_resource("test_heavy_object", factory)
+    handles = []
+    threads = [threading.Thread(target=lambda: handles.append(get_resource("test_heavy_object")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(builds) == 1
+    assert all(h is handles[0] for h in handles)
+
+    reset_resource("test_heavy_object")
+    assert get_resource("test_heavy_object") is not handles[0]
+    assert len(builds) == 2
+
+
+def test_populate_sample_data_idempotent():
+    import vector_db
+
+    vector_db.populate_sample_data()
+    count = vector_db.index_info()["documents"]
+    vector_db.populate_sample_data()
+    assert vector_db.index_info()["documents"] == count
+
+
+def test_vector_db_concurrent_add_and_query_see_whole_snapshots():
+    import threading
+    import vector_db
+
+    vector_db.reset_index()
+    errors, snapshots = [], []
+    stop = threading.Event()
+
+    def writer():
+        for i in range(40):
+            vector_db.add_documents([f"Topic {i}: learning module number {i}."])
+        stop.set()
+
+    def reader():
+        try:
+            while not stop.is_set():
+                snapshots.append(vector_db._INDEX)
+                vector_db.query_vector_db("learning module", top_k=3)
+                vector_db.query_vector_db_batch(["topic", "module number"], top_k=2)
+        except Exception as e:  # e.g. a dimension mismatch between vectorizer and embeddings
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    try:
+        assert errors == []
+        for version, docs, embeddings, tfidf in snapshots:
+            assert embeddings is None or embeddings.shape[0] == len(docs)
+        # results cached for the final index only ever come from that index
+        final = vector_db.query_vector_db("learning module", top_k=50)
+        assert len(final) == 40
+    finally:
+        vector_db.reset_index()
+        vector_db.populate_sample_data()
+
+
+
+# Test 13: Import-time budget
+def test_import_app_new_within_budget():
+    """Fails CI if `import app_new` gets slow or starts pulling heavy ML libraries eagerly.
+
+    Override the budget with IMPORT_BUDGET_S (seconds).
+    """
+    import os
+    import subprocess
+    import sys
+    pytest.importorskip("streamlit")
+
+    budget = float(os.environ.get("IMPORT_BUDGET_S", "3.0"))
+    code = (
+        "import json, sys, time\n"
+        "t = time.perf_counter()\n"
+        "import app_new\n"
+        "heavy = [m for m in ('sentence_transformers', 'torch', 'faiss', 'sklearn') if m in sys.modules]\n"
+        "print(json.dumps({'seconds': time.perf_counter() - t, 'heavy': heavy}))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=str(Path(__file__).parent),
+                          capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    assert report["heavy"] == []
+    assert report["seconds"] < budget, f"import app_new took {report['seconds']:.2f}s (budget {budget}s)"
+
+
+def test_lazy_module_defers_import():
+    import sys
+    from lazy_imports import lazy_import, module_available
+
+    assert module_available("json")
+    assert not module_available("definitely_not_a_real_module_xyz")
+    assert not module_available("definitely_not_a_real_pkg.sub")
+
+    mod = lazy_import("colorsys")
+    sys.modules.pop("colorsys", None)
+    assert not mod.is_loaded
+    assert mod.rgb_to_hsv(1.0, 0.0, 0.0)[0] == 0.0
+    assert mod.is_loaded
+
+
+
+# Test 14: Warm-up and readiness
+def test_warmup_reaches_ready():
+    import warmup
+    import vector_db
+
+    warmup.start_warmup()
+    assert warmup.wait_until_ready(timeout=60)
+
+    status = warmup.readiness()
+    assert status["ready"]
+    assert set(status["stages"]) == set(warmup.STAGES)
+    assert all(s["status"] in ("done", "failed") for s in status["stages"].values())
+    assert vector_db.index_info()["documents"] > 0
+
+
+def test_warmup_cli_reports_the_live_process(tmp_path, monkeypatch):
+    import os
+    import subprocess
+    import sys
+    import warmup
+
+    status_path = tmp_path / "warmup_status.json"
+    monkeypatch.setattr(warmup, "STATUS_PATH", str(status_path))
+    env = dict(os.environ, WARMUP_STATUS_PATH=str(status_path))
+    cli = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "warmup.py")]
+
+    # nothing published yet: not ready, and the probe does not warm up on its own
+    assert subprocess.run(cli, env=env, capture_output=True).returncode == 1
+
+    warmup.start_warmup()
+    warmup.wait_until_ready(timeout=60)
+    warmup._write_status()
+    probe = subprocess.run(cli, env=env, capture_output=True, text=True)
+    reported = json.loads(probe.stdout)
+    assert reported["pid"] == os.getpid() and reported["ready"]
+    assert probe.returncode == (0 if reported["healthy"] else 1)
+
+    # a status file left behind by a server that has exited is not readiness
+    status_path.write_text(json.dumps(dict(reported, pid=2 ** 22 + 12345)))
+    assert warmup.server_readiness() is None
+
+
+def test_vector_db_query_cache_invalidated_on_add():
+    import vector_db
+
+    vector_db.populate_sample_data()
+    first = vector_db.query_vector_db("quantum basket weaving", top_k=3)
+    assert vector_db.query_vector_db("quantum basket weaving", top_k=3) == first
+
+    vector_db.add_documents(["Quantum Basket Weaving: an unusual elective."])
+    assert any("Quantum Basket Weaving" in r for r in vector_db.query_vector_db("quantum basket weaving", top_k=3))
+
+
+# Test 15: Latency metrics
+def test_latency_histogram_quantiles():
+    from metrics import LatencyHistogram
+
+    hist = LatencyHistogram()
+    for ms in range(1, 1001):
+        hist.record(ms / 1000.0)
+    assert hist.quantile(0.5) == pytest.approx(0.5, rel=0.05)
+    assert hist.quantile(0.99) == pytest.approx(0.99, rel=0.05)
+    assert hist.quantile(1.0) == pytest.approx(1.0, rel=0.05)
+
+
+def test_metrics_count_errors_and_export():
+    import metrics
+
+    metrics.reset()
+    with metrics.timed("test.op"):
+        pass
+    with metrics.timed("test.op") as call:
+        call.fail()
+    with pytest.raises(ValueError):
+        with metrics.timed("test.op"):
+            raise ValueError("boom")
+
+    row = next(r for r in metrics.snapshot() if r["op"] == "test.op")
+    assert row["calls"] == 3 and row["errors"] == 2
+    assert row["error_rate"] == pytest.approx(2 / 3)
+
+    text = metrics.render_prometheus()
+    assert 'app_op_latency_seconds{op="test.op",quantile="0.99"}' in text
+    assert 'app_op_errors_total{op="test.op"} 2' in text
+
+
+# Test 16: Request tracing
+def test_advisor_turn_is_traced_across_threads():
+    from agentic_advisor import AgenticAdvisor
+    from tracing import get_trace, waterfall
+
+    result = AgenticAdvisor().respond("How do I become a Data Scientist?")
+    t = get_trace(result["trace_id"])
+    assert t is not None
+
+    spans = {s.span_id: s for s in t.spans}
+    by_name = {s.name: s for s in t.spans}
+    assert t.root.name == "advisor.respond"
+    for name in ("crew.dispatch", "crew.run_graph", "agent:academic_advisor", "retrieval", "aggregate"):
+        assert name in by_name
+    # agent spans run on worker threads but still nest under the graph run
+    agent = by_name["agent:career_counselor"]
+    assert spans[agent.parent_id].name == "crew.run_graph"
+    assert agent.thread != t.root.thread
+    assert all(s.end_ns is not None and s.status == "ok" for s in t.spans)
+
+    rows = waterfall(t)
+    assert rows[0]["name"] == "advisor.respond" and rows[0]["depth"] == 0
+    assert all(r["start_ms"] >= 0 for r in rows)
+
+
+def test_span_is_noop_outside_trace():
+    from tracing import span, trace, current_trace_id
+
+    with span("orphan") as s:
+        s.set_attribute("ignored", True)
+        assert current_trace_id() is None
+    with pytest.raises(RuntimeError):
+        with trace("failing") as root:
+            raise RuntimeError("boom")
+    assert root.status == "error"
+
+
+# Test 17: Benchmark harness
+def test_benchmarks_run_and_flag_regressions():
+    import benchmarks
+    import vector_db
+
+    report = benchmarks.run_benchmarks(suites=["vector_db", "crew"], sizes=["200"], repeat=2, llm_latency_ms=5)
+    results = report["results"]
+    assert results["vector_db.query.cached[200]"]["p50_ms"] >= 0
+    assert "crew.dispatch[3x5ms]" in results
+    assert vector_db.index_info()["documents"] == 0  # benchmark leaves a clean index
+
+    slower = {"results": {name: dict(s, p50_ms=s["p50_ms"] * 2 + 1) for name, s in results.items()}}
+    assert {r["name"] for r in benchmarks.compare(slower, report)} == set(results)
+    assert benchmarks.compare(report, report) == []
+
+
+# Test 18: Offline mock LLM server and load generator
+def test_mock_llm_server_serves_openai_and_hf_clients():
+    from hf_client import HuggingFaceClient
+    from loadtest import run_load
+    from mock_llm_server import MockConfig, MockLLMServer
+    from openai_client import OpenAIClient
+
+    with MockLLMServer(MockConfig(latency="fixed:1", max_tokens=12, seed=1)) as server:
+        chat = OpenAIClient(api_key="mock", base_url=server.url + "/v1")
+        assert len(chat.chat("How do I become a Data Scientist?").split()) == 12
+
+        hf = HuggingFaceClient(api_key="mock", base_url=server.url, max_wait_s=1)
+        assert hf.generate("Tell me about data science", max_length=5)
+        assert all(hf.generate_many(["a", "b"], max_length=5))
+
+        report = run_load(chat.chat, qps=50, duration_s=0.2, is_error=lambda r: r.startswith("OpenAI request failed"))
+        assert report["completed"] == report["sent"] == 10
+        assert report["errors"] == 0 and report["p99_ms"] > 0
+        # every request has its own prompt: none is coalesced, each reaches the server
+        assert report["singleflight"]["openai.chat"] == {"calls": 10, "executions": 10, "shared": 0}
+        assert server.stats()["openai"]["requests"] == 11
+
+        repeated = run_load(chat.chat, qps=50, duration_s=0.2, queries=["same prompt"], unique=False)
+        assert repeated["singleflight"]["openai.chat"]["calls"] == 10
+
+    import vector_db
+    from loadtest import load_corpus
+    try:
+        assert load_corpus() > 9  # demo resources plus the career catalog
+    finally:
+        vector_db.reset_index()
+
+
+# Test 19: Sampling profiler
+def test_sampling_profiler_captures_busy_thread(tmp_path):
+    import threading
+    import time
+    from profiler import SamplingProfiler
+
+    done = threading.Event()
+
+    def busy_loop_for_profiler():
+        while not done.is_set():
+            sum(i * i for i in range(1000))
+
+    worker = threading.Thread(target=busy_loop_for_profiler, name="busy")
+    worker.start()
+    prof = SamplingProfiler(interval_s=0.005, out_dir=str(tmp_path))
+    try:
+        prof.start(duration_s=0.3)
+        prof._thread.join(5)
+    finally:
+        done.set()
+        worker.join()
+
+    assert prof.samples > 10
+    collapsed = Path(prof.files["collapsed"]).read_text()
+    assert any(line.startswith("busy;") and "busy_loop_for_profiler" in line for line in collapsed.splitlines())
+    doc = json.loads(Path(prof.files["speedscope"]).read_text())
+    busy = next(p for p in doc["profiles"] if p["name"] == "busy")
+    assert len(busy["samples"]) == len(busy["weights"])
+    assert all(0 <= i < len(doc["shared"]["frames"]) for stack in busy["samples"] for i in stack)
+
+
+# Test 20: Background job queue
+def test_job_queue_dedups_persists_and_cancels(tmp_path):
+    import threading
+    from jobs import JobQueue
+
+    release = threading.Event()
+    calls = []
+
+    def slow(payload, job):
+        calls.append(payload["query"])
+        job.progress("working", step=1)
+        release.wait(5)
+        job.check_cancelled()
+        return {"answer": payload["query"].upper()}
+
+    def broken(payload, job):
+        raise ValueError("bad input")
+
+    db = str(tmp_path / "jobs.db")
+    queue = JobQueue(db_path=db, max_workers=1)
+    queue.register("slow", slow)
+    queue.register("broken", broken)
+
+    first = queue.submit("slow", {"query": "data science"})
+    assert queue.submit("slow", {"query": "data science"}) == first  # identical in-flight request
+    queued = queue.submit("slow", {"query": "web dev"})  # waits behind `first` (one worker)
+    assert queue.cancel(queued)
+    assert queue.get(queued)["status"] == "cancelled"
+
+    release.set()
+    done = queue.wait(first, timeout=5)
+    assert done["status"] == "done" and done["result"] == {"answer": "DATA SCIENCE"}
+    assert done["progress"]["step"] == 1
+    assert calls == ["data science"]
+
+    failed = queue.wait(queue.submit("broken", {}), timeout=5)
+    assert failed["status"] == "failed" and "bad input" in failed["error"]
+
+    # results survive a new queue (process restart) on the same database
+    assert JobQueue(db_path=db).get(first)["result"] == {"answer": "DATA SCIENCE"}
+
+
+# Test 21: Single-flight coalescing
+def test_singleflight_runs_concurrent_duplicates_once():
+    import threading
+    import time
+    from singleflight import SingleFlight
+
+    flight = SingleFlight("test.flight")
+    barrier = threading.Barrier(6)
+    runs, results = [], []
+
+    def work():
+        runs.append(1)
+        time.sleep(0.2)
+        return "value"
+
+    def caller():
+        barrier.wait()
+        results.append(flight.do("key", work))
+
+    threads = [threading.Thread(target=caller) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(runs) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 5
+    assert all(value == "value" for value, _ in results)
+    assert flight.inflight() == 0
+
+    with pytest.raises(ValueError):
+        flight.do("boom", lambda: (_ for _ in ()).throw(ValueError("upstream down")))
+
+
+def test_advisor_coalesces_identical_turns():
+    import threading
+    import time
+    from agentic_advisor import AgenticAdvisor
+
+    advisor = AgenticAdvisor()
+    calls = []
+
+    def slow_agent(request):
+        calls.append(request)
+        time.sleep(0.2)
+        return {"text": "stub", "resources": []}
+
+    advisor.crew.agents = {"stub": slow_agent}
+    queries = ["How do I become a Data Scientist?", "how do I become a  data scientist"] * 2
+    out = []
+    profile = {"name": "A"}
+    threads = [threading.Thread(target=lambda q=q: out.append(advisor.respond(q, profile))) for q in queries]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sum(1 for r in out if r.get("coalesced")) == 3
+    # a different profile is a different turn
+    advisor.respond("How do I become a Data Scientist?", profile={"name": "B"})
+    assert len(calls) == 2
+    # anonymous turns are never merged: nothing says they belong to the same user
+    threads = [threading.Thread(target=lambda: out.append(advisor.respond(queries[0]))) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 4
+
+
+# Test 22: Career match scoring
+def test_career_index_scores_and_filters():
+    from career_match import CareerIndex
+
+    index = CareerIndex.load()
+    top = index.top_k({"Python": 5, "Machine Learning": 5, "Statistics": 5, "SQL": 5, "Data Visualization": 5}, k=3)
+    assert top[0]["title"] == "Data Scientist" and top[0]["match_score"] == 100
+    assert top[0]["match_score"] >= top[1]["match_score"] >= top[2]["match_score"]
+
+    finance = index.top_k(["Excel"], k=50, industry="Finance", experience="Executive")
+    assert finance and all(c["industry"] == "Finance" for c in finance)
+    assert {c["title"] for c in finance} == {"Financial Analyst"}
+    assert all("data" in (c["title"] + c["description"] + " ".join(c["skills_required"])).lower()
+               for c in index.top_k([], k=50, search="Data"))
+    assert index.top_k(["Python"], industry="Nonexistent") == []
+
+
+def test_career_index_matches_dense_scoring_at_scale():
+    import random
+    import numpy as np
+    from career_match import CareerIndex
+
+    rng = random.Random(3)
+    skills = [f"s{i}" for i in range(300)]
+    careers = [{"title": f"Job {i}", "industry": "Technology", "salary_min": 1, "salary_max": 2,
+                "growth_rate": 0, "description": "", "skills": {rng.choice(skills): rng.randint(1, 3) for _ in range(6)}}
+               for i in range(20000)]
+    index = CareerIndex(careers)
+    user = {s: rng.randint(0, 5) for s in rng.sample(skills, 50)}
+    vec = index.skill_vector(user)
+
+    dense = np.zeros((len(careers), len(index.skill_names)), dtype=np.float32)
+    dense[index.rows, index.indices] = index.weights
+    expected = dense @ vec / dense.sum(axis=1)
+    assert np.allclose(index.scores(vec), expected, atol=1e-5)
+    best = index.top_k(user, k=5)
+    assert best[0]["match_score"] == int(round(float(expected.max()) * 100))
+
+# Test 23: Skill taxonomy
+def test_skill_taxonomy_extracts_and_resolves():
+    from skill_taxonomy import SkillTaxonomy
+    from career_match import CareerIndex
+
+    tax = SkillTaxonomy.load()
+    text = "Senior machine-learning engineer: Python, scikit-learn, k8s, JavaScript (not Java!) and ML"
+    assert tax.names_of(tax.extract(text)) == ["Machine Learning", "Python", "Kubernetes", "JavaScript", "Java"]
+    assert tax.resolve("Problem-Solving") == tax.resolve("problem solving") == tax.resolve("Critical Thinking")
+    assert tax.resolve("Rust") is None
+    rust = tax.intern("Rust")
+    assert tax.intern("rust") == rust and tax.names_of(tax.extract("I write Rust")) == ["Rust"]
+    assert tax.names_of(tax.expand(tax.ids(["TensorFlow"]))) == [
+        "Data Science", "Machine Learning", "Deep Learning", "TensorFlow"]
+
+    index = CareerIndex.load(taxonomy=tax)
+    by_alias = index.top_k({"py": 0, "python3": 5, "ml": 5, "stats": 5, "postgres": 5, "tableau": 5}, k=1)
+    assert by_alias[0]["title"] == "Data Scientist" and by_alias[0]["match_score"] == 100
+
+
+# Test 24: Career path catalog routing
+def test_career_guidance_system_routes_through_catalog():
+    from career_guidance_system import CareerGuidanceSystem, CareerPathCatalog
+
+    system = CareerGuidanceSystem("Test", catalog=CareerPathCatalog.load())
+    roles = lambda interest: [p["role"] for p in system.recommend_path(interest)["career_paths"]]
+    assert roles("AI and machine learning") == ["Data Scientist", "Machine Learning Engineer"]
+    assert roles("HTML") == ["Full Stack Developer"]  # word match: "ml" must not fire inside "html"
+    assert roles("Cybersecurity") == ["Cybersecurity Analyst"]
+    assert roles("marine biology") == ["Marine Biology Specialist"]
+    assert "message" in system.recommend_path("  ")
+
+    assert "React" in system.get_skill_roadmap("Full Stack Developer")["skills"]
+    assert system.get_skill_roadmap("senior data engineer")["skills"][0] == "Python"
+    assert system.get_skill_roadmap("Chef")["timeline"] == "Varies by role"
+    system.recommend_path("web")["career_paths"][0]["skills"].append("mutated")
+    assert "mutated" not in system.recommend_path("web")["career_paths"][0]["skills"]
+
+
+# Test 25: Skills gap analysis and batched retrieval
+def test_gap_analyzer_matches_per_role_loop_and_batches_retrieval():
+    import numpy as np
+    from career_match import CareerIndex
+    from skills_gap import EXPECTED_LEVEL, GapAnalyzer
+    import vector_db
+
+    index = CareerIndex.load()
+    analyzer = GapAnalyzer(index)
+    ratings = {"Python": 4, "SQL": 1, "Statistics": 3, "Communication": 5}
+    user_vec = index.skill_vector(ratings)
+
+    # reference: plain per-role loop over the catalog
+    expected = {}
+    for c in index.careers:
+        gap = total = 0.0
+        for skill, weight in c["skills"].items():
+            need = EXPECTED_LEVEL[weight]
+            gap += weight * max(need - user_vec[index.taxonomy.resolve(skill)], 0.0)
+            total += weight * need
+        expected[c["title"]] = int(round((1 - gap / total) * 100))
+    report = analyzer.gaps(ratings, top_roles=len(index))
+    assert {r["title"]: r["readiness"] for r in report["roles"]} == expected
+    assert [r["readiness"] for r in report["roles"]] == sorted(expected.values(), reverse=True)
+
+    target = analyzer.gaps(ratings, roles=["data scientist"], top_skills=10)
+    assert [r["title"] for r in target["roles"]] == ["Data Scientist"]
+    assert {s["skill"] for s in target["skills"]} == {"Python", "SQL", "Statistics", "Machine Learning",
+                                                      "Data Visualization"}
+    assert np.all(np.diff([s["gap"] for s in target["skills"]]) <= 0)
+    assert analyzer.gaps(ratings, roles=["Astronaut"]) == {"roles": [], "skills": []}
+
+    vector_db.populate_sample_data()
+    calls = []
+    def search(queries, top_k):
+        calls.append(list(queries))
+        return vector_db.query_vector_db_batch(queries, top_k)
+    analyzed = analyzer.analyze(ratings, roles=["Data Scientist"], search=search)
+    assert len(calls) == 1 and calls[0] == [s["skill"] for s in analyzed["skills"]]
+    assert vector_db.query_vector_db_batch(["Statistics", "", "Statistics"], 2) == [
+        vector_db.query_vector_db("Statistics", 2), [], vector_db.query_vector_db("Statistics", 2)]
+
+
+# Test 26: Learning path planner
+def test_learning_planner_minimum_time_path_and_cache():
+    from skill_taxonomy import SkillTaxonomy
+    from learning_planner import LearningPlanner
+
+    graph = {"default_hours": 30, "skills": {
+        "Python": {"resources": [{"title": "Long Python", "hours": 40}, {"title": "Short Python", "hours": 20}]},
+        "Java": {"resources": [{"title": "Java", "hours": 60}]},
+        "Statistics": {"resources": [{"title": "Stats", "hours": 30}]},
+        "Algorithms": {"prerequisites": [["Java", "Python"]], "resources": [{"title": "Algo", "hours": 35}]},
+        "Machine Learning": {"prerequisites": ["Python", "Statistics"], "resources": [{"title": "ML", "hours": 10}]},
+        "Deep Learning": {"prerequisites": ["Machine Learning"], "resources": [{"title": "DL", "hours": 50}]},
+    }}
+    tax = SkillTaxonomy.load()
+    planner = LearningPlanner(graph, tax)
+    career = {"title": "Researcher", "skills": {"Deep Learning": 3, "Algorithms": 2}}
+
+    plan = planner.plan_for_career({}, career)
+    names = [s["skill"] for s in plan["steps"]]
+    assert set(names) == {"Python", "Statistics", "Machine Learning", "Deep Learning", "Algorithms"}  # no Java
+    assert names.index("Python") < names.index("Machine Learning") < names.index("Deep Learning")
+    assert plan["total_hours"] == 20 + 30 + 10 + 50 + 35
+    assert plan["steps"][names.index("Python")]["resource"] == "Short Python"
+
+    known_java = planner.plan_for_career({"Java": 4, "Statistics": 5}, career)
+    assert [s["skill"] for s in known_java["steps"]][-1] == "Deep Learning"
+    assert "Statistics" not in [s["skill"] for s in known_java["steps"]]
+    assert next(s for s in known_java["steps"] if s["skill"] == "Algorithms")["after"] == []
+
+    # same starting skills -> the DP table is reused, not recomputed
+    misses = planner.cache_stats["misses"]
+    planner.plan_for_career({"java": 5, "stats": 3}, {"title": "Other", "skills": {"Algorithms": 1}})
+    assert planner.cache_stats["misses"] == misses
+    assert planner.plan_for_career({"Deep Learning": 4, "Algorithms": 3}, career)["steps"] == []
+
+    # a skill outside the taxonomy is planned locally, never added to the shared taxonomy
+    size = len(tax)
+    odd = planner.plan_for_career({"Deep Learning": 4}, {"title": "Odd", "skills": {"Quantum Basket Weaving": 2}})
+    assert [(s["skill"], s["hours"]) for s in odd["steps"]] == [("Quantum Basket Weaving", 30)]
+    assert len(tax) == size and tax.resolve("Quantum Basket Weaving") is None
+
+    # shared prerequisite: the per-skill cheapest option (Excel, 50h) loses to Data Analysis
+    # (1h) once Statistics (100h) is in the plan for the other target anyway
+    shared = LearningPlanner({"skills": {
+        "Statistics": {"resources": [{"title": "Stats", "hours": 100}]},
+        "Data Analysis": {"prerequisites": ["Statistics"], "resources": [{"title": "DA", "hours": 1}]},
+        "Excel": {"resources": [{"title": "Excel", "hours": 50}]},
+        "Machine Learning": {"prerequisites": [["Data Analysis", "Excel"]], "resources": [{"title": "ML", "hours": 10}]},
+        "Data Visualization": {"prerequisites": ["Statistics"], "resources": [{"title": "Viz", "hours": 10}]},
+    }}, tax)
+    both = shared.plan_for_career({}, {"title": "Analyst", "skills": {"Machine Learning": 3, "Data Visualization": 3}})
+    assert {s["skill"] for s in both["steps"]} == {"Statistics", "Data Analysis", "Machine Learning", "Data Visualization"}
+    assert both["total_hours"] == 100 + 1 + 10 + 10
+    assert next(s for s in both["steps"] if s["skill"] == "Machine Learning")["after"] == ["Data Analysis"]
+    alone = shared.plan_for_career({}, {"title": "ML", "skills": {"Machine Learning": 3}})
+    assert [s["skill"] for s in alone["steps"]] == ["Excel", "Machine Learning"] and alone["total_hours"] == 60
+
+    graph["skills"]["Python"]["prerequisites"] = ["Deep Learning"]
+    with pytest.raises(ValueError, match="cycle"):
+        LearningPlanner(graph, SkillTaxonomy.load())
+
+
+# Test 27: Mentor directory search
+def test_mentor_directory_filters_and_ranks(tmp_path):
+    import random
+    from mentors import MentorDirectory, parse_slot
+
+    directory = MentorDirectory(db_path=str(tmp_path / "mentors.db"))
+    assert directory.count() == 12  # seeded from config/mentors.json
+    size = len(directory.taxonomy)
+    directory.add_mentors([{"name": "Ana Ruiz", "expertise": ["Underwater Robotics", "Python"]}])
+    assert len(directory.taxonomy) == size  # request-time names stay out of the shared taxonomy
+    assert [m["name"] for m in directory.search(expertise="underwater robotics")] == ["Ana Ruiz"]
+    assert directory.search(goals="I want to break into cybersecurity")[0]["name"] == "Tom Fischer"
+    ml = {m["name"] for m in directory.search(expertise="Machine Learning", limit=50)}
+    assert {"Dr. Sarah Johnson", "Michael Chen"} <= ml  # Michael lists NLP, a Machine Learning child
+    assert "Carlos Mendes" not in ml
+    assert [m["name"] for m in directory.search(query="k8s")] == ["Priya Natarajan"]
+    # LIKE wildcards in the search text are literal characters
+    assert directory.search(query="%") == [] and directory.search(query="_") == []
+    assert directory.search(query="\\") == []
+    assert parse_slot(("09:00-10:30", "Wed")) == (2, 540, 630) and parse_slot(("Any Time", None)) is None
+
+    # thousands of mentors: the SQL filters agree with a brute-force interval overlap check
+    rng = random.Random(5)
+    skills = ["Python", "SQL", "Security", "React", "Deep Learning", "Statistics"]
+    extra = [{"name": f"Mentor {i}", "rating": rng.uniform(3, 5), "expertise": rng.sample(skills, 2),
+              "availability": [{"days": [rng.choice(["mon", "tue", "sat"])],
+                                "start": f"{h:02d}:00", "end": f"{h + rng.randint(1, 3):02d}:00"}
+                               for h in [rng.randint(6, 20)]]} for i in range(3000)]
+    directory.add_mentors(extra)
+    expected = {m["name"] for m in extra if "Security" in m["expertise"] and any(
+        "tue" in a["days"] and int(a["start"][:2]) < 22 and int(a["end"][:2]) > 17 for a in m["availability"])}
+    found = directory.search(goals="security", expertise="Security", slot=("Evening", "Tue"), limit=5000)
+    assert {m["name"] for m in found if m["name"].startswith("Mentor ")} == expected
+
+
+# Test 28: Market data aggregates
+def test_market_insights_chunked_ingest_matches_raw_percentiles(tmp_path):
+    import numpy as np
+    from market_data import MarketInsights, generate_sample
+
+    raw = generate_sample(rows=6000, seed=11)
+    raw.loc[::50, ["salary_min", "salary_max"]] = np.nan  # postings without pay still count as demand
+    csv = tmp_path / "postings.csv"
+    raw.to_csv(csv, index=False)
+
+    insights = MarketInsights(db_path=str(tmp_path / "market.db"))
+    meta = insights.ingest([str(csv)], chunksize=1000)
+    assert meta["rows"] == "6000"
+
+    raw["role"] = raw["title"].str.replace(r"^(Senior|Junior|Lead) ", "", regex=True)
+    raw["salary"] = raw[["salary_min", "salary_max"]].mean(axis=1)
+    ds = raw[(raw.role == "Data Scientist") & (raw.city == "New York")]
+    row = insights.by_city("Data Scientist", top=20).set_index("city").loc["New York"]
+    assert row["postings"] == len(ds) and row["salaried"] == ds["salary"].notna().sum()
+    for name, q in [("p25", 0.25), ("p50", 0.5), ("p90", 0.9)]:
+        assert abs(row[name] - np.quantile(ds["salary"].dropna(), q)) <= 1000
+
+    demand = insights.demand_by_role(top=50)
+    assert demand["postings"].sum() == len(raw) and "Other" not in set(demand["role"])
+    trend = insights.salary_trend("Data Scientist")
+    assert list(trend["month"]) == sorted(trend["month"]) and trend["postings"].sum() == (raw.role == "Data Scientist").sum()
+
+    # cached frames are copies, and a new ingest invalidates them
+    trend["p50"] = 0
+    assert insights.salary_trend("Data Scientist")["p50"].gt(0).all()
+    insights.ingest([raw.head(100)])
+    assert insights.demand_by_role(top=50)["postings"].sum() == 100
+
+    # an ingest by another process (another instance on the same database) is picked up too
+    other = MarketInsights(db_path=str(tmp_path / "market.db"))
+    other.ingest([raw.head(40)])
+    assert insights.demand_by_role(top=50)["postings"].sum() == 40
+    assert insights.roles_list() == sorted(set(raw.head(40).role))
+
+
+# Test 29: Figure cache
+def test_figure_cache_rebuilds_only_changed_inputs():
+    import pandas as pd
+    import plotly.express as px
+    from figure_cache import FigureCache, data_fingerprint
+
+    cache = FigureCache()
+    builds = []
+
+    def bar(df):
+        builds.append(len(df))
+        return px.bar(df, x="skill", y="gap")
+
+    df = pd.DataFrame({"skill": ["SQL", "Python"], "gap": [1.5, 0.5]})
+    first = cache.figure("gaps", df, lambda: bar(df))
+    assert first["data"][0]["type"] == "bar" and builds == [2]
+
+    # an equal frame built elsewhere (another session) hits the same entry
+    same = pd.DataFrame({"skill": ["SQL", "Python"], "gap": [1.5, 0.5]})
+    assert cache.figure("gaps", same, lambda: bar(same)) == first and builds == [2]
+    cache.figure("radar", {"Python": 3}, lambda: px.line_polar(r=[3], theta=["Python"]))
+    cache.figure("radar", {"Python": 3}, lambda: px.line_polar(r=[3], theta=["Python"]))
+
+    changed = df.assign(gap=[1.5, 0.75])
+    assert data_fingerprint(changed) != data_fingerprint(df)
+    cache.figure("gaps", changed, lambda: bar(changed))
+    assert builds == [2, 2]
+    assert cache.stats()["hits"] == 2 and cache.stats()["builds"] == 3
+
+    # returned dicts are copies; invalidate drops just one chart's entries
+    first["data"].clear()
+    assert cache.figure("gaps", df, lambda: bar(df))["data"]
+    assert cache.invalidate("gaps") == 2 and cache.stats()["entries"] == 1
+
+
+# Test 30: Activity event store rollups
+def test_activity_rollups_match_raw_events(tmp_path):
+    import numpy as np
+    import pandas as pd
+    from activity import ActivityStore, session_user
+
+    store = ActivityStore(db_path=str(tmp_path / "activity.db"))
+    rng = np.random.default_rng(3)
+    days = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 3 * 365, 600), unit="D")
+    skills = rng.choice(["Python", "SQL", "Statistics"], 600)
+    events = [{"kind": "study", "ts": d.to_pydatetime(), "skill": s, "hours": float(h)}
+              for d, s, h in zip(days, skills, rng.integers(1, 5, 600))]
+    for start in range(0, 600, 100):  # appended in batches, rollups updated incrementally
+        store.record_many("alice", events[start:start + 100])
+    store.record("bob", "study", ts="2024-02-02T09:00:00", skill="Python", hours=7)
+    store.record("alice", "certification", ts="2024-03-01", title="SQL Fundamentals")
+
+    raw = pd.DataFrame({"month": days.strftime("%Y-%m"), "skill": skills,
+                        "hours": [e["hours"] for e in events]})
+    monthly = store.series("alice", grain="month").set_index("period")
+    expected = raw.groupby("month")["hours"].sum()
+    assert monthly["hours"].to_dict() == expected.to_dict()
+    assert monthly["sessions"].sum() == 600 and monthly.loc["2024-03", "certifications"] == 1
+    weekly = store.series("alice", grain="week", skills=["SQL"])
+    assert weekly["hours"].sum() == raw.loc[raw.skill == "SQL", "hours"].sum()
+    assert store.totals("alice")["hours"] == raw["hours"].sum() and store.totals("bob")["hours"] == 7
+
+    # an out-of-order assessment updates the average but not the latest score
+    store.record_ratings("alice", {"Python": 4}, ts="2025-06-10")
+    store.record_ratings("alice", {"Python": 2}, ts="2025-06-01")
+    assert store.record_ratings("alice", {"Python": 4}) == 0
+    june = store.series("alice", grain="month", skills=["Python"], since="2025-06-01").set_index("period").loc["2025-06"]
+    assert june["score"] == 3 and june["score_last"] == 4
+    assert [e["title"] for e in store.recent("alice", kinds=["certification"])] == ["SQL Fundamentals"]
+
+    before = store.series("alice", grain="day")
+    store.rebuild_rollups("alice")
+    pd.testing.assert_frame_equal(store.series("alice", grain="day"), before)
+    with pytest.raises(ValueError):
+        store.record("alice", "assessment", skill="SQL")
+
+    # anonymous sessions each get a private log; idle ones are pruned
+    first, second = {}, {}
+    assert session_user(first) == session_user(first) != session_user(second)
+    assert session_user({"username": "alice"}) == "alice"
+    store.record(session_user(first), "study", ts="2020-01-01", hours=1)
+    store.record(session_user(second), "study", hours=2)
+    assert store.totals(session_user(first))["hours"] == 1
+    assert store.prune_guests() == 1
+    assert store.totals(session_user(first))["hours"] == 0 and store.totals(session_user(second))["hours"] == 2
+    assert store.totals("alice")["hours"] > 0
+
+
+# Test 31: Windowed chat history
+def test_chat_history_window_pages_and_lazy_metadata(tmp_path):
+    from chat_history import (agent_metadata, assistant_message, history_page, page_count,
+                              recent_window, user_message)
+    from jobs import JobQueue
+
+    queue = JobQueue(db_path=str(tmp_path / "jobs.db"), max_workers=1)
+    queue.register("advisor", lambda payload, job: {"combined_text": payload["query"].upper(),
+                                                    "agent_results": {"career_counselor": {"text": "ok"}}})
+    job_id = queue.submit("advisor", {"query": "data science"})
+    queue.wait(job_id, timeout=5)
+
+    history = [user_message(f"q{i}") for i in range(54)] + [assistant_message("answer", job_id=job_id)]
+    assert "agent_results" not in json.dumps(history)  # metadata stays in the job store
+
+    start, recent = recent_window(history, recent=10)
+    assert start == 45 and len(recent) == 10 and recent[-1]["job_id"] == job_id
+    assert page_count(history, recent=10, page_size=20) == 3
+    assert history_page(history, 1, recent=10, page_size=20) == (25, history[25:45])
+    assert history_page(history, 3, recent=10, page_size=20) == (0, history[0:5])
+    assert page_count(history[:8], recent=10) == 0 and recent_window(history[:8], recent=10)[0] == 0
+
+    assert agent_metadata(recent[-1], queue)["combined_text"] == "DATA SCIENCE"
+    assert agent_metadata(assistant_message("offline answer"), queue) is None
+    assert agent_metadata(assistant_message("lost", job_id="missing"), queue) is None
+
+
+# Test 32: Job ownership, heartbeats and retention
+def test_job_queue_reclaims_only_dead_owners_and_prunes(tmp_path):
+    import sqlite3
+    import threading
+    import time
+    from jobs import JobQueue
+
+    db = str(tmp_path / "jobs.db")
+    release = threading.Event()
+    first = JobQueue(db_path=db, max_workers=1, heartbeat_s=0.1)
+    first.register("slow", lambda payload, job: release.wait(5))
+    running = first.submit("slow", {})
+
+    # another live process opening the same database leaves the job alone
+    time.sleep(0.5)
+    second = JobQueue(db_path=db, heartbeat_s=0.1)
+    assert second.reap() == 0
+    assert first.get(running)["status"] in ("queued", "running")
+    release.set()
+    assert first.wait(running, timeout=5)["status"] == "done"
+
+    # a job whose owner died (no heartbeat) is reclaimed
+    conn = sqlite3.connect(db)
+    conn.execute("INSERT INTO jobs (id, kind, dedup_key, status, created_at, owner, heartbeat_at) "
+                 "VALUES ('orphan', 'slow', 'k', 'running', ?, 'dead:owner', ?)", (time.time() - 60,) * 2)
+    conn.commit()
+    conn.close()
+    assert second.reap() == 1
+    assert second.get("orphan")["status"] == "interrupted"
+
+    # finished jobs are kept by count and by age
+    older = first.wait(first.submit("slow", {"n": 1}), timeout=5)["id"]
+    newer = first.wait(first.submit("slow", {"n": 2}), timeout=5)["id"]
+    by_count = JobQueue(db_path=db, heartbeat_s=0.1, retain_max=1)
+    assert by_count.get(newer) is not None and by_count.get(older) is None
+    time.sleep(0.05)
+    by_age = JobQueue(db_path=db, heartbeat_s=0.1, retain_s=0.01)
+    assert by_age.get(newer) is None
+    for queue in (first, second, by_count, by_age):
+        queue.close()
+
+
+def test_job_progress_is_a_snapshot(tmp_path):
+    import threading
+    from jobs import JobQueue
+
+    reported, release = threading.Event(), threading.Event()
+
+    def streaming(payload, job):
+        partial = {"academic_plan": "1. Majors"}
+        job.progress("writing", partial=partial)
+        partial["career_path"] = "still streaming"  # the handler keeps building its dict
+        reported.set()
+        release.wait(5)
+        return partial
+
+    queue = JobQueue(db_path=str(tmp_path / "jobs.db"), max_workers=1)
+    queue.register("stream", streaming)
+    job_id = queue.submit("stream", {})
+    assert reported.wait(5)
+    seen = queue.get(job_id)["progress"]
+    assert seen["partial"] == {"academic_plan": "1. Majors"}
+    seen["partial"]["mutated"] = True  # and the caller's copy is its own
+    assert "mutated" not in queue.get(job_id)["progress"]["partial"]
+    release.set()
+    assert queue.wait(job_id, timeout=5)["status"] == "done"
+    queue.close()
+
+
+# Test 33: Guidance crew grounding
+def test_guidance_career_stage_keeps_related_careers(monkeypatch):
+    # agents.py needs the crewai package's Agent/Crew; skip where only the local crewai.py is importable
+    agents = pytest.importorskip("agents", exc_type=ImportError)
+    import vector_db
+
+    vector_db.populate_sample_data()
+    prompts = {}
+
+    def fake_openai(self, prompt, on_token=None):
+        stage = "career_path" if "Related Careers" in prompt else (
+            "academic_plan" if "Related Courses" in prompt else "skills_plan")
+        prompts[stage] = prompt
+        return "1. Plan\n2. Steps\n3. Skills\n4. More"
+
+    monkeypatch.setattr(agents.GuidanceAgent, "_ask_openai", fake_openai)
+    agents.GuidanceCrew().get_comprehensive_guidance({"name": "A"}, ["Data Science"])
+    related = prompts["career_path"].split("Related Careers from DB:", 1)[1].splitlines()[0].strip()
+    assert related not in ("", "[]") and "Career Tips" in related
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,235 @@
+"""
+In-process request tracing with an OpenTelemetry-style data model (no exporter).
+
+- trace(name, **attrs): start a trace (root span), or a child span if one is already active
+- span(name, **attrs): child span of the active trace; a cheap no-op outside a trace
+- traced(name): decorator form of span()
+- recent_traces(limit) / get_trace(trace_id): finished traces from the ring buffer
+- waterfall(trace): flattened, depth-annotated span rows for display
+
+The active span lives in a ContextVar, so worker threads started with
+contextvars.copy_context() (CrewAI, StreamingPipeline) nest under the caller.
+
+Usage:
+    with trace("advisor.respond", query=q):
+        with span("retrieval", top_k=3) as s:
+            docs = search(q)
+            s.set_attribute("hits", len(docs))
+"""
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+MAX_TRACES = 100
+MAX_SPANS_PER_TRACE = 512
+
+
+class Span:
+    """One timed operation; field names follow the OpenTelemetry span model."""
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "status", "status_message", "thread")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes)
+        self.status = "unset"
+        self.status_message = ""
+        self.thread = threading.current_thread().name
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_status(self, status: str, message: str = ""):
+        self.status = status
+        self.status_message = message
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "attributes": dict(self.attributes),
+            "status": {"code": self.status, "message": self.status_message},
+            "thread": self.thread,
+        }
+
+
+class _NoopSpan:
+    """Returned by span() outside a trace so callers never need to check."""
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_status(self, status, message=""):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Trace:
+    """All spans sharing a trace_id; spans are appended from any thread."""
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, s: Span) -> bool:
+        with self._lock:
+            if len(self.spans) >= MAX_SPANS_PER_TRACE:
+                self.dropped += 1
+                return False
+            self.spans.append(s)
+            return True
+
+    @property
+    def root(self) -> Optional[Span]:
+        return self.spans[0] if self.spans else None
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = [s.to_dict() for s in self.spans]
+        return {"trace_id": self.trace_id, "spans": spans, "dropped_spans": self.dropped}
+
+
+# (trace, span) of the innermost active span in this context
+_CURRENT: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_TRACES: "deque[Trace]" = deque(maxlen=MAX_TRACES)
+_TRACES_LOCK = threading.Lock()
+
+
+@contextmanager
+def _open(t: Trace, name: str, parent_id: Optional[str], attrs: dict):
+    s = Span(name, t.trace_id, parent_id, attrs)
+    if not t.add(s):
+        yield _NOOP
+        return
+    token = _CURRENT.set((t, s))
+    try:
+        yield s
+    except BaseException as e:
+        s.set_status("error", f"{type(e).__name__}: {e}"[:200])
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        if s.status == "unset":
+            s.status = "ok"
+        _CURRENT.reset(token)
+
+
+@contextmanager
+def trace(name: str, **attrs):
+    """Start a new trace rooted at `name`; nests as a child if a trace is already active."""
+    current = _CURRENT.get()
+    if current is not None:
+        with _open(current[0], name, current[1].span_id, attrs) as s:
+            yield s
+        return
+    t = Trace(os.urandom(16).hex())
+    try:
+        with _open(t, name, None, attrs) as s:
+            yield s
+    finally:
+        with _TRACES_LOCK:
+            _TRACES.append(t)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Child span of the active trace; yields a no-op span when nothing is being traced."""
+    current = _CURRENT.get()
+    if current is None:
+        yield _NOOP
+        return
+    with _open(current[0], name, current[1].span_id, attrs) as s:
+        yield s
+
+
+def traced(name: str):
+    """Decorator: run every call of the function inside span(name)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_trace_id() -> Optional[str]:
+    current = _CURRENT.get()
+    return current[0].trace_id if current else None
+
+
+def recent_traces(limit: int = 20) -> List[Trace]:
+    """Most recent finished traces, newest first."""
+    with _TRACES_LOCK:
+        traces = list(_TRACES)
+    return list(reversed(traces))[:limit]
+
+
+def get_trace(trace_id: str) -> Optional[Trace]:
+    with _TRACES_LOCK:
+        for t in _TRACES:
+            if t.trace_id == trace_id:
+                return t
+    return None
+
+
+def waterfall(t: Trace) -> List[dict]:
+    """Spans in tree order with depth and offsets (ms from trace start), for rendering."""
+    with t._lock:
+        spans = list(t.spans)
+    if not spans:
+        return []
+    t0 = min(s.start_ns for s in spans)
+    children: Dict[Optional[str], List[Span]] = {}
+    for s in spans:
+        children.setdefault(s.parent_id, []).append(s)
+    rows = []
+
+    def walk(parent_id, depth):
+        for s in sorted(children.get(parent_id, []), key=lambda x: x.start_ns):
+            rows.append({
+                "name": s.name,
+                "depth": depth,
+                "start_ms": (s.start_ns - t0) / 1e6,
+                "duration_ms": s.duration_ms,
+                "status": s.status,
+                "thread": s.thread,
+                "attributes": dict(s.attributes),
+            })
+            walk(s.span_id, depth + 1)
+
+    walk(None, 0)
+    return rows
+
+
+def clear():
+    with _TRACES_LOCK:
+        _TRACES.clear()
+
+
+__all__ = ["trace", "span", "traced", "current_trace_id", "recent_traces", "get_trace",
+           "waterfall", "clear", "Span", "Trace"]
@@ -6,79 +6,125 @@ Simple, robust vector DB abstraction with two modes:
 Provides:
 - populate_sample_data(): loads demo resources
 - query_vector_db(query, top_k=5): returns list of text matches
+- query_vector_db_batch(queries, top_k=5): one list of matches per query, cache misses
+  searched together (one encode call and one similarity matrix)
 - add_documents(docs): add docs to the in-memory DB
+- warm_up(queries): load the encoder, build the index and prime the query cache
+- reset_index(): empty the store (benchmarks, tests)
 """
-from typing import List
+from collections import OrderedDict
+from typing import List, Tuple
 import os
+import threading
+from lazy_imports import lazy_import, module_available
+from metrics import instrument
+from tracing import span
+from singleflight import SingleFlight
 
-# Try preferred libraries first
-TRY_SENTE = True
-try:
-    from sentence_transformers import SentenceTransformer
-    import numpy as np
-    HAS_SENTE = True
-except Exception:
-    HAS_SENTE = False
-
-try:
-    import faiss
-    HAS_FAISS = True
-except Exception:
-    HAS_FAISS = False
-
-# Fallback to scikit-learn
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    HAS_SKLEARN = True
-except Exception:
-    HAS_SKLEARN = False
-
-# In-memory store
-_DOCS: List[str] = []
-_EMBEDDINGS = None
+# Capability probes only: the heavy libraries (torch via sentence-transformers,
+# faiss, scikit-learn) are imported on first real use, not at module import.
+HAS_SENTE = module_available("sentence_transformers") and module_available("numpy")
+HAS_FAISS = module_available("faiss")
+HAS_SKLEARN = module_available("sklearn")
+
+np = lazy_import("numpy")
+
+
+def _sentence_transformer_cls():
+    global HAS_SENTE
+    try:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer
+    except Exception:
+        # installed but broken: degrade to the next backend
+        HAS_SENTE = False
+        return None
+
+
+def _tfidf_cls():
+    global HAS_SKLEARN
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        return TfidfVectorizer
+    except Exception:
+        HAS_SKLEARN = False
+        return None
+
+# In-memory store shared by every session in the process. The index is one
+# immutable tuple (version, docs, embeddings, tfidf vectorizer), replaced by a
+# single assignment under _LOCK; readers take `_INDEX` once and use only that
+# snapshot, so they never pair docs, embeddings and vectorizer from different builds.
+_INDEX: Tuple[int, List[str], object, object] = (0, [], None, None)
 _VECTOR_MODEL = None
-_TFIDF_VECT = None
+_SAMPLE_LOADED = False
+_LOCK = threading.RLock()
+
+# Query result cache, cleared whenever the index changes
+_QUERY_CACHE: "OrderedDict[tuple, List[str]]" = OrderedDict()
+_QUERY_CACHE_SIZE = 512
+_CACHE_LOCK = threading.Lock()
+# concurrent misses for the same query share one search
+_FLIGHT = SingleFlight("vector_db.query")
+
+
+def _get_model():
+    """Load the sentence-transformers model once per process (None if unavailable)."""
+    global _VECTOR_MODEL
+    if _VECTOR_MODEL is None and HAS_SENTE:
+        with _LOCK:
+            if _VECTOR_MODEL is None:
+                cls = _sentence_transformer_cls()
+                if cls is not None:
+                    _VECTOR_MODEL = cls('all-MiniLM-L6-v2')
+    return _VECTOR_MODEL
+
+
+def _embed(docs: List[str]):
+    """(embeddings, tfidf vectorizer) for `docs` with the best available backend."""
+    model = _get_model() if HAS_SENTE else None
+    if model is not None:
+        return (model.encode(docs, convert_to_numpy=True) if docs else None), None
+    if HAS_SKLEARN and _tfidf_cls() is not None and docs:
+        vect = _tfidf_cls()(stop_words='english')
+        return vect.fit_transform(docs), vect
+    # very lightweight fallback: store docs only and return naive substring matches
+    return None, None
+
+
+def _publish(docs: List[str], embeddings, tfidf):
+    """Swap in a new index snapshot and drop results cached for the old one (caller holds _LOCK)."""
+    global _INDEX
+    _INDEX = (_INDEX[0] + 1, docs, embeddings, tfidf)
+    with _CACHE_LOCK:
+        _QUERY_CACHE.clear()
 
 
 def _ensure_vectorizer():
-    global _VECTOR_MODEL, _TFIDF_VECT, _EMBEDDINGS
-    if HAS_SENTE:
-        if _VECTOR_MODEL is None:
-            _VECTOR_MODEL = SentenceTransformer('all-MiniLM-L6-v2')
-            # compute embeddings if docs exist
-            if _DOCS:
-                _EMBEDDINGS = _VECTOR_MODEL.encode(_DOCS, convert_to_numpy=True)
-    elif HAS_SKLEARN:
-        if _TFIDF_VECT is None:
-            _TFIDF_VECT = TfidfVectorizer(stop_words='english')
-            if _DOCS:
-                _EMBEDDINGS = _TFIDF_VECT.fit_transform(_DOCS)
-    else:
-        # very lightweight fallback: store docs only and return naive substring matches
-        pass
+    with _LOCK:
+        _, docs, embeddings, _ = _INDEX
+        if docs and embeddings is None:
+            embeddings, tfidf = _embed(docs)
+            if embeddings is not None:
+                _publish(docs, embeddings, tfidf)
+        elif HAS_SENTE:
+            _get_model()
 
 
 def add_documents(docs: List[str]):
     """Add documents to the in-memory store and update embeddings/index."""
-    global _DOCS, _EMBEDDINGS, _VECTOR_MODEL, _TFIDF_VECT
     docs = [d for d in docs if d]
     if not docs:
         return
-    _DOCS.extend(docs)
-    # Recompute embeddings/index
-    if HAS_SENTE:
-        if _VECTOR_MODEL is None:
-            _VECTOR_MODEL = SentenceTransformer('all-MiniLM-L6-v2')
-        _EMBEDDINGS = _VECTOR_MODEL.encode(_DOCS, convert_to_numpy=True)
-    elif HAS_SKLEARN:
-        if _TFIDF_VECT is None:
-            _TFIDF_VECT = TfidfVectorizer(stop_words='english')
-        _EMBEDDINGS = _TFIDF_VECT.fit_transform(_DOCS)
+    with _LOCK:
+        # Build the new index off to the side, then publish it in one assignment.
+        new_docs = _INDEX[1] + docs
+        embeddings, tfidf = _embed(new_docs)
+        _publish(new_docs, embeddings, tfidf)
 
 
 def populate_sample_data():
-    """Populate demo documents used by the frontend and tests."""
+    """Populate demo documents used by the frontend and tests (once per process)."""
+    global _SAMPLE_LOADED
     sample_docs = [
         "Intro to Python: Learn programming basics and data structures.",
         "Statistics for Data Science: Descriptive stats, probability, and inference.",
@@ -90,9 +136,14 @@ def populate_sample_data():
         "Research & Publications: How to prepare a research paper and publish findings.",
         "Project-based learning: Build real-world applications and showcase them in a portfolio.",
     ]
-    add_documents(sample_docs)
+    with _LOCK:
+        if _SAMPLE_LOADED:
+            return
+        add_documents(sample_docs)
+        _SAMPLE_LOADED = True
 
 
+@instrument("query_vector_db")
 def query_vector_db(query: str, top_k: int = 5) -> List[str]:
     """Return up to top_k matching documents (strings). Works in fallback modes.
 
@@ -102,33 +153,108 @@ def query_vector_db(query: str, top_k: int = 5) -> List[str]:
     query = (query or "").strip()
     if not query:
         return []
+    # snapshot the shared index; add_documents publishes replacements, never mutates
+    version, docs, embeddings, tfidf = _INDEX
+
+    key = (query.lower(), top_k, version)
+    with span("retrieval", top_k=top_k, index_version=version) as s:
+        with _CACHE_LOCK:
+            cached = _QUERY_CACHE.get(key)
+            if cached is not None:
+                _QUERY_CACHE.move_to_end(key)
+        s.set_attribute("cache_hit", cached is not None)
+        if cached is not None:
+            return list(cached)
+        hits, shared = _FLIGHT.do(key, lambda: _search(query, top_k, docs, embeddings, tfidf))
+        s.set_attribute("hits", len(hits))
+        s.set_attribute("coalesced", shared)
+        with _CACHE_LOCK:
+            _QUERY_CACHE[key] = hits
+            while len(_QUERY_CACHE) > _QUERY_CACHE_SIZE:
+                _QUERY_CACHE.popitem(last=False)
+        return list(hits)
+
+
+@instrument("query_vector_db_batch")
+def query_vector_db_batch(queries: List[str], top_k: int = 5) -> List[List[str]]:
+    """query_vector_db for many queries at once; results line up with `queries`.
+
+    Cached queries are answered from the cache; the rest are searched in a single
+    batch (one encoder call / one TF-IDF transform and one similarity matrix) and
+    cached for later single or batched calls.
+    """
+    version, docs, embeddings, tfidf = _INDEX
+    cleaned = [(q or "").strip() for q in queries]
+    results: List[List[str]] = [[] for _ in cleaned]
+    missing: "OrderedDict[tuple, List[int]]" = OrderedDict()
+    with span("retrieval.batch", queries=len(cleaned), top_k=top_k, index_version=version) as s:
+        with _CACHE_LOCK:
+            for i, q in enumerate(cleaned):
+                if not q:
+                    continue
+                key = (q.lower(), top_k, version)
+                cached = _QUERY_CACHE.get(key)
+                if cached is not None:
+                    _QUERY_CACHE.move_to_end(key)
+                    results[i] = list(cached)
+                else:
+                    missing.setdefault(key, []).append(i)
+        s.set_attribute("cache_misses", len(missing))
+        if missing:
+            misses = [cleaned[slots[0]] for slots in missing.values()]
+            found = _search_batch(misses, top_k, docs, embeddings, tfidf)
+            with _CACHE_LOCK:
+                for (key, slots), hits in zip(missing.items(), found):
+                    _QUERY_CACHE[key] = hits
+                    for i in slots:
+                        results[i] = list(hits)
+                while len(_QUERY_CACHE) > _QUERY_CACHE_SIZE:
+                    _QUERY_CACHE.popitem(last=False)
+    return results
+
+
+def _search_batch(queries: List[str], top_k: int, docs: List[str], embeddings, tfidf) -> List[List[str]]:
+    if HAS_SENTE and embeddings is not None:
+        q_emb = _get_model().encode(queries, convert_to_numpy=True)
+        sims = (q_emb @ embeddings.T) / (
+            np.linalg.norm(q_emb, axis=1)[:, None] * np.linalg.norm(embeddings, axis=1)[None, :] + 1e-10)
+    elif HAS_SKLEARN and embeddings is not None:
+        from sklearn.metrics.pairwise import cosine_similarity
+        sims = cosine_similarity(tfidf.transform(queries), embeddings)
+    else:
+        return [_search(q, top_k, docs, embeddings, tfidf) for q in queries]
+    # same ordering as _search, so batched and single lookups agree on ties
+    order = np.argsort(sims, axis=1)[:, ::-1][:, :top_k]
+    return [[docs[i] for i in row if i < len(docs)] for row in order]
+
+
+def _search(query: str, top_k: int, docs: List[str], embeddings, tfidf) -> List[str]:
 
     # If sentence-transformers available
-    if HAS_SENTE and _EMBEDDINGS is not None:
-        q_emb = _VECTOR_MODEL.encode([query], convert_to_numpy=True)
+    if HAS_SENTE and embeddings is not None:
+        q_emb = _get_model().encode([query], convert_to_numpy=True)
         # cosine similarity
-        from numpy import dot
-        from numpy.linalg import norm
-        sims = np.dot(_EMBEDDINGS, q_emb.T).squeeze() / (
-            (np.linalg.norm(_EMBEDDINGS, axis=1) * np.linalg.norm(q_emb)) + 1e-10
+        sims = np.dot(embeddings, q_emb.T).squeeze() / (
+            (np.linalg.norm(embeddings, axis=1) * np.linalg.norm(q_emb)) + 1e-10
         )
         idx = sims.argsort()[::-1][:top_k]
-        return [ _DOCS[i] for i in idx if i < len(_DOCS) ]
+        return [ docs[i] for i in idx if i < len(docs) ]
 
     # If TF-IDF fallback
-    if HAS_SKLEARN and _EMBEDDINGS is not None:
-        q_vec = _TFIDF_VECT.transform([query])
-        sims = cosine_similarity(_EMBEDDINGS, q_vec).squeeze()
+    if HAS_SKLEARN and embeddings is not None:
+        from sklearn.metrics.pairwise import cosine_similarity
+        q_vec = tfidf.transform([query])
+        sims = cosine_similarity(embeddings, q_vec).squeeze()
         idx = sims.argsort()[::-1][:top_k]
-        return [ _DOCS[i] for i in idx if i < len(_DOCS) ]
+        return [ docs[i] for i in idx if i < len(docs) ]
 
     # Minimal substring match fallback
-    hits = [d for d in _DOCS if query.lower() in d.lower()]
+    hits = [d for d in docs if query.lower() in d.lower()]
     # If none, provide partial matches by words
     if not hits:
         tokens = query.lower().split()
         scored = []
-        for d in _DOCS:
+        for d in docs:
             score = sum(1 for t in tokens if t in d.lower())
             if score > 0:
                 scored.append((score, d))
@@ -137,5 +263,39 @@ def query_vector_db(query: str, top_k: int = 5) -> List[str]:
     return hits[:top_k]
 
 
+def reset_index():
+    """Drop all documents and cached results (benchmarks, tests); the encoder stays loaded."""
+    global _SAMPLE_LOADED
+    with _LOCK:
+        _publish([], None, None)
+        _SAMPLE_LOADED = False
+
+
+def warm_up(queries: List[str] = ()) -> None:
+    """Load the encoder, build the index and prime the query cache.
+
+    Intended to run on a background thread at process start (see warmup.py) so
+    the first user search doesn't pay for model loading and corpus encoding.
+    """
+    _ensure_vectorizer()
+    populate_sample_data()
+    for q in queries:
+        query_vector_db(q)
+
+
+def index_info() -> dict:
+    """Backend and size of the current index, for status displays."""
+    _, docs, embeddings, tfidf = _INDEX
+    if HAS_SENTE and _VECTOR_MODEL is not None:
+        backend = "sentence-transformers"
+    elif HAS_SKLEARN and tfidf is not None:
+        backend = "tfidf"
+    else:
+        backend = "substring"
+    with _CACHE_LOCK:
+        cached = len(_QUERY_CACHE)
+    return {"backend": backend, "documents": len(docs), "cached_queries": cached}
+
+
 # Module convenience
-__all__ = ["populate_sample_data", "query_vector_db", "add_documents"]
+__all__ = ["populate_sample_data", "query_vector_db", "query_vector_db_batch", "add_documents", "warm_up", "index_info", "reset_index"]
@@ -0,0 +1,158 @@
+"""
+Background warm-up and readiness tracking for the app process.
+
+start_warmup() runs, once per process and on a daemon thread:
+  1. encoder     - load the sentence-transformers / TF-IDF vectorizer
+  2. index       - build the demo vector index
+  3. query_cache - prime the vector DB cache with the queries users hit first
+  4. agents      - build the shared AgenticAdvisor and CareerChatbot
+
+Pages gate on is_ready()/wait_until_ready(); readiness() feeds the admin status tab.
+The warming process also writes readiness() to a status file (STATUS_PATH, env
+WARMUP_STATUS_PATH) at every stage change, which is how other processes see it.
+
+Readiness probe for the running server, from a shell (exit code 0 when warm):
+    python warmup.py
+It reads the status file the live server wrote; it does not warm anything itself,
+and reports not-ready if the file is missing or its process has exited.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Queries primed into the vector DB cache: the UI placeholders and featured paths.
+PRIME_QUERIES: List[str] = [
+    "machine learning courses",
+    "How do I become a Data Scientist?",
+    "AI & Machine Learning",
+    "Cloud & DevOps",
+    "Cybersecurity",
+]
+
+STAGES = ["encoder", "index", "query_cache", "agents"]
+
+STATUS_PATH = os.environ.get("WARMUP_STATUS_PATH") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "warmup_status.json")
+
+_STATE: Dict[str, dict] = {name: {"status": "pending", "seconds": None, "error": None} for name in STAGES}
+_READY = threading.Event()
+_STARTED = False
+_LOCK = threading.Lock()
+
+
+def _write_status():
+    """Publish this process's readiness for `python warmup.py` (best effort)."""
+    status = dict(readiness(), pid=os.getpid(), updated_at=time.time())
+    try:
+        os.makedirs(os.path.dirname(STATUS_PATH), exist_ok=True)
+        tmp = f"{STATUS_PATH}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(status, f)
+        os.replace(tmp, STATUS_PATH)
+    except OSError:
+        pass
+
+
+def _run_stage(name: str, fn):
+    with _LOCK:
+        _STATE[name]["status"] = "running"
+    _write_status()
+    start = time.monotonic()
+    try:
+        fn()
+        status, error = "done", None
+    except Exception as e:
+        status, error = "failed", str(e)
+    with _LOCK:
+        _STATE[name].update(status=status, seconds=round(time.monotonic() - start, 3), error=error)
+    _write_status()
+
+
+def _warm():
+    import vector_db
+    from shared_resources import warm_resources
+
+    def agents():
+        errors = warm_resources(["agentic_advisor", "career_bot"])
+        if errors:
+            raise RuntimeError("; ".join(f"{k}: {v}" for k, v in errors.items()))
+
+    try:
+        _run_stage("encoder", vector_db._ensure_vectorizer)
+        _run_stage("index", vector_db.populate_sample_data)
+        _run_stage("query_cache", lambda: vector_db.warm_up(PRIME_QUERIES))
+        _run_stage("agents", agents)
+    finally:
+        # Failed stages degrade to lazy initialization on first use, so traffic is
+        # let through either way once warm-up has finished.
+        _READY.set()
+        _write_status()
+
+
+def start_warmup(background: bool = True):
+    """Kick off warm-up once per process; later calls are no-ops."""
+    global _STARTED
+    with _LOCK:
+        if _STARTED:
+            return
+        _STARTED = True
+    if background:
+        threading.Thread(target=_warm, name="warmup", daemon=True).start()
+    else:
+        _warm()
+
+
+def is_ready() -> bool:
+    return _READY.is_set()
+
+
+def wait_until_ready(timeout: float = None) -> bool:
+    """Block until warm-up has finished (or `timeout` seconds pass); returns readiness."""
+    return _READY.wait(timeout)
+
+
+def readiness() -> dict:
+    """Overall readiness plus per-stage status/timing, for status pages and health checks."""
+    with _LOCK:
+        stages = {k: dict(v) for k, v in _STATE.items()}
+        started = _STARTED
+    return {
+        "ready": _READY.is_set(),
+        "started": started,
+        "healthy": all(s["status"] == "done" for s in stages.values()),
+        "stages": stages,
+    }
+
+
+def _alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists but owned by someone else
+    return True
+
+
+def server_readiness(path: str = None) -> Optional[dict]:
+    """Readiness last published by a live server process, or None if there is none."""
+    try:
+        with open(path or STATUS_PATH, "r", encoding="utf-8") as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return status if _alive(int(status.get("pid", 0))) else None
+
+
+if __name__ == "__main__":
+    status = server_readiness()
+    if status is None:
+        print(json.dumps({"ready": False, "error": f"no running server has published {STATUS_PATH}"}, indent=2))
+        sys.exit(1)
+    print(json.dumps(status, indent=2))
+    sys.exit(0 if status["ready"] and status["healthy"] else 1)